@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# stand-in for `jcli rest v0 ...` talking to the stub nodes, so the jcli node client can be benchmarked too
+
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+import json
+import sys
+
+def fail(message):
+    sys.stderr.write('Error: failed to make a REST request\n{}\n'.format(message))
+    sys.exit(1)
+
+def request(method, url, data=None):
+    try:
+        with urlopen(Request(url, data=data, method=method), timeout=5) as response:
+            return response.status, response.read()
+    except HTTPError as e:
+        return e.code, b''
+    except Exception as e:
+        fail(e)
+
+def main(argv):
+    args = list(argv)
+    host = args[args.index('-h') + 1]
+    del args[args.index('-h'):args.index('-h') + 2]
+    if '--output-format' in args:
+        del args[args.index('--output-format'):args.index('--output-format') + 2]
+
+    # args: rest v0 <command...>
+    command = args[2:]
+    if command == ['node', 'stats', 'get']:
+        status, body = request('GET', host + '/v0/node/stats')
+    elif command == ['leaders', 'get']:
+        status, body = request('GET', host + '/v0/leaders')
+    elif command == ['leaders', 'logs', 'get']:
+        status, body = request('GET', host + '/v0/leaders/logs')
+    elif command[0] == 'block':
+        status, body = request('GET', '{}/v0/block/{}'.format(host, command[1]))
+        body = body.hex().encode()
+    elif command[:2] == ['leaders', 'post']:
+        with open(command[command.index('-f') + 1], 'rb') as secret_file:
+            status, body = request('POST', host + '/v0/leaders', secret_file.read())
+    elif command[:2] == ['leaders', 'delete']:
+        status, _ = request('DELETE', '{}/v0/leaders/{}'.format(host, command[2]))
+        print('Success' if status == 200 else 'Failure')
+        return
+    else:
+        fail('unknown command {}'.format(command))
+
+    if status != 200:
+        fail('status code {}'.format(status))
+
+    print(body.decode())
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+
+# end-to-end benchmark of jmanager against local stand-ins (see stubs.py) - runs offline and reports CPU per tick,
+# tick latency, time from a stalled tip to the restart, time from a better synced node to the completed leader
+# switch, time from a node crash to its restart, the cold start of all nodes and the alert emails sent
+
+from subprocess import Popen, PIPE
+from xmlrpc.client import ServerProxy
+import threading
+import tempfile
+import logging
+import getopt
+import json
+import time
+import stat
+import sys
+import os
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'jmanager'))
+
+from configurations import Configurations
+from manager import Manager
+from async_engine import AsyncEngine
+from jm_enums import State
+
+def show_help(program_name):
+    print("Usage: {} [options]".format(program_name))
+    print()
+    print("{:<4} {:<30} {}".format("-n", "--nodes=N", "Number of simulated nodes (default 3)."))
+    print("{:<4} {:<30} {}".format("-d", "--duration=SEC", "Length of the steady state measurement (default 20)."))
+    print("{:<4} {:<30} {}".format("-c", "--client=rest|jcli", "Node client used by jmanager (default rest)."))
+    print("{:<4} {:<30} {}".format("-e", "--engine=threads|asyncio", "jmanager engine (default threads)."))
+    print("{:<4} {:<30} {}".format("-t", "--tip-timeout=SEC", "Tip timeout used for stuck detection (default 5)."))
+    print("{:<4} {:<30} {}".format("-b", "--max-bootstrapping=N", "Nodes bootstrapping at once in a cold start (default 1)."))
+    print("{:<4} {:<30} {}".format("-s", "--supervisor-events", "Relay supervisor events to jmanager."))
+    print("{:<4} {:<30} {}".format("-j", "--json", "Print the results as JSON."))
+    print("{:<4} {:<30} {}".format("-v", "--verbose", "Show jmanager warnings."))
+
+def parse_cmd_parameters():
+    params = {'nodes': 3, 'duration': 20, 'client': 'rest', 'engine': 'threads', 'tip_timeout': 5,
+              'supervisor_events': False, 'json': False, 'verbose': False, 'block_time': 0.5, 'max_bootstrapping': 1}
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hn:d:c:e:t:b:sjv",
+            ["help", "nodes=", "duration=", "client=", "engine=", "tip-timeout=", "max-bootstrapping=", "supervisor-events", "json", "verbose"])
+    except getopt.GetoptError:
+        show_help(sys.argv[0])
+        sys.exit(1)
+
+    for opt, arg in opts:
+        if opt in ("-h", "--help"):
+            show_help(sys.argv[0])
+            sys.exit(0)
+        elif opt in ("-n", "--nodes"):
+            params['nodes'] = int(arg)
+        elif opt in ("-d", "--duration"):
+            params['duration'] = float(arg)
+        elif opt in ("-c", "--client"):
+            params['client'] = arg
+        elif opt in ("-e", "--engine"):
+            params['engine'] = arg
+        elif opt in ("-t", "--tip-timeout"):
+            params['tip_timeout'] = float(arg)
+        elif opt in ("-b", "--max-bootstrapping"):
+            params['max_bootstrapping'] = int(arg)
+        elif opt in ("-s", "--supervisor-events"):
+            params['supervisor_events'] = True
+        elif opt in ("-j", "--json"):
+            params['json'] = True
+        elif opt in ("-v", "--verbose"):
+            params['verbose'] = True
+
+    if params['nodes'] < 2:
+        print("Error: at least 2 nodes are needed for the leader switch.")
+        sys.exit(1)
+
+    return params
+
+def start_stubs(params, events_address):
+    command = [sys.executable, os.path.join(BENCH_DIR, 'stubs.py'), '-n', str(params['nodes']), '-b', str(params['block_time'])]
+    if events_address is not None:
+        command += ['-e', events_address]
+    proc = Popen(command, stdin=PIPE, stdout=PIPE)
+    ports = json.loads(proc.stdout.readline().decode())
+    return proc, ports
+
+def write_file(filename, content):
+    with open(filename, 'w') as f:
+        f.write(content)
+
+def write_configs(workdir, ports, params, events_address):
+    write_file(os.path.join(workdir, 'pool_id'), 'ab' * 32)
+    write_file(os.path.join(workdir, 'genesis_hash'), 'cd' * 32)
+    write_file(os.path.join(workdir, 'node_secret'), 'genesis:\n  sig_key: kes25519-12-sk-stub\n  vrf_key: vrf_sk-stub\n  node_id: ~\nbft:\n  signing_key: ~\n')
+    write_file(os.path.join(workdir, 'config_template.json'), json.dumps({
+        'log': [{'format': 'plain', 'level': 'info', 'output': 'stderr'}],
+        'p2p': {'trusted_peers': []},
+        'rest': {'listen': '127.0.0.1:0'}
+    }))
+
+    fake_jcli = os.path.join(BENCH_DIR, 'fake_jcli.py')
+    os.chmod(fake_jcli, os.stat(fake_jcli).st_mode | stat.S_IXUSR)
+
+    nodes_config = []
+    for name, port in sorted(ports['nodes'].items()):
+        node_path = os.path.join(workdir, name)
+        os.mkdir(node_path)
+        os.symlink(fake_jcli, os.path.join(node_path, 'jcli'))
+        nodes_config.append({
+            'node_name': name,
+            'jmanager_settings': {'node_path': node_path, 'supervisor_service_name': name, 'default_trusted_peers': []},
+            'config': {'rest': {'listen': '127.0.0.1:{}'.format(port)}, 'storage': os.path.join(node_path, 'db')}
+        })
+
+    pooltool_url = 'http://127.0.0.1:{}'.format(ports['pooltool'])
+    now = time.gmtime()
+    write_file(os.path.join(workdir, 'jmanager_config.json'), json.dumps({
+        'common_config': {
+            'manager': {
+                'engine': params['engine'],
+                'timeout_between_restarts': 60,
+                'epoch_start_time': {'hour': now.tm_hour, 'minute': now.tm_min, 'second': now.tm_sec},
+                'min_scheduled_time_difference': 600,
+                'pool_id_file': os.path.join(workdir, 'pool_id'),
+                'genesis_hash_file': os.path.join(workdir, 'genesis_hash'),
+                'send_slots_within': 180,
+                'cold_start': {'max_bootstrapping': params['max_bootstrapping'], 'timeout': 120}
+            },
+            'pooltool': {
+                'status_summary': {'url': pooltool_url + '/stats/stats.json', 'refresh_rate': 60},
+                'send_tip': {'url': pooltool_url + '/sharemytip', 'refresh_rate': 15},
+                'send_slots': {'url': pooltool_url + '/sendlogs', 'key_path': os.path.join(workdir, 'keystorage'), 'verify_slots_gpg': 0, 'verify_slots_hash': 0},
+                'user_id': 'bench'
+            },
+            'jormungandr': {
+                'supervisor_rest_api_url': 'http://127.0.0.1:{}/RPC2'.format(ports['supervisor']),
+                'supervisor_events': {'enabled': 1 if events_address is not None else 0, 'listen': events_address or ''},
+                'common_dir': workdir,
+                'secret': 'node_secret',
+                'node_client': params['client'],
+                'timeouts': {
+                    'refresh_interval': 1,
+                    'tip_timeout': params['tip_timeout'],
+                    'leaders_refresh_interval': 1,
+                    'rest_timeout': 2
+                },
+                # lag based restarts would hide the tip timeout we want to measure
+                'tip_diff_threshold': 1000
+            },
+            'email': {
+                'email_alerts': 1,
+                'smtp_server': '127.0.0.1',
+                'port': ports['smtp'],
+                'use_ssl': 0,
+                'sender': 'jmanager@localhost',
+                'password': '',
+                'recipient': 'operator@localhost',
+                'rate_limit': 300,
+                'templates': {
+                    'stuck': {'subject': 'Node stuck ({timestamp})', 'message': "Node '{node_name}' stuck for {timeout} minutes."},
+                    'bootstrap_restart': {'subject': 'Restarting node again ({timestamp})', 'message': "Node '{node_name}' did not bootstrap in {timeout} minutes."},
+                    'slots_assigned': {'subject': 'Slots assigned ({timestamp})', 'message': '{slots_count} slots assigned:\n{slots}'}
+                }
+            }
+        },
+        'nodes_config': nodes_config
+    }))
+
+    return {
+        'jmanager_config': os.path.join(workdir, 'jmanager_config.json'),
+        'config_template': os.path.join(workdir, 'config_template.json')
+    }
+
+def percentile(values, p):
+    values = sorted(values)
+    if len(values) == 0:
+        return None
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def process_cpu_time():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+# records the wall time of every manager tick, whichever engine calls it
+class TickRecorder():
+    def __init__(self, manager):
+        self._tick = manager.tick
+        self._lock = threading.Lock()
+        self.samples = []
+        manager.tick = self.tick
+
+    def tick(self):
+        started = time.monotonic()
+        try:
+            self._tick()
+        finally:
+            with self._lock:
+                self.samples.append(time.monotonic() - started)
+
+    def count(self):
+        with self._lock:
+            return len(self.samples)
+
+def wait_for(condition, timeout, interval=0.01):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(interval)
+    return None
+
+def find_leader(rpc, names):
+    for name in names:
+        if len(rpc.bench.leaders(name)) > 0:
+            return name
+    return None
+
+def find_event(rpc, action, name, after):
+    for event_time, event_action, event_name in rpc.bench.events():
+        if event_action == action and event_name == name and event_time >= after:
+            return event_time
+    return None
+
+def run(params):
+    events_address = None
+    if params['supervisor_events']:
+        events_address = '127.0.0.1:{}'.format(19000 + os.getpid() % 1000)
+
+    stubs, ports = start_stubs(params, events_address)
+    rpc = ServerProxy('http://127.0.0.1:{}/RPC2'.format(ports['supervisor']))
+    names = sorted(ports['nodes'].keys())
+    results = {'params': params}
+
+    workdir = tempfile.mkdtemp(prefix='jmanager-bench-')
+    manager = Manager(Configurations(write_configs(workdir, ports, params, events_address)))
+    recorder = TickRecorder(manager)
+    if params['engine'] == 'asyncio':
+        threading.Thread(target=AsyncEngine(manager).run, daemon=True).start()
+    else:
+        manager.start()
+
+    # steady state: wait for a leader and measure ticks with all nodes in sync
+    leader = wait_for(lambda: find_leader(rpc, names), 30)
+    if leader is None:
+        raise Exception("No leader was registered.")
+
+    time.sleep(2)
+    ticks_start, cpu_start = recorder.count(), process_cpu_time()
+    time.sleep(params['duration'])
+    ticks_end, cpu_end = recorder.count(), process_cpu_time()
+    tick_samples = recorder.samples[ticks_start:ticks_end]
+    results['ticks'] = ticks_end - ticks_start
+    results['cpu_per_tick_ms'] = (cpu_end - cpu_start) * 1000 / max(1, ticks_end - ticks_start)
+    results['tick_latency_ms'] = {
+        'p50': percentile(tick_samples, 50) * 1000,
+        'p99': percentile(tick_samples, 99) * 1000,
+        'max': max(tick_samples) * 1000
+    }
+
+    # stall the leader - another node gets ahead (leader switch) and the stalled one times out (restart)
+    stalled_at = time.time()
+    stall_height = rpc.bench.stall(leader)
+    ahead_at = rpc.bench.height_time(stall_height + 3)
+    others = [name for name in names if name != leader]
+
+    switched_at = wait_for(lambda: time.time() if find_leader(rpc, others) is not None and len(rpc.bench.leaders(leader)) == 0 else None, 30)
+    results['leader_switch_ms'] = (switched_at - ahead_at) * 1000 if switched_at is not None else None
+
+    restarted_at = wait_for(lambda: find_event(rpc, 'stop', leader, stalled_at), params['tip_timeout'] * 4 + 10, 0.05)
+    results['stall_to_restart_s'] = restarted_at - stalled_at if restarted_at is not None else None
+    results['stall_detection_overhead_s'] = restarted_at - stalled_at - params['tip_timeout'] if restarted_at is not None else None
+
+    # stop all nodes - the manager cold starts them, at most max_bootstrapping at once
+    wait_for(lambda: all(node.get_state() == State.STARTED for node in manager.node_threads), 30, 0.05)
+    stopped_at = time.time()
+    for name in names:
+        rpc.supervisor.stopProcess(name)
+    wait_for(lambda: not any(node.get_state() == State.STARTED for node in manager.node_threads), 30, 0.05)
+    first_at = wait_for(lambda: time.time() if any(node.get_state() == State.STARTED for node in manager.node_threads) else None, 60, 0.05)
+    all_at = wait_for(lambda: time.time() if all(node.get_state() == State.STARTED for node in manager.node_threads) else None, 60, 0.05)
+    results['cold_start_first_s'] = first_at - stopped_at if first_at is not None else None
+    results['cold_start_all_s'] = all_at - stopped_at if all_at is not None else None
+
+    # crash a follower - the manager should start it again
+    follower = [name for name in names if name != find_leader(rpc, names)][0]
+    time.sleep(2)
+    crashed_at = time.time()
+    rpc.bench.crash(follower)
+    started_at = wait_for(lambda: find_event(rpc, 'start', follower, crashed_at), 30, 0.05)
+    results['crash_to_start_s'] = started_at - crashed_at if started_at is not None else None
+
+    emails = rpc.bench.emails()
+    results['emails'] = len(emails['subjects'])
+    results['smtp_connections'] = emails['connections']
+
+    stubs.stdin.close()
+    stubs.wait()
+    return results
+
+def format_value(value, fmt):
+    return 'n/a' if value is None else fmt.format(value)
+
+def print_report(results):
+    params = results['params']
+    print("jmanager benchmark: {} nodes, {} client, {} engine, supervisor events {}".format(
+        params['nodes'], params['client'], params['engine'], 'on' if params['supervisor_events'] else 'off'))
+    print("{:<36} {}".format("ticks measured", results['ticks']))
+    print("{:<36} {}".format("CPU per tick", format_value(results['cpu_per_tick_ms'], '{:.2f} ms')))
+    print("{:<36} {}".format("tick latency p50 / p99 / max", '{:.2f} / {:.2f} / {:.2f} ms'.format(
+        results['tick_latency_ms']['p50'], results['tick_latency_ms']['p99'], results['tick_latency_ms']['max'])))
+    print("{:<36} {}".format("better synced node to leader switch", format_value(results['leader_switch_ms'], '{:.0f} ms')))
+    print("{:<36} {}".format("tip stall to restart", format_value(results['stall_to_restart_s'], '{:.2f} s')))
+    print("{:<36} {}".format("  of which over tip timeout", format_value(results['stall_detection_overhead_s'], '{:.2f} s')))
+    print("{:<36} {}".format("node crash to start", format_value(results['crash_to_start_s'], '{:.2f} s')))
+    print("{:<36} {}".format("cold start first / all nodes started", '{} / {}'.format(
+        format_value(results['cold_start_first_s'], '{:.2f} s'), format_value(results['cold_start_all_s'], '{:.2f} s'))))
+    print("{:<36} {}".format("alert emails / SMTP connections", '{} / {}'.format(results['emails'], results['smtp_connections'])))
+
+if __name__ == "__main__":
+    params = parse_cmd_parameters()
+    logging.basicConfig(level=logging.WARNING if params['verbose'] else logging.CRITICAL)
+
+    results = run(params)
+    if params['json']:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    sys.stdout.flush()
+    # node and manager threads never finish on their own
+    os._exit(0)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+
+# local stand-ins for jormungandr nodes, supervisor, pooltool and an SMTP server used by the benchmarks - everything runs
+# in one process which prints the ports it listens on as a JSON line and is scripted over XML-RPC (bench.*)
+
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn, ThreadingTCPServer, StreamRequestHandler
+from xmlrpc.server import SimpleXMLRPCServer
+import threading
+import socket
+import struct
+import hashlib
+import json
+import time
+import sys
+import getopt
+
+# supervisor process state codes
+STOPPED = 0
+RUNNING = 20
+EXITED = 100
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class ThreadingXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+# the simulated blockchain - a new block every block_time seconds
+class Chain():
+    def __init__(self, block_time, slots_per_epoch=43200):
+        self._block_time = block_time
+        self._slots_per_epoch = slots_per_epoch
+        self._started = time.time()
+
+    def height(self):
+        return int((time.time() - self._started) / self._block_time) + 1
+
+    def height_time(self, height):
+        return self._started + (height - 1) * self._block_time
+
+    def block_date(self, height):
+        return (height // self._slots_per_epoch, height % self._slots_per_epoch)
+
+    def block_hash(self, height):
+        return hashlib.blake2b(str(height).encode(), digest_size=32).hexdigest()
+
+    # raw block with a genesis praos header (see jmanager/block.py)
+    def block(self, height):
+        epoch, slot = self.block_date(height)
+        header = struct.pack('>HHIIII', 116, 2, 0, epoch, slot, height)
+        header += hashlib.sha256(b'content').digest()
+        header += bytes.fromhex(self.block_hash(height - 1))
+        header += hashlib.sha256(b'pool').digest()
+        return header
+
+class FakeNode():
+    def __init__(self, name, chain, bootstrap_time):
+        self.name = name
+        self._chain = chain
+        self._bootstrap_time = bootstrap_time
+        self._lock = threading.Lock()
+        self._running = False
+        self._bootstrap_until = 0
+        self._started_at = 0
+        self._stalled_at = None
+        self._leaders = {}
+        self._next_leader_id = 1
+
+    def start(self, bootstrap_time=None):
+        with self._lock:
+            self._running = True
+            self._started_at = time.time()
+            self._bootstrap_until = self._started_at + (self._bootstrap_time if bootstrap_time is None else bootstrap_time)
+            self._stalled_at = None
+            self._leaders = {}
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._leaders = {}
+
+    def is_running(self):
+        return self._running
+
+    def stall(self):
+        with self._lock:
+            self._stalled_at = self._chain.height()
+            return self._stalled_at
+
+    def resume(self):
+        with self._lock:
+            self._stalled_at = None
+
+    def height(self):
+        return self._stalled_at if self._stalled_at is not None else self._chain.height()
+
+    def stats(self):
+        if not self._running:
+            return None
+        if time.time() < self._bootstrap_until:
+            return {'state': 'Bootstrapping', 'version': 'jormungandr 0.8.18-stub'}
+
+        height = self.height()
+        epoch, slot = self._chain.block_date(height)
+        return {
+            'state': 'Running',
+            'version': 'jormungandr 0.8.18-stub',
+            'uptime': int(time.time() - self._started_at),
+            'lastBlockHeight': str(height),
+            'lastBlockDate': '{}.{}'.format(epoch, slot),
+            'lastBlockHash': self._chain.block_hash(height),
+            'lastBlockTime': time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime())
+        }
+
+    def leaders(self):
+        with self._lock:
+            return sorted(self._leaders.keys())
+
+    def add_leader(self):
+        with self._lock:
+            leader_id = self._next_leader_id
+            self._next_leader_id += 1
+            self._leaders[leader_id] = time.time()
+            return leader_id
+
+    def delete_leader(self, leader_id):
+        with self._lock:
+            return self._leaders.pop(leader_id, None) is not None
+
+def make_node_handler(node, chain):
+    class NodeHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body go out in separate writes, with Nagle on every keep-alive response waits for a delayed ack
+        disable_nagle_algorithm = True
+
+        def _send(self, code, body=b'', content_type='application/json'):
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, data):
+            self._send(200, json.dumps(data).encode())
+
+        def _read_body(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return self.rfile.read(length) if length > 0 else b''
+
+        def do_GET(self):
+            stats = node.stats()
+            if stats is None:
+                self._send(503)
+            elif self.path == '/api/v0/node/stats':
+                self._send_json(stats)
+            elif self.path == '/api/v0/leaders':
+                self._send_json(node.leaders())
+            elif self.path == '/api/v0/leaders/logs':
+                self._send_json([])
+            elif self.path.startswith('/api/v0/block/'):
+                self._send(200, chain.block(node.height()), 'application/octet-stream')
+            else:
+                self._send(404)
+
+        def do_POST(self):
+            self._read_body()
+            if not node.is_running():
+                self._send(503)
+            elif self.path == '/api/v0/leaders':
+                self._send_json(node.add_leader())
+            else:
+                self._send(404)
+
+        def do_DELETE(self):
+            if not node.is_running():
+                self._send(503)
+            elif self.path.startswith('/api/v0/leaders/'):
+                self._send(200 if node.delete_leader(int(self.path.rsplit('/', 1)[1])) else 404)
+            else:
+                self._send(404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return NodeHandler
+
+def make_pooltool_handler(chain):
+    class PoolToolHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body go out in separate writes, with Nagle on every keep-alive response waits for a delayed ack
+        disable_nagle_algorithm = True
+
+        def _send_json(self, data):
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.startswith('/stats/stats.json'):
+                self._send_json({'majoritymax': chain.height(), 'pools': {}})
+            else:
+                self._send_json({'success': True})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self._send_json({'success': True})
+
+        def log_message(self, format, *args):
+            pass
+
+    return PoolToolHandler
+
+# minimal SMTP server accepting everything (no TLS, no auth) - keeps the subjects of received emails
+class FakeSmtp():
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.subjects = []
+
+    def make_handler(self):
+        smtp = self
+
+        class SmtpHandler(StreamRequestHandler):
+            def _reply(self, line):
+                self.wfile.write((line + '\r\n').encode())
+
+            def handle(self):
+                with smtp._lock:
+                    smtp.connections += 1
+                self._reply('220 stub ESMTP')
+                message = None
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+
+                    if message is not None:
+                        if line.rstrip(b'\r\n') == b'.':
+                            subject = [l[9:] for l in b''.join(message).decode(errors='replace').splitlines() if l.startswith('Subject: ')]
+                            with smtp._lock:
+                                smtp.subjects.append(subject[0] if len(subject) > 0 else '')
+                            message = None
+                            self._reply('250 OK')
+                        else:
+                            message.append(line)
+                        continue
+
+                    command = line.strip().upper()
+                    if command.startswith(b'EHLO'):
+                        self._reply('250-stub')
+                        self._reply('250 8BITMIME')
+                    elif command == b'DATA':
+                        message = []
+                        self._reply('354 End data with <CR><LF>.<CR><LF>')
+                    elif command == b'QUIT':
+                        self._reply('221 Bye')
+                        return
+                    elif command[:4] in (b'HELO', b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                        self._reply('250 OK')
+                    else:
+                        self._reply('502 Command not implemented')
+
+        return SmtpHandler
+
+# supervisor XML-RPC API for the fake nodes, plus the bench.* methods used to script them
+class FakeSupervisor():
+    def __init__(self, nodes, chain, smtp, events_relay=None):
+        self._nodes = nodes
+        self._chain = chain
+        self._smtp = smtp
+        self._states = {name: RUNNING if node.is_running() else STOPPED for name, node in nodes.items()}
+        self._events = []
+        self._lock = threading.Lock()
+        self._relay = None
+        if events_relay is not None:
+            host, _, port = events_relay.rpartition(':')
+            self._relay = (host, int(port))
+            self._relay_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _set_state(self, name, state, eventname, action):
+        with self._lock:
+            self._states[name] = state
+            self._events.append([time.time(), action, name])
+
+        if self._relay is not None:
+            event = {'eventname': eventname, 'processname': name, 'groupname': name, 'from_state': ''}
+            self._relay_socket.sendto(json.dumps(event).encode(), self._relay)
+
+    def _process_info(self, name):
+        now = int(time.time())
+        return {'name': name, 'group': name, 'state': self._states[name], 'now': now, 'start': now, 'pid': 0}
+
+    # supervisor.* methods
+
+    def getAllProcessInfo(self):
+        return [self._process_info(name) for name in self._nodes]
+
+    def getProcessInfo(self, name):
+        return self._process_info(name.split(':')[-1])
+
+    def startProcess(self, name):
+        self._nodes[name].start()
+        self._set_state(name, RUNNING, 'PROCESS_STATE_RUNNING', 'start')
+        return True
+
+    def stopProcess(self, name):
+        self._nodes[name].stop()
+        self._set_state(name, STOPPED, 'PROCESS_STATE_STOPPED', 'stop')
+        return True
+
+    # bench.* methods
+
+    def stall(self, name):
+        return self._nodes[name].stall()
+
+    def resume(self, name):
+        self._nodes[name].resume()
+        return True
+
+    def crash(self, name):
+        self._nodes[name].stop()
+        self._set_state(name, EXITED, 'PROCESS_STATE_EXITED', 'crash')
+        return True
+
+    def leaders(self, name):
+        return self._nodes[name].leaders()
+
+    def height(self):
+        return self._chain.height()
+
+    def height_time(self, height):
+        return self._chain.height_time(height)
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def emails(self):
+        with self._smtp._lock:
+            return {'connections': self._smtp.connections, 'subjects': list(self._smtp.subjects)}
+
+def serve(nodes_count, block_time, bootstrap_time, events_relay=None):
+    chain = Chain(block_time)
+    nodes = {}
+    ports = {'nodes': {}}
+    for idx in range(nodes_count):
+        node = FakeNode('jnode_{}'.format(idx), chain, bootstrap_time)
+        node.start(bootstrap_time=0)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_node_handler(node, chain))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        nodes[node.name] = node
+        ports['nodes'][node.name] = server.server_address[1]
+
+    smtp = FakeSmtp()
+    ThreadingTCPServer.daemon_threads = True
+    smtp_server = ThreadingTCPServer(('127.0.0.1', 0), smtp.make_handler())
+    threading.Thread(target=smtp_server.serve_forever, daemon=True).start()
+    ports['smtp'] = smtp_server.server_address[1]
+
+    supervisor = FakeSupervisor(nodes, chain, smtp, events_relay)
+    rpc_server = ThreadingXMLRPCServer(('127.0.0.1', 0), logRequests=False, allow_none=True)
+    rpc_server.register_instance(type('Root', (), {'supervisor': supervisor, 'bench': supervisor})(), allow_dotted_names=True)
+    threading.Thread(target=rpc_server.serve_forever, daemon=True).start()
+    ports['supervisor'] = rpc_server.server_address[1]
+
+    pooltool_server = ThreadingHTTPServer(('127.0.0.1', 0), make_pooltool_handler(chain))
+    threading.Thread(target=pooltool_server.serve_forever, daemon=True).start()
+    ports['pooltool'] = pooltool_server.server_address[1]
+
+    print(json.dumps(ports))
+    sys.stdout.flush()
+
+    # the benchmark closes stdin (or exits) when it is done
+    sys.stdin.read()
+
+if __name__ == "__main__":
+    opts, args = getopt.getopt(sys.argv[1:], "n:b:s:e:", ["nodes=", "block-time=", "bootstrap-time=", "events-relay="])
+    params = {'nodes': 3, 'block_time': 0.5, 'bootstrap_time': 2.0, 'events_relay': None}
+    for opt, arg in opts:
+        if opt in ("-n", "--nodes"):
+            params['nodes'] = int(arg)
+        elif opt in ("-b", "--block-time"):
+            params['block_time'] = float(arg)
+        elif opt in ("-s", "--bootstrap-time"):
+            params['bootstrap_time'] = float(arg)
+        elif opt in ("-e", "--events-relay"):
+            params['events_relay'] = arg
+
+    serve(params['nodes'], params['block_time'], params['bootstrap_time'], params['events_relay'])
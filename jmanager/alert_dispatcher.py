@@ -0,0 +1,94 @@
+from datetime import datetime
+import threading
+import time
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# sends email alerts from a background thread so a slow SMTP server never delays the manager - every template
+# is rate limited, alerts arriving within the limit are folded into one digest, and one SMTP connection is
+# reused for everything that is due and closed once it has been idle for a while
+class AlertDispatcher(threading.Thread):
+    _IDLE_TIMEOUT = 60      # seconds an unused SMTP connection stays open
+
+    def __init__(self, email):
+        threading.Thread.__init__(self, name='alert_dispatcher', daemon=True)
+        self._email = email
+        self._condition = threading.Condition()
+        self._queued = []
+        self._pending = {}          # formatted messages per template waiting for the rate limit
+        self._last_sent = {}
+        self._last_used = None
+        self._stopped = False
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def submit(self, email_key, data):
+        data = dict(data)
+        data['timestamp'] = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
+        with self._condition:
+            self._queued.append((email_key, data))
+            self._condition.notify()
+
+    def _due_time(self, email_key):
+        last_sent = self._last_sent.get(email_key)
+        return 0 if last_sent is None else last_sent + self._email.get_rate_limit()
+
+    def _next_due_time(self):
+        due = [self._due_time(email_key) for email_key in self._pending]
+        if self._last_used is not None:
+            due.append(self._last_used + AlertDispatcher._IDLE_TIMEOUT)
+        return min(due) if len(due) > 0 else None
+
+    def _take_queued(self):
+        with self._condition:
+            while len(self._queued) == 0 and not self._stopped:
+                due = self._next_due_time()
+                if due is not None and due <= time.monotonic():
+                    break
+                self._condition.wait(None if due is None else due - time.monotonic())
+
+            queued = self._queued
+            self._queued = []
+            return queued
+
+    def _dispatch(self):
+        now = time.monotonic()
+        messages = []
+        for email_key in list(self._pending):
+            if now < self._due_time(email_key):
+                continue
+
+            pending = self._pending.pop(email_key)
+            if len(pending) == 1:
+                messages.append(pending[0])
+            else:
+                log.info("Sending {} '{}' alerts as one digest.".format(len(pending), email_key))
+                messages.append(self._email.format_digest(email_key, pending))
+            self._last_sent[email_key] = now
+
+        if len(messages) > 0:
+            self._email.deliver(messages)
+            self._last_used = time.monotonic()
+        elif self._last_used is not None and now >= self._last_used + AlertDispatcher._IDLE_TIMEOUT:
+            self._email.close()
+            self._last_used = None
+
+    def run(self):
+        while not self._stopped:
+            try:
+                for email_key, data in self._take_queued():
+                    message = self._email.format(email_key, data)
+                    if message is not None:
+                        self._pending.setdefault(email_key, []).append(message)
+
+                self._dispatch()
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+
+        self._email.close()
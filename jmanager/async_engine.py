@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+import os
+from manager import Manager
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# drives all nodes, the manager tick and pooltool I/O from one asyncio event loop - blocking calls
+# (node REST/jcli, supervisor, pooltool, email) run in a shared thread pool so every node is polled
+# concurrently and a slow node never delays the manager tick
+class AsyncEngine():
+    def __init__(self, manager, max_workers=None):
+        self._manager = manager
+        self._loop = asyncio.new_event_loop()
+        if max_workers is None:
+            # one worker per node plus the manager tick, pooltool and email dispatching
+            max_workers = len(manager.node_threads) + 3
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='engine')
+        self._wakeup = None
+
+    async def _call(self, func, *args):
+        return await self._loop.run_in_executor(self._executor, func, *args)
+
+    async def _poll_node(self, node):
+        log.info("Started polling {}".format(node.get_name()))
+        await asyncio.sleep(node.get_initial_poll_delay())
+        while True:
+            try:
+                await self._call(node.poll)
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+            await asyncio.sleep(node.get_next_poll_delay())
+
+    async def _refresh_pool_tool(self):
+        while True:
+            try:
+                await self._call(self._manager.refresh_pool_tool)
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+            await asyncio.sleep(Manager._LOOP_INTERVAL)
+
+    async def _tick_manager(self):
+        while True:
+            started = self._loop.time()
+            self._wakeup.clear()
+            await self._call(self._manager.tick)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(0, Manager._LOOP_INTERVAL - (self._loop.time() - started)))
+            except asyncio.TimeoutError:
+                pass
+
+    def run(self):
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        # wake ups come from other threads (e.g. supervisor events)
+        self._manager.set_wakeup_handler(lambda: self._loop.call_soon_threadsafe(self._wakeup.set))
+
+        tasks = [self._loop.create_task(self._poll_node(node)) for node in self._manager.node_threads]
+        tasks.append(self._loop.create_task(self._refresh_pool_tool()))
+        tasks.append(self._loop.create_task(self._tick_manager()))
+
+        log.info("Started asyncio engine with {} node tasks.".format(len(self._manager.node_threads)))
+        try:
+            self._loop.run_until_complete(asyncio.gather(*tasks))
+        finally:
+            self._executor.shutdown(wait=False)
+            self._loop.close()
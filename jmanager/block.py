@@ -0,0 +1,64 @@
+from collections import namedtuple, OrderedDict
+import struct
+import threading
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+BlockHeader = namedtuple('BlockHeader', ['version', 'content_size', 'epoch', 'slot', 'chain_length', 'content_hash', 'parent_hash', 'leader_id'])
+
+# header size, version, content size, epoch, slot, chain length
+_HEADER_COMMON = struct.Struct('>HHIIII')
+_HASH_SIZE = 32
+_HEADER_VERSION_UNSIGNED = 0
+
+# decodes the header of a raw jormungandr block - for BFT and genesis praos blocks leader_id holds
+# the BFT leader public key or the stake pool id (hex), unsigned blocks have no leader
+def decode_header(raw):
+    leader_id_end = _HEADER_COMMON.size + 3 * _HASH_SIZE
+    if len(raw) < _HEADER_COMMON.size + 2 * _HASH_SIZE:
+        raise ValueError("Block is too short ({} bytes) to contain a header.".format(len(raw)))
+
+    _, version, content_size, epoch, slot, chain_length = _HEADER_COMMON.unpack_from(raw)
+    content_hash = raw[_HEADER_COMMON.size:_HEADER_COMMON.size + _HASH_SIZE].hex()
+    parent_hash = raw[_HEADER_COMMON.size + _HASH_SIZE:_HEADER_COMMON.size + 2 * _HASH_SIZE].hex()
+
+    leader_id = None
+    if version != _HEADER_VERSION_UNSIGNED and len(raw) >= leader_id_end:
+        leader_id = raw[_HEADER_COMMON.size + 2 * _HASH_SIZE:leader_id_end].hex()
+
+    return BlockHeader(version, content_size, epoch, slot, chain_length, content_hash, parent_hash, leader_id)
+
+# bounded LRU cache of decoded block headers keyed by block hash, shared by all nodes so a block
+# reported by several nodes is fetched and decoded only once
+class BlockCache():
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._headers = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, block_hash, fetch_block):
+        with self._lock:
+            header = self._headers.get(block_hash)
+            if header is not None:
+                self._headers.move_to_end(block_hash)
+                self._hits += 1
+                return header
+            self._misses += 1
+
+        header = decode_header(fetch_block(block_hash))
+
+        with self._lock:
+            self._headers[block_hash] = header
+            self._headers.move_to_end(block_hash)
+            while len(self._headers) > self._capacity:
+                self._headers.popitem(last=False)
+
+        return header
+
+    def get_stats(self):
+        return {'size': len(self._headers), 'hits': self._hits, 'misses': self._misses}
@@ -0,0 +1,113 @@
+import ctypes
+import ctypes.util
+import threading
+import select
+import struct
+import time
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# inotify event masks (see inotify(7)) - editors often replace files instead of writing them,
+# so the directories are watched and events are filtered by file name
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_IN_EVENT = struct.Struct('iIII')
+
+def _init_inotify():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None, None
+
+    if fd < 0:
+        return None, None
+    return libc, fd
+
+# watches files in a background thread and calls the callback once after a burst of changes - uses inotify
+# when it is available (Linux) and falls back to polling the files' modification time and size
+class ConfigWatcher(threading.Thread):
+    _POLL_INTERVAL = 2      # seconds between checks when polling
+    _SETTLE_TIME = 0.2      # editors write files in several steps, wait for the burst to end
+
+    def __init__(self, paths, callback):
+        threading.Thread.__init__(self, name='config_watcher', daemon=True)
+        self._paths = [os.path.abspath(path) for path in paths]
+        self._callback = callback
+        self._stopped = threading.Event()
+        self._libc, self._fd = _init_inotify()
+        self._watches = {}
+
+        if self._fd is not None:
+            for directory in set(os.path.dirname(path) for path in self._paths):
+                wd = self._libc.inotify_add_watch(self._fd, directory.encode(), _IN_WATCH_MASK)
+                if wd < 0:
+                    log.warning("Could not watch {} (errno {}), polling config files instead.".format(directory, ctypes.get_errno()))
+                    os.close(self._fd)
+                    self._fd = None
+                    break
+                self._watches[wd] = directory
+
+    def is_inotify(self):
+        return self._fd is not None
+
+    def stop(self):
+        self._stopped.set()
+
+    def _notify(self):
+        try:
+            self._callback()
+        except Exception as e:
+            log.error('Exception occured', exc_info=True)
+
+    def _read_events(self):
+        changed = False
+        data = os.read(self._fd, 4096)
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _IN_EVENT.unpack_from(data, offset)
+            name = data[offset + _IN_EVENT.size:offset + _IN_EVENT.size + length].rstrip(b'\0').decode()
+            offset += _IN_EVENT.size + length
+            if os.path.join(self._watches.get(wd, ''), name) in self._paths:
+                changed = True
+        return changed
+
+    def _run_inotify(self):
+        while not self._stopped.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 1)
+            if len(ready) == 0 or not self._read_events():
+                continue
+
+            # drain the rest of the burst before reloading
+            while len(select.select([self._fd], [], [], ConfigWatcher._SETTLE_TIME)[0]) > 0:
+                self._read_events()
+            self._notify()
+
+    def _file_signature(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
+    def _run_polling(self):
+        signatures = [self._file_signature(path) for path in self._paths]
+        while not self._stopped.wait(ConfigWatcher._POLL_INTERVAL):
+            current = [self._file_signature(path) for path in self._paths]
+            if current != signatures:
+                signatures = current
+                self._notify()
+
+    def run(self):
+        log.debug("Watching {} ({}).".format(', '.join(self._paths), 'inotify' if self.is_inotify() else 'polling'))
+        if self.is_inotify():
+            self._run_inotify()
+        else:
+            self._run_polling()
@@ -1,19 +1,80 @@
 import json
-from copy import copy, deepcopy
+from collections import namedtuple
+from copy import deepcopy
 from logging import getLogger
 import os
-import time
+import threading
+from config_watcher import ConfigWatcher
 import utils
 
 log = getLogger(utils.get_module_name(os.path.basename(__file__)))
 
+# read-only dict shared by all threads - still a dict, so it can be serialized with json as is
+class FrozenDict(dict):
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Configuration snapshots are read-only, use thaw() to get a mutable copy.")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+def freeze(obj):
+    if isinstance(obj, dict):
+        return FrozenDict((key, freeze(value)) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        return tuple(freeze(value) for value in obj)
+    return obj
+
+def thaw(obj):
+    if isinstance(obj, dict):
+        return {key: thaw(value) for key, value in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [thaw(value) for value in obj]
+    return obj
+
+# one consistent, immutable view of the configuration - generation grows on every change, a node's generation
+# only when that node's resulting configuration differs
+class ConfigSnapshot(namedtuple('ConfigSnapshot', ['generation', 'config', 'nodes', 'node_generations'])):
+    __slots__ = ()
+
+    def get_node_generation(self, node_name):
+        return self.node_generations.get(node_name, 0)
+
+    def get_config(self, node_name):
+        return self.nodes.get(node_name)
+
+    def get_config_manager(self):
+        return {
+            'manager': self.config["common_config"]["manager"],
+            'nodes': tuple(self.nodes.values())
+            }
+
+    def get_config_jormungandr(self):
+        return self.config["common_config"]["jormungandr"]
+
+    def get_config_email(self):
+        return self.config["common_config"]["email"]
+
+    def get_config_pool_tool(self):
+        return self.config["common_config"]["pooltool"]
+
 class Configurations():
     def __init__(self, parsed_params):
         self._jmanager_config = parsed_params['jmanager_config']
         self._template_config = parsed_params['config_template']
 
+        # snapshots are replaced as a whole, readers never need the lock
+        self._lock = threading.Lock()
+        self._snapshot = None
         self._load()
 
+        self._watcher = ConfigWatcher([self._jmanager_config, self._template_config], self.reload)
+        self._watcher.start()
+
     def _fillTemplate(self, template, obj):
         if type(obj) is list:
             for idx in range(len(obj)):
@@ -33,69 +94,69 @@ class Configurations():
             template_data = json.load(json_file)
 
         with open(self._jmanager_config, 'r') as json_file:
-            self._config = json.load(json_file)
+            config = json.load(json_file)
 
-        for cfg in self._config["nodes_config"]:
+        nodes = {}
+        for cfg in config["nodes_config"]:
             inst_cfg = deepcopy(template_data)
             node_name = cfg['node_name']
             jmanager_settings = cfg['jmanager_settings']
-            config = cfg['config']
 
-            self._fillTemplate(inst_cfg, config)
+            self._fillTemplate(inst_cfg, cfg['config'])
             config_filename = "{}/{}.json".format(jmanager_settings['node_path'], node_name)
-            self._node_configurations.append({
+            nodes[node_name] = {
                 'node_name': node_name,
                 'filename': config_filename,
                 'config': inst_cfg, 
                 'jmanager_settings': jmanager_settings,
-                'common_config_jormungandr': self._config["common_config"]["jormungandr"]
-                })
+                'common_config_jormungandr': config["common_config"]["jormungandr"]
+                }
 
-        log.debug('Created {} configurations.'.format(len(self._node_configurations)))
+        log.debug('Created {} configurations.'.format(len(nodes)))
+        return freeze(config), freeze(nodes)
 
     def _load(self):
-        self._node_configurations = []
-        self._config = None
-        self._create()
+        config, nodes = self._create()
 
-        self._last_template_config_check = time.time()
-        self._last_jmanager_config_check = time.time()
+        with self._lock:
+            old = self._snapshot
+            if old != None and config == old.config and nodes == old.nodes:
+                log.debug("Config files changed but the configuration is the same.")
+                return
 
-    def _get_last_modified_time(self, file_path):
-        return os.path.getmtime(file_path)
+            generation = 1 if old == None else old.generation + 1
+            node_generations = dict(old.node_generations) if old != None else {}
+            changed = []
+            for node_name, node_config in nodes.items():
+                if old == None or old.get_config(node_name) != node_config:
+                    node_generations[node_name] = generation
+                    changed.append(node_name)
 
-    def _is_new_config_available(self):
-        if (self._get_last_modified_time(self._template_config) > self._last_template_config_check 
-            or self._get_last_modified_time(self._jmanager_config) > self._last_jmanager_config_check):
-            return True
-        else:
-            False
+            self._snapshot = ConfigSnapshot(generation, config, nodes, FrozenDict(node_generations))
 
-    def get_latest_config_timestamp(self):
-        return max(self._last_template_config_check, self._last_jmanager_config_check)
+        log.info("Loaded config generation {} (changed nodes: {}).".format(generation, ', '.join(changed) if len(changed) > 0 else 'none'))
 
-    def is_config_update_needed(self, last_updated):
-        if self._is_new_config_available():
+    # called by the watcher - a broken config (e.g. saved half way) keeps the current generation
+    def reload(self):
+        try:
             self._load()
-        if last_updated == None or self.get_latest_config_timestamp() > last_updated:
-            return True
-        else:
-            return False
+        except Exception as e:
+            log.error("Could not reload config: {}".format(e))
+
+    def get_snapshot(self):
+        return self._snapshot
 
     def get_config(self, node_name):
-        for node_config in self._node_configurations:
-            if (node_name == node_config['node_name']):
-                return node_config
-        return None
+        return self._snapshot.get_config(node_name)
 
     def get_config_manager(self):
-        return {
-            'manager': self._config["common_config"]["manager"],
-            'nodes': self._node_configurations
-            }
+        return self._snapshot.get_config_manager()
+
+    def get_config_jormungandr(self):
+        return self._snapshot.get_config_jormungandr()
 
     def get_config_email(self):
-        return self._config["common_config"]["email"]
+        return self._snapshot.get_config_email()
 
     def get_config_pool_tool(self):
-        return self._config["common_config"]["pooltool"]
+        return self._snapshot.get_config_pool_tool()
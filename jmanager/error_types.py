@@ -15,6 +15,10 @@ class JcliError(Exception):
         log.error(self._errors)
         log.error('Exception occured', exc_info=True)
 
+# REST backend errors carry the same 'err_code' as jcli errors so node threads handle them alike
+class RestError(JcliError):
+    pass
+
 class SupervisorError(Exception):
     def __init__(self, msg, err):
         self._message = msg
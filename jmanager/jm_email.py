@@ -1,5 +1,4 @@
 from logging import getLogger
-import traceback
 import os
 import smtplib, ssl
 import json
@@ -8,15 +7,23 @@ import utils
 
 log = getLogger(utils.get_module_name(os.path.basename(__file__)))
 
+_DEFAULT_DIGEST_TEMPLATE = {
+    'subject': "{count} '{template}' alerts ({timestamp})",
+    'message': "[{timestamp}]:\n{count} '{template}' alerts:\n\n{messages}"
+}
+
 class Email():
     def __init__(self, config):
         self._config = config
-        self._config_last_updated = None
+        self._config_email = None
+        self._server = None
         self._update_config_if_new()
 
     def _update_config_if_new(self):
-        if self._config.is_config_update_needed(self._config_last_updated):
-            config = self._config.get_config_email()
+        # only a change of the email section reopens the SMTP connection, not any change of the config
+        config = self._config.get_snapshot().get_config_email()
+        if self._config_email != config:
+            self._config_email = config
 
             self._sender_email = config['sender']
             self._password = config['password']
@@ -24,52 +31,108 @@ class Email():
             self._port = config['port']  # 465 for SSL
             self._templates = config['templates']
             self._smtp_server = config['smtp_server']
-            self._config_last_updated = self._config.get_latest_config_timestamp()
+            self._use_ssl = config.get('use_ssl', 1) == 1
+            self._timeout = config.get('timeout', 30)
+            self._rate_limit = config.get('rate_limit', 300)
+            self.close()
             
             log.info("Updated email config: {}".format(json.dumps(self._templates, indent=2)))
 
-    def send(self, email_key, data):
+    # fills the template - returns the subject and the message or None if the alert cannot be sent
+    def format(self, email_key, data):
         self._update_config_if_new()
 
         log.debug("Got email params: {} , {}".format(email_key, data))
-        # Create a secure SSL context
-        context = ssl.create_default_context()
-        data['timestamp'] = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
+        if data.get('timestamp') is None:
+            data['timestamp'] = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
 
         msg = self._templates[email_key]['message']
         if email_key == 'stuck':
             if data.get('timeout') == None or data.get('node_name') == None:
                 log.error("Error: Error while trying to send email on 'node stuck'")
-                return
+                return None
             msg = msg.format(timestamp=data['timestamp'], timeout=data['timeout'], node_name=data['node_name'])
             log.info("Mail message: {}".format(msg))
         elif email_key == 'bootstrap_restart':
             if data.get('timeout') is None or data.get('node_name') is None:
                 log.error("Error: Error while trying to send email on 'boostrap restart'")
-                return
+                return None
             msg = msg.format(timestamp=data['timestamp'], timeout=data['timeout'], node_name=data['node_name'])
             log.info("Mail message: {}".format(msg))
         elif email_key == 'leader':
-            pass
+            return None
         elif email_key == 'slots_assigned':
             if data.get('slots') is None or data.get('node_name') is None:
                 log.error("Error: Error while trying to send email on 'slots assigned'")
-                return
+                return None
             msg = msg.format(timestamp=data['timestamp'], node_name=data['node_name'], slots_count=len(data['slots']), slots=json.dumps(data['slots'], indent=4))
             log.info("Mail message: {}".format(msg))
         else:
-            return
+            return None
+
+        return self._templates[email_key]['subject'].format(timestamp=data['timestamp']), msg
+
+    def get_rate_limit(self):
+        return self._rate_limit
 
-        try:
-            server = smtplib.SMTP_SSL(self._smtp_server, self._port)
+    # folds several messages of one template into a single email
+    def format_digest(self, email_key, messages):
+        template = self._templates.get('digest', _DEFAULT_DIGEST_TEMPLATE)
+        timestamp = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
+        subject = template['subject'].format(timestamp=timestamp, count=len(messages), template=email_key)
+        msg = template['message'].format(timestamp=timestamp, count=len(messages), template=email_key, messages='\n\n'.join(msg for _, msg in messages))
+        return subject, msg
+
+    def _connect(self):
+        if self._use_ssl:
+            # Create a secure SSL context
+            server = smtplib.SMTP_SSL(self._smtp_server, self._port, timeout=self._timeout, context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(self._smtp_server, self._port, timeout=self._timeout)
+            server.ehlo()
+            if server.has_extn('starttls'):
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+
+        if len(self._password) > 0:
             server.login(self._sender_email, self._password)
-            message = """From: {sender}\nSubject: {subject}\n\n
-                {msg}""".format(sender=self._sender_email, 
-                    subject=self._templates[email_key]['subject'].format(timestamp=data['timestamp']),
-                    msg=msg)
-            server.sendmail(self._sender_email, self._recipient, message)
-        except Exception as e:
-            log.error('Exception occured', exc_info=True)
-        finally:
-            if not server is None:
-                server.close()
\ No newline at end of file
+        return server
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception as e:
+                pass
+            self._server = None
+
+    def _sendmail(self, subject, msg):
+        message = """From: {sender}\nSubject: {subject}\n\n
+                {msg}""".format(sender=self._sender_email, subject=subject, msg=msg)
+        self._server.sendmail(self._sender_email, self._recipient, message)
+
+    # sends the messages over the open connection, the connection is reopened once if the server dropped it
+    def deliver(self, messages):
+        self._update_config_if_new()
+
+        for subject, msg in messages:
+            try:
+                if self._server is None:
+                    self._server = self._connect()
+                try:
+                    self._sendmail(subject, msg)
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self.close()
+                    self._server = self._connect()
+                    self._sendmail(subject, msg)
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+                self.close()
+
+    def send(self, email_key, data):
+        message = self.format(email_key, data)
+        if message is None:
+            return
+
+        self.deliver([message])
+        self.close()
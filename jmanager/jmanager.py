@@ -10,8 +10,11 @@ import traceback
 from logging import getLogger
 from settings import *
 from manager import Manager
+from async_engine import AsyncEngine
 from jormungandr import Jormungandr
 from configurations import Configurations
+from restart_journal import export_csv, get_journal_filename
+from restart_analytics import analyze
 from error_types import *
 import utils
 
@@ -31,12 +34,18 @@ def show_help(program_name, params):
     print("{:<4} {:<40} {}".format("-j", "--jmanager-config=JSON_CONFIG", "Main jmanager configuration file. Default is jmanager_config.json."))
     print("{:<4} {:<40} {}".format("-t", "--config-template=JSON_TEMPLATE", "This is node config file template. Values can be overwritten"))
     print("{:<4} {:<40} {}".format("", "", "in jmanager configuration. Default config file is template_config.json."))
+    print()
+    print("Optional parameters:")
+    print("{:<4} {:<40} {}".format("-r", "--export-restarts=CSV_FILE", "Export the restart journal in the csv format and exit."))
+    print("{:<4} {:<40} {}".format("-s", "--restart-stats", "Print restart statistics from the restart journal and exit."))
 
 def parse_cmd_parameters():
     # default parameters values
     parsed_params = {
         'jmanager_config': 'jmanager_config.json',
         'config_template': 'config_template.json',
+        'export_restarts': None,
+        'restart_stats': False,
     }
 
     # get program name
@@ -45,7 +54,7 @@ def parse_cmd_parameters():
     argvs = sys.argv[1:]
 
     try:
-        opts, args = getopt.getopt(argvs, "h:j:t:", ["help", "jmanager-config=", "config-template="])
+        opts, args = getopt.getopt(argvs, "h:j:t:r:s", ["help", "jmanager-config=", "config-template=", "export-restarts=", "restart-stats"])
     except getopt.GetoptError:
         show_help(program_name, parsed_params)
         sys.exit(1)
@@ -65,6 +74,13 @@ def parse_cmd_parameters():
                 parsed_params['config_template'] = arg
             else:
                 invalid_params.append('config_template')
+        elif opt in ("-r", "--export-restarts"):
+            if not arg is None and len(arg) > 0:
+                parsed_params['export_restarts'] = arg
+            else:
+                invalid_params.append('export_restarts')
+        elif opt in ("-s", "--restart-stats"):
+            parsed_params['restart_stats'] = True
 
     if len(invalid_params) > 0:
         show_invalid_params(invalid_params, parsed_params)
@@ -84,6 +100,11 @@ def create_logs_path():
             log.error('Exception occured', exc_info=True)
             sys.exit(1)
 
+def export_restarts(config, csv_filename):
+    filename = get_journal_filename(config.get_config_jormungandr())
+    count = export_csv(filename, csv_filename)
+    print("Exported {} records from {} to {}.".format(count, filename, csv_filename))
+
 if __name__ == "__main__":
     create_logs_path()
 
@@ -91,5 +112,16 @@ if __name__ == "__main__":
 
     config = Configurations(parsed_params)
 
+    if parsed_params['export_restarts'] != None:
+        export_restarts(config, parsed_params['export_restarts'])
+        sys.exit(0)
+
+    if parsed_params['restart_stats']:
+        print(analyze(get_journal_filename(config.get_config_jormungandr())).get_report())
+        sys.exit(0)
+
     manager = Manager(config)
-    manager.start()
\ No newline at end of file
+    if manager.get_engine() == 'asyncio':
+        AsyncEngine(manager).run()
+    else:
+        manager.start()
\ No newline at end of file
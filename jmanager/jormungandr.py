@@ -1,7 +1,7 @@
-from subprocess import Popen, PIPE
 from datetime import datetime, timedelta
 import time 
 import json
+import hashlib
 import requests
 from requests.exceptions import HTTPError
 import threading
@@ -10,33 +10,56 @@ import os
 from jm_enums import State, JError
 from logging import getLogger
 from error_types import *
-from xmlrpc.client import ServerProxy
+from node_client import create_node_client
+from configurations import thaw
+from locks import InstrumentedLock
+from poll_scheduler import PollScheduler
+from tip_history import TipHistory
+from slot_schedule import get_slots_digest
+from metrics import NODE_RESTARTS, NODE_ACTIONS
 import utils
-import threading
-
-threadLock = threading.RLock()
 
 log = getLogger(utils.get_module_name(os.path.basename(__file__)))
 
 class Jormungandr(threading.Thread):
-    def __init__(self, config, node_name, jormungandr_nodes):
+    def __init__(self, config, node_name, jormungandr_nodes, supervisor, block_cache, journal):
         threading.Thread.__init__(self, name=node_name)
         self._config = config
 
+        # supervisor client, block headers cache and restart journal shared by all nodes
+        self._supervisor = supervisor
+        self._block_cache = block_cache
+        self._journal = journal
+        self._last_max_tip = None
+        self._version = None
+
+        # guards this node's REST calls and leader registration - nodes no longer block each other
+        self._lock = InstrumentedLock(node_name)
+        # guards only the node state, so supervisor events are applied even while a poll is waiting for the node
+        self._state_lock = threading.Lock()
+        self._state_events = 0      # supervisor events applied so far, a poll started before one must not undo it
+
         # node threads
         self._jormungandr_nodes = jormungandr_nodes
 
-        self._config_last_updated = None
+        self._config_generation = None
+        self._client = None
         self._update_config_if_new()
 
         # bootstrap timestamp for current node instance
         self._bootstrap_started_at_time = None
 
+        # consecutive failed polls, used to back off polling
+        self._poll_failures = 0
+
         log.debug("Created node thread {}".format(self._node_name))
 
     def _update_config_if_new(self):
-        if self._config.is_config_update_needed(self._config_last_updated):
-            config_data = self._config.get_config(self.name)
+        # a snapshot is consistent, so the generation always matches the config read from it
+        snapshot = self._config.get_snapshot()
+        if self._config_generation != snapshot.get_node_generation(self.name):
+            self._config_generation = snapshot.get_node_generation(self.name)
+            config_data = snapshot.get_config(self.name)
             if config_data == None:
                 raise Exception("Could not obtain configuration for node instance '{}'".format(self.name)) 
 
@@ -47,35 +70,42 @@ class Jormungandr(threading.Thread):
             self._tip_diff_threshold = cmn_cfg['tip_diff_threshold']
             self._tip_timeout = cmn_cfg['timeouts']['tip_timeout']
             self._check_leaders_refresh_interval = cmn_cfg['timeouts']['leaders_refresh_interval']
+            self._leaders_logs_ttl = cmn_cfg['timeouts'].get('leaders_logs_ttl', 60)
+            self._poll_scheduler = PollScheduler(cmn_cfg['timeouts'])
             self._jormungandr_common_dir = cmn_cfg['common_dir']
-            self._restarts_log_filename = cmn_cfg['restarts_log_filename']
             self._node_name = config_data['node_name']
             self._config_filename = config_data['filename']
             self._host = "http://{}/api".format(config_data['config']['rest']['listen'])
             self._jormungandr_dir = config_data['jmanager_settings']['node_path']
             self._jcli = "{}/jcli".format(self._jormungandr_dir)
+            # the old client's connections are released before it is replaced
+            if self._client != None:
+                self._client.close()
+            self._client = create_node_client(cmn_cfg, config_data['node_name'], self._jcli, self._host)
             self._supervisor_service_name = config_data['jmanager_settings']['supervisor_service_name']
             self._default_peers = config_data['jmanager_settings']['default_trusted_peers']
-            self._restarts_logs = "{}/{}".format(self._jormungandr_common_dir, self._restarts_log_filename)
             self._leader_secret_file = "{}/{}".format(self._jormungandr_common_dir, cmn_cfg['secret'])
-            self._server = ServerProxy(cmn_cfg['supervisor_rest_api_url'])
+            self._prepare_leader()
 
             # variables holding state info of this node instance
             self._node_stats = None
-            self._previous_node_stats = None
-            self._node_stats_time = None
+            self._tip_history = TipHistory(cmn_cfg.get('tip_history_size', 720))
             self._jmconfig = config_data['config']
             self._jmconfig_copy = None
             self._default_peers_enabled = False
             self._leaders = None
             self._last_time_check_leaders = None
+            self._leaders_logs = None
+            self._leaders_logs_digest = None
+            self._leaders_logs_response_digest = None
+            self._leaders_logs_epoch = None
+            self._leaders_logs_fetched_at = None
 
             # save configuration to file
             self._save_config()
 
             # set initial state node
             self._state = State.UNKNOWN
-            self._config_last_updated = self._config.get_latest_config_timestamp()
 
     def _load_config(self):
         with open(self._config_filename, 'r') as json_file:
@@ -89,89 +119,80 @@ class Jormungandr(threading.Thread):
         log.debug("Config saved to {}".format(self._config_filename))
 
     def _log_action(self, action='', reason=''):
-        header = ''
-        if not os.path.exists(self._restarts_logs):
-            header = 'node name, timestamp, action, uptime, reason\n'
+        NODE_ACTIONS.inc(self.get_name(), action, reason)
 
-        with open(self._restarts_logs, 'a') as f:
-            f.write('{}{},{},{},{},{}\n'.format(header, self.get_name(), datetime.utcnow(), action, self.get_uptime(), reason))
+        tip = None
+        epoch = None
+        if self._node_stats != None:
+            tip = self.get_tip()
+            self._version = self._node_stats.get('version', self._version)
+            block_date = self._node_stats.get('lastBlockDate')
+            if block_date != None and block_date.find('.') > -1:
+                epoch = int(block_date[0 : block_date.find('.')])
+        lag = max(self._last_max_tip - tip, 0) if tip != None and self._last_max_tip != None else None
+        self._journal.record(self.get_name(), action, reason, self.get_uptime(), tip, lag, epoch, self._version)
 
     def _set_state(self, state):
-        self._state = state
+        with self._state_lock:
+            self._state = state
+
+    # the state a poll found is dropped when a supervisor event arrived while the poll was waiting for the node
+    def _set_polled_state(self, state, state_events):
+        with self._state_lock:
+            if self._state_events != state_events:
+                return False
+            self._state = state
+            return True
 
     def _clean_up(self):
-        self._node_stats_time = None
         self._node_stats = None
-        self._previous_node_stats = None
+        self._tip_history.clear()
         self._leaders = None
+        self._leaders_logs_fetched_at = None
+        self._leaders_logs_response_digest = None
 
     def _get_stats(self):
         try:
-            threadLock.acquire()
-            command = [self._jcli, "rest", "v0", "node", "stats", "get", "-h", self._host, "--output-format", "json"]
-            proc = Popen(command, stdout=PIPE, stderr=PIPE)
-            stdout, stderr = proc.communicate()
-            if proc.returncode != 0:
-                err_msg = stderr.decode()
-                # jormungandr returns 1 on error, so we parse the output to get the error type
-                msg_node_down = "failed to make a REST request"
-                msg_address_already_in_use = "Address already in use"
-
-                err_code = JError.UNKNOWN
-                if err_msg.find(msg_node_down) > -1:
-                    err_code = JError.FAILED_REST_REQUEST
-                elif err_msg.find(msg_address_already_in_use) > 0:
-                    err_code = JError.ADDRESS_ALREADY_IN_USE
-
+            self._lock.acquire()
+            state_events = self._state_events
+            try:
+                node_stats = self._client.get_node_stats()
+            except JcliError as e:
                 self.set_state_from_supervisor()
-
-                raise JcliError('Could not get node stats.', err = {'proc_ret_code': proc.returncode, 'err_code': err_code, 'stdout': stdout.decode(), 'stderr': stderr.decode()})
+                raise e
 
             exit_func = False
-            if proc.returncode == 0:
-                node_stats = json.loads(stdout.decode())
-                state = node_stats.get('state')
-                if state == 'Bootstrapping':
-                    self._set_state(State.BOOTSTRAPPING)
-                    exit_func = True
-                elif node_stats.get('lastBlockHeight'):
-                    self._set_state(State.STARTED)
-                else:
-                    self.set_state_from_supervisor()
+            state = node_stats.get('state')
+            if state == 'Bootstrapping':
+                if not self._set_polled_state(State.BOOTSTRAPPING, state_events):
+                    self._clean_up()
+                exit_func = True
+            elif node_stats.get('lastBlockHeight'):
+                if not self._set_polled_state(State.STARTED, state_events):
                     self._clean_up()
                     exit_func = True
+            else:
+                self.set_state_from_supervisor()
+                self._clean_up()
+                exit_func = True
 
-                if not exit_func:
-                    if self._previous_node_stats is None:
-                        self._node_stats_time = datetime.now()
-                        self._previous_node_stats = node_stats
-                        self._node_stats = node_stats
-                    else:
-                        if node_stats['lastBlockHeight'] > self._previous_node_stats['lastBlockHeight']:
-                            self._previous_node_stats = self._node_stats
-                            self._node_stats = node_stats
-                            self._node_stats_time = datetime.now()
+            if not exit_func:
+                self._node_stats = node_stats
+                self._tip_history.append(time.time(), int(node_stats['lastBlockHeight']))
         except Exception as ex:
             if isinstance(ex, JcliError):
                 raise ex
         finally:
-            threadLock.release()
+            self._lock.release()
 
         return self._node_stats
 
-    # executes jcli and gets leaders - tells if the node runs as a leader or not
+    # gets leaders from the node - tells if the node runs as a leader or not
     def _get_leaders(self):
         try:
-            threadLock.acquire()
+            self._lock.acquire()
             if self._state == State.STARTED:
-                command = [self._jcli, "rest", "v0", "leaders", "get", "-h", self._host, "--output-format", "json"]
-                proc = Popen(command, stdout=PIPE, stderr=PIPE)
-
-                stdout, stderr = proc.communicate()
-                if proc.returncode != 0:
-                    raise JcliError('An error occurred while getting leaders', err = {'proc_ret_code': proc.returncode, 'err_code': 1, 'stdout': stdout.decode(), 'stderr': stderr.decode()})
-
-                self._leaders = json.loads(stdout.decode())
+                self._leaders = self._client.get_leaders()
 
                 self._last_time_check_leaders = datetime.now()
 
@@ -179,35 +200,28 @@ class Jormungandr(threading.Thread):
             if isinstance(ex, JcliError):
                 raise ex
         finally:
-            threadLock.release()
+            self._lock.release()
 
         return self._leaders
 
-    def get_last_block(self):
+    def get_last_block_header(self):
         if self._state == State.STARTED:
             stats = self.get_last_stats()
             if stats == None:
                 return None
 
-            command = [self._jcli, "rest", "v0", "block", stats['lastBlockHash'], "get", "-h", self._host]
-            proc = Popen(command, stdout=PIPE, stderr=PIPE)
-            stdout, stderr = proc.communicate()
-
-            if proc.returncode != 0:
-                raise JcliError('An error occurred while getting block from blockhash', err = {'proc_ret_code': proc.returncode, 'err_code': 1, 'stdout': stdout.decode(), 'stderr': stderr.decode()})
-
-            return stdout.decode()
+            return self._block_cache.get(stats['lastBlockHash'], self._client.get_block)
         else:
             log.warning('Cannot get block. {} is not running.'.format(self.get_name()))
 
     def get_supervisor_service_uptime(self):
-        proc_info = self._server.supervisor.getProcessInfo(self._supervisor_service_name)
+        proc_info = self._supervisor.get_process_info(self._supervisor_service_name)
         uptime = proc_info['now'] - proc_info['start']
 
         return uptime
 
     def get_supervisor_service_state(self):
-        proc_info = self._server.supervisor.getProcessInfo(self._supervisor_service_name)
+        proc_info = self._supervisor.get_process_info(self._supervisor_service_name)
 
         return proc_info['state']
 
@@ -221,8 +235,7 @@ class Jormungandr(threading.Thread):
             return False
 
     def set_state_from_supervisor(self):
-        proc_info = self._server.supervisor.getProcessInfo(self._supervisor_service_name)
-        pcode = proc_info['state']
+        pcode = self.get_supervisor_service_state()
         if pcode == 0 or pcode == 40:
             self._set_state(State.STOPPED)
         elif pcode == 20:
@@ -232,6 +245,28 @@ class Jormungandr(threading.Thread):
         else:
             self._set_state(State.UNKNOWN)
 
+    # reacts to a process state event pushed by supervisor without waiting for the next poll
+    # only the state lock is taken, the node lock may be held by a poll for up to the REST timeout
+    def on_supervisor_state(self, pcode):
+        exited = pcode in (0, 30, 100, 200)
+        with self._state_lock:
+            if exited:
+                if self._state != State.STOPPED:
+                    log.warning("Node {} exited (supervisor state {}).".format(self.get_name(), pcode))
+                self._state = State.STOPPED
+            elif pcode == 1000:
+                self._state = State.UNKNOWN
+            else:
+                return
+            self._state_events += 1
+
+        # a poll holding the node clears the stats itself when it sees the event
+        if exited and self._lock.try_acquire():
+            try:
+                self._clean_up()
+            finally:
+                self._lock.release()
+
     def get_api_endpoint(self):
         return self._host + "/v0"
 
@@ -247,11 +282,21 @@ class Jormungandr(threading.Thread):
     def get_name(self):
         return self._node_name
 
+    def get_supervisor_service_name(self):
+        return self._supervisor_service_name
+
+    def get_lock_stats(self):
+        return self._lock.get_stats()
+
     def switch_to_default_peers_bootstrap(self):
-        self._jmconfig_copy = self._jmconfig
+        # keep the original trusted peers, switching again must not overwrite them with the default ones
+        if self._jmconfig_copy is None:
+            self._jmconfig_copy = self._jmconfig
         if self._jmconfig != None:
             log.debug("Switching to default peers config: {}".format(json.dumps(self._jmconfig['p2p'])))
-            self._jmconfig['p2p']['trusted_peers'] = self._default_peers
+            # the config comes from a read-only snapshot
+            self._jmconfig = thaw(self._jmconfig)
+            self._jmconfig['p2p']['trusted_peers'] = thaw(self._default_peers)
             self._save_config()
             self._default_peers_enabled = True
 
@@ -279,14 +324,15 @@ class Jormungandr(threading.Thread):
             return self._tip_timeout / 60
 
     def is_stuck(self, max_tip):
-        if self._previous_node_stats is None:
+        self._last_max_tip = max_tip
+        if len(self._tip_history) == 0:
             return False    # we don't have the info yet
 
-        if self._previous_node_stats['lastBlockHeight'] == int(self._node_stats['lastBlockHeight']) and (datetime.now() - self._node_stats_time).seconds > self._tip_timeout:
-            log.warning("Node's tip has been the same ({}) for {} seconds.".format(self._node_stats['lastBlockHeight'], self._tip_timeout))
+        if self._tip_history.seconds_since_height_change(time.time()) > self._tip_timeout:
+            log.warning("Node's tip has been the same ({}) for {} seconds.".format(self._tip_history.get_latest_height(), self._tip_timeout))
             return True
 
-        if abs(int(self._node_stats['lastBlockHeight']) - max_tip) > self._tip_diff_threshold:
+        if abs(self._tip_history.get_latest_height() - max_tip) > self._tip_diff_threshold:
             log.warning("Node is off by more than {} from max tip {}".format(self._tip_diff_threshold, max_tip))
             return True
 
@@ -302,7 +348,7 @@ class Jormungandr(threading.Thread):
         if self.is_supervisor_node_up() and (self._state == State.STARTED or self._state == State.BOOTSTRAPPING or force == True):
             self._log_action('stop', reason)
 
-            success = self._server.supervisor.stopProcess(self._supervisor_service_name)
+            success = self._supervisor.stop_process(self._supervisor_service_name)
             if success != True or self.is_supervisor_node_up():
                 raise SupervisorError("Failed to stop {}".format(self._supervisor_service_name), {'code': 1})
 
@@ -316,7 +362,7 @@ class Jormungandr(threading.Thread):
             self._update_config_if_new()
             self._log_action('start', reason)
 
-            success = self._server.supervisor.startProcess(self._supervisor_service_name)
+            success = self._supervisor.start_process(self._supervisor_service_name)
 
             if success != True or not self.is_supervisor_node_up():
                 raise SupervisorError("Failed to start {}".format(self._supervisor_service_name), {'code': 1})
@@ -330,6 +376,7 @@ class Jormungandr(threading.Thread):
             log.info("Service {} is already started.".format(self.get_name()))
 
     def restart(self, reason=''):
+        NODE_RESTARTS.inc(self.get_name(), reason)
         self.stop_node(reason=reason)
         self.start_node(reason)
 
@@ -339,26 +386,42 @@ class Jormungandr(threading.Thread):
                 return True
         return False
 
+    # leaders logs are cached for leaders_logs_ttl seconds and dropped when the node restarts or the epoch changes -
+    # a response identical to the previous one is not parsed and filtered again
+    def _refresh_leaders_logs(self):
+        current_epoch = self.get_current_epoch()
+        if self._leaders_logs_fetched_at != None and self._leaders_logs_epoch == current_epoch and time.monotonic() - self._leaders_logs_fetched_at < self._leaders_logs_ttl:
+            return
+
+        with self._lock:
+            response = self._client.get_leaders_logs_raw()
+            response_digest = hashlib.sha1(response).hexdigest()
+            if response_digest != self._leaders_logs_response_digest or self._leaders_logs_epoch != current_epoch:
+                slots_assigned_filtered = []
+                for slot in json.loads(response.decode()):
+                    if slot['scheduled_at_date'].split('.')[0] == current_epoch and slot['finished_at_time'] == None:
+                        slots_assigned_filtered.append(slot)
+
+                self._leaders_logs = slots_assigned_filtered
+                self._leaders_logs_digest = get_slots_digest(slots_assigned_filtered)
+                self._leaders_logs_response_digest = response_digest
+                self._leaders_logs_epoch = current_epoch
+            self._leaders_logs_fetched_at = time.monotonic()
+
     def get_leaders_logs(self):
         if self._state != State.STARTED:
             return
 
-        command = [self._jcli, "rest", "v0", "leaders", "logs", "get", "-h", self._host, "--output-format", "json"]
-        proc = Popen(command, stdout=PIPE, stderr=PIPE)
+        self._refresh_leaders_logs()
+        return self._leaders_logs
 
-        leaders = None
-        stdout, stderr = proc.communicate()
-        if proc.returncode != 0:
-            raise JcliError('Could not get leaders.', err = {'proc_ret_code': proc.returncode, 'err_code': 1, 'stdout': stdout.decode(), 'stderr': stderr.decode()})
-
-        slots_assigned = json.loads(stdout.decode())
-        current_epoch = self.get_current_epoch()
-        slots_assigned_filtered = []
-        for slot in slots_assigned:
-            if slot['scheduled_at_date'].split('.')[0] == current_epoch and slot['finished_at_time'] == None:
-                slots_assigned_filtered.append(slot)
+    # digest of the scheduled slot dates - it only changes when the node's schedule does
+    def get_leaders_logs_digest(self):
+        if self._state != State.STARTED:
+            return
 
-        return slots_assigned_filtered
+        self._refresh_leaders_logs()
+        return self._leaders_logs_digest
 
     # get leaders of the node - only executes command if refresh interval is met otherwise returns cached value
     def get_leaders(self):
@@ -370,19 +433,11 @@ class Jormungandr(threading.Thread):
 
     def unregister_leader(self, id):
         try:
-            threadLock.acquire()
+            self._lock.acquire()
 
             if self.get_state() == State.STARTED:
-                command = [self._jcli, "rest", "v0", "leaders", "delete", str(id), "-h", self._host]
-                proc = Popen(command, stdout=PIPE, stderr=PIPE)
-                stdout, stderr = proc.communicate()
-                if proc.returncode != 0:
-                    raise JcliError('An error occurred while deleting leader', err = {'proc_ret_code': proc.returncode, 'err_code': 1, 'stdout': stdout.decode(), 'stderr': stderr.decode()})
-
-                lines = stdout.decode()
-
-                if stdout.decode().lower().find('success') == -1:
-                    raise JcliError('An error occurred while unregistering node leader {}'.format(self.get_name()), err = {'proc_ret_code': proc.returncode, 'err_code': 1, 'stdout': stdout.decode(), 'stderr': stderr.decode()})
+                if not self._client.delete_leader(id):
+                    raise JcliError('An error occurred while unregistering node leader {}'.format(self.get_name()), err = {'err_code': JError.UNKNOWN, 'leader_id': id})
 
                 self._get_leaders()
                 log.debug("Unregistered leader {}".format(self.get_name()))
@@ -390,48 +445,92 @@ class Jormungandr(threading.Thread):
             if isinstance(ex, JcliError):
                 raise ex
         finally:
-            threadLock.release()
+            self._lock.release()
+
+    # the registration payload is prepared in advance so a leader switch only costs the request itself
+    def _prepare_leader(self):
+        try:
+            self._leader_payload = self._client.prepare_leader(self._leader_secret_file)
+        except Exception as ex:
+            self._leader_payload = None
+            log.warning("Could not prepare leader registration for {}: {}".format(self._node_name, ex))
+
+    # registers the prepared leader without verifying it - used by the manager's leader failover
+    def post_prepared_leader(self):
+        with self._lock:
+            if self._leader_payload == None:
+                self._prepare_leader()
+            if self._leader_payload == None:
+                return self._client.post_leader(self._leader_secret_file)
+
+            return self._client.post_prepared_leader(self._leader_payload)
+
+    # deletes the leader without verifying it - used by the manager's leader failover
+    def delete_leader(self, id):
+        with self._lock:
+            return self._client.delete_leader(id)
+
+    def refresh_leaders(self):
+        return self._get_leaders()
 
     def register_leader(self):
         try:
             result = None
-            threadLock.acquire()
+            self._lock.acquire()
             if self.get_state() == State.STARTED:
-                command = [self._jcli, "rest", "v0", "leaders", "post", "-f", self._leader_secret_file, "-h", self._host]
-                proc = Popen(command, stdout=PIPE, stderr=PIPE)
-                stdout, stderr = proc.communicate()
-                if proc.returncode != 0:
-                    raise JcliError('An error occurred while registering node {} as leader.'.format(self.get_name()), err = {'proc_ret_code': proc.returncode, 'err_code': 1, 'stdout': stdout.decode(), 'stderr': stderr.decode()})
+                result = self._client.post_leader(self._leader_secret_file)
 
                 leaders = self._get_leaders()
                 if leaders != None:
                     log.debug("Found registered leader(s): {}".format(len(leaders)))
                     if len(leaders) == 0:
-                        raise JcliError('Register leader succeeded but leader cannot be found.')
+                        raise JcliError('Register leader succeeded but leader cannot be found.', err = {'err_code': JError.UNKNOWN, 'leader_id': result})
 
                 log.info("Registered node {} as leader.".format(self.get_name()))
-                result = stdout.decode().strip()
         except Exception as ex:
             if isinstance(ex, JcliError):
                 raise ex
         finally:
-            threadLock.release()
+            self._lock.release()
 
         return result
 
+    def get_seconds_since_tip_change(self):
+        return self._tip_history.seconds_since_height_change(time.time())
+
+    def get_tip_history(self):
+        return self._tip_history
+
+    def get_poll_failures(self):
+        return self._poll_failures
+
+    def get_initial_poll_delay(self):
+        return self._poll_scheduler.get_initial_delay(self)
+
+    def get_next_poll_delay(self):
+        return self._poll_scheduler.get_next_delay(self)
+
+    # one polling iteration of the node - used by the node thread and by the asyncio engine
+    def poll(self):
+        try:
+            self._update_config_if_new()
+            self._get_stats()
+            self._poll_failures = 0
+            if not self._default_peers_enabled and not self._jormungandr_nodes:
+                self.switch_to_default_peers_bootstrap()
+            elif self._default_peers_enabled and self._jormungandr_nodes:
+                self.switch_to_fast_bootstrap()
+        except JcliError as e:
+            self._poll_failures += 1
+            e.print_error()
+            if (e._errors['err_code'] == JError.FAILED_REST_REQUEST and self.get_state() == State.STARTED) or e._errors['err_code'] == JError.ADDRESS_ALREADY_IN_USE:
+                self.stop_node(force=True, reason='JcliError: {}'.format(e._errors['err_code']))
+
     def run(self):
         log.info("Started thread {}".format(self._node_name))
+        time.sleep(self.get_initial_poll_delay())
         while(True):
             try:
-                self._update_config_if_new()
-                self._get_stats()
-                if not self._default_peers_enabled and not self._jormungandr_nodes:
-                    self.switch_to_default_peers_bootstrap()
-                elif self._default_peers_enabled and self._jormungandr_nodes:
-                    self.switch_to_fast_bootstrap()
-            except JcliError as e:
-                e.print_error()
-                if (e._errors['err_code'] == JError.FAILED_REST_REQUEST and self.get_state() == State.STARTED) or e._errors['err_code'] == JError.ADDRESS_ALREADY_IN_USE:
-                    self.stop_node(force=True, reason='JcliError: {}'.format(e._errors['err_code']))
+                self.poll()
             finally:
-                time.sleep(self._refresh_interval)
\ No newline at end of file
+                time.sleep(self.get_next_poll_delay())
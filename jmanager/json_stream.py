@@ -0,0 +1,122 @@
+import json
+import re
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_IN_STRING = re.compile(r'[\\"]')
+
+# extracts selected fields of a top level JSON object from text fed in chunks - everything else is skipped
+# without being parsed or kept, so memory stays bounded whatever the size of the document
+class JsonFieldScanner():
+    _MAX_KEY_SIZE = 256
+    _MAX_VALUE_SIZE = 65536
+
+    def __init__(self, fields):
+        self._fields = set(fields)
+        self._values = {}
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key = None            # parts of the key being read
+        self._key_size = 0
+        self._current_key = None
+        self._value = None          # parts of the value being captured
+        self._value_size = 0
+
+    def is_done(self):
+        return len(self._values) == len(self._fields)
+
+    def get_values(self):
+        return self._values
+
+    def _finish_value(self, tail):
+        self._value.append(tail)
+        try:
+            self._values[self._current_key] = json.loads(''.join(self._value))
+        except ValueError as e:
+            log.error("Could not parse field {}: {}".format(self._current_key, e))
+        self._value = None
+        self._current_key = None
+
+    def feed(self, text):
+        pos = 0
+        end = len(text)
+        key_from = 0
+        value_from = 0
+        while pos < end and not self.is_done():
+            if self._escape:
+                self._escape = False
+                pos += 1
+                continue
+
+            if self._in_string:
+                m = _IN_STRING.search(text, pos)
+                if m is None:
+                    pos = end
+                    break
+                pos = m.end()
+                if m.group() == '\\':
+                    self._escape = True
+                elif self._key is not None:
+                    self._in_string = False
+                    self._key.append(text[key_from:pos - 1])
+                    self._current_key = ''.join(self._key)
+                    self._key = None
+                else:
+                    self._in_string = False
+                continue
+
+            m = _STRUCTURAL.search(text, pos)
+            if m is None:
+                pos = end
+                break
+            c = m.group()
+            pos = m.end()
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._expect_key = False
+                    self._key = []
+                    self._key_size = 0
+                    key_from = pos
+            elif c == '{' or c == '[':
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = c == '{'
+            elif c == '}' or c == ']':
+                if self._depth == 1 and self._value is not None:
+                    self._finish_value(text[value_from:pos - 1])
+                self._depth -= 1
+            elif c == ',' and self._depth == 1:
+                if self._value is not None:
+                    self._finish_value(text[value_from:pos - 1])
+                self._current_key = None
+                self._expect_key = True
+            elif c == ':' and self._depth == 1 and self._current_key in self._fields and self._current_key not in self._values:
+                self._value = []
+                self._value_size = 0
+                value_from = pos
+
+        # the chunk ended in the middle of a key or a captured value
+        if pos >= end:
+            if self._key is not None:
+                self._key_size += end - key_from
+                if self._key_size > JsonFieldScanner._MAX_KEY_SIZE:
+                    self._key = None
+                else:
+                    self._key.append(text[key_from:])
+            if self._value is not None:
+                self._value_size += end - value_from
+                if self._value_size > JsonFieldScanner._MAX_VALUE_SIZE:
+                    log.error("Field {} is too big, skipping it.".format(self._current_key))
+                    self._value = None
+                    self._current_key = None
+                else:
+                    self._value.append(text[value_from:])
+
+        return self.is_done()
@@ -0,0 +1,61 @@
+import threading
+import time
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# reentrant lock which counts how often and for how long threads had to wait for it
+class InstrumentedLock():
+    def __init__(self, name):
+        self._name = name
+        self._lock = threading.RLock()
+        self._acquisitions = 0
+        self._contentions = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def acquire(self):
+        if not self._lock.acquire(blocking=False):
+            started = time.monotonic()
+            self._lock.acquire()
+            waited = time.monotonic() - started
+
+            # counters are only updated while holding the lock
+            self._contentions += 1
+            self._wait_time += waited
+            if waited > self._max_wait_time:
+                self._max_wait_time = waited
+
+        self._acquisitions += 1
+        return True
+
+    # False right away when another thread holds the lock
+    def try_acquire(self):
+        if not self._lock.acquire(blocking=False):
+            return False
+        self._acquisitions += 1
+        return True
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.release()
+
+    def get_name(self):
+        return self._name
+
+    def get_stats(self):
+        return {
+            'name': self._name,
+            'acquisitions': self._acquisitions,
+            'contentions': self._contentions,
+            'wait_time': self._wait_time,
+            'max_wait_time': self._max_wait_time
+        }
@@ -1,4 +1,5 @@
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from logging import getLogger
 import json
@@ -7,20 +8,38 @@ import time
 import os
 from jormungandr import Jormungandr
 from error_types import *
-from jm_enums import State
+from jm_enums import State, JError
 from pool_tool import PoolTool
 from jm_email import Email
+from alert_dispatcher import AlertDispatcher
+from locks import InstrumentedLock
+from supervisor_client import SupervisorClient
+from supervisor_events import EventReceiver
+from block import BlockCache
+from slot_schedule import SlotSchedule, EMPTY_SLOTS_DIGEST
+from restart_journal import create_restart_journal
+from restart_scheduler import RestartScheduler
+from start_orchestrator import StartOrchestrator
+from tick_profiler import TickProfiler
+from metrics import REGISTRY, MetricsServer, TICK_SECONDS, LEADER_FAILOVER_SECONDS, NODE_TIP, NODE_TIP_LAG, NODE_BLOCK_RATE, NODE_PEER_LAG, NODE_STATE, NODE_UPTIME, LOCK_CONTENTIONS, LOCK_WAIT_SECONDS
 import utils
 
 log = getLogger(utils.get_module_name(os.path.basename(__file__)))
 
 class Manager(threading.Thread):
     _LOOP_INTERVAL = 1      # how fast main loop turns (in seconds)
+    _LOCK_STATS_INTERVAL = 300      # how often lock contention is logged (in seconds)
 
     def __init__(self, config):
         threading.Thread.__init__(self, name='manager')
         self._config = config
-        self._config_last_updated = None
+        self._config_generation = None
+        self._supervisor = None
+        self._tick_profiler = None
+        self._pool_tool_profiler = None
+        self._alerts = None
+        self._restarts = None
+        self._starts = None
         self._update_config_if_new()
 
         self._max_node_reported_tip = 0
@@ -28,34 +47,103 @@ class Manager(threading.Thread):
         self._slots_assigned = []
         self.node_threads = []
         self._pool_tool = PoolTool(self._config)
+        self._block_cache = BlockCache(self._config.get_config_jormungandr().get('block_cache_size', 64))
+        self._journal = create_restart_journal(self._config.get_config_jormungandr())
+        self._journal.start()
+        # serializes cross-node leader switching (node locks are always taken after this one)
+        self._leader_switch_lock = InstrumentedLock('leader_switch')
+        # the two nodes of a leader switch are called at the same time
+        self._failover_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='failover')
+        self._lock_stats_logged_at = time.monotonic()
+        # set when something happened that the manager should react to before the next loop interval
+        self._wakeup = threading.Event()
+        self._wakeup_handler = None
 
         config_manager_settings = self._config.get_config_manager()
         for node_config in config_manager_settings['nodes']:
-            node_thread = Jormungandr(self._config, node_config['node_name'], self.node_threads)
+            node_thread = Jormungandr(self._config, node_config['node_name'], self.node_threads, self._supervisor, self._block_cache, self._journal)
             self.node_threads.append(node_thread)
-            node_thread.start()
-
-        log.info('Created {} threads.'.format(len(self.node_threads)))
+            # with the asyncio engine nodes are polled from the event loop instead of their own threads
+            if self._engine == 'threads':
+                node_thread.start()
+
+        log.info('Created {} nodes (engine: {}).'.format(len(self.node_threads), self._engine))
+        # node requests of the tick are made for all nodes at once
+        self._node_executor = ThreadPoolExecutor(max_workers=max(1, len(self.node_threads)), thread_name_prefix='tick')
+
+        self._supervisor_events = None
+        config_events = self._config.get_config_jormungandr().get('supervisor_events', {})
+        if config_events.get('enabled', 0) == 1:
+            self._supervisor_events = EventReceiver(config_events['listen'], self._on_supervisor_event)
+            self._supervisor.set_push_mode(True)
+            self._supervisor_events.start()
+
+        REGISTRY.register_collector(self._collect_metrics)
+        self._metrics_server = None
+        config_metrics = config_manager_settings['manager'].get('metrics', {})
+        if config_metrics.get('enabled', 0) == 1:
+            self._metrics_server = MetricsServer(config_metrics['listen'])
+            self._metrics_server.start()
 
     def _update_config_if_new(self):
-        if self._config.is_config_update_needed(self._config_last_updated):
+        snapshot = self._config.get_snapshot()
+        if self._config_generation != snapshot.generation:
+            self._config_generation = snapshot.generation
 
-            config_manager_settings = self._config.get_config_manager()
+            config_manager_settings = snapshot.get_config_manager()
             self._timeout_between_restarts = config_manager_settings['manager']['timeout_between_restarts']
             self._min_scheduled_time_difference = config_manager_settings['manager']['min_scheduled_time_difference']
             self._send_slots_within_time = config_manager_settings['manager']['send_slots_within']
+
+            # the leader and the last healthy node are not restarted this close to a slot
+            config_guard = config_manager_settings['manager'].get('restart_guard', {})
+            guard_before = config_guard.get('before', self._min_scheduled_time_difference)
+            guard_after = config_guard.get('after', 60)
+            if self._restarts is None:
+                self._restarts = RestartScheduler(guard_before, guard_after)
+            else:
+                self._restarts.configure(guard_before, guard_after)
+
+            # a cold start only lets max_bootstrapping nodes bootstrap at once
+            config_cold_start = config_manager_settings['manager'].get('cold_start', {})
+            cold_start_params = (config_cold_start.get('max_bootstrapping', 1), self._timeout_between_restarts,
+                snapshot.get_config_jormungandr()['tip_diff_threshold'], config_cold_start.get('timeout', 7200))
+            if self._starts is None:
+                self._starts = StartOrchestrator(*cold_start_params)
+            else:
+                self._starts.configure(*cold_start_params)
+            self._engine = config_manager_settings['manager'].get('engine', 'threads')
             self._slots_sent_epoch = 0
-            
-            config_email = self._config.get_config_email()
-            if (config_email['email_alerts'] == 1):
-                self._email = Email(self._config)
+            self._slots_prepared_epoch = 0
+
+            config_profiler = config_manager_settings['manager'].get('tick_profiler', {})
+            if self._tick_profiler is None:
+                self._tick_profiler = TickProfiler(config_profiler)
+                # the pooltool refresh runs concurrently with the tick in the asyncio engine, so it is profiled on its own
+                self._pool_tool_profiler = TickProfiler(config_profiler, 'pooltool refresh')
+            else:
+                self._tick_profiler.configure(config_profiler)
+                self._pool_tool_profiler.configure(config_profiler)
+
+            supervisor_url = snapshot.get_config_jormungandr()['supervisor_rest_api_url']
+            if self._supervisor is None:
+                self._supervisor = SupervisorClient(supervisor_url)
             else:
-                self._email = None
+                self._supervisor.set_url(supervisor_url)
+
+            # the dispatcher's Email picks up later config changes by itself
+            config_email = snapshot.get_config_email()
+            if (config_email['email_alerts'] == 1):
+                if self._alerts is None:
+                    self._alerts = AlertDispatcher(Email(self._config))
+                    self._alerts.start()
+            elif self._alerts is not None:
+                self._alerts.stop()
+                self._alerts = None
 
             epoch_time = config_manager_settings['manager']['epoch_start_time']
             self._epoch_start_time = {'hour': epoch_time['hour'], 'minute': epoch_time['minute'], 'second': epoch_time['second'] } # UTC time
 
-            self._config_last_updated = self._config.get_latest_config_timestamp()
             self._pool_id = self._read_file(config_manager_settings['manager']['pool_id_file']).strip()
             self._genesis_hash = self._read_file(config_manager_settings['manager']['genesis_hash_file']).strip()
 
@@ -80,7 +168,7 @@ class Manager(threading.Thread):
             new_tip = node.get_tip()
             if new_tip != None and new_tip > self._max_node_reported_tip:
                 self._max_node_reported_tip = new_tip
-                self._pool_tool.refresh_data_for_tip_update(node.get_last_stats(), node.get_last_block(), self._pool_id, self._genesis_hash)
+                self._pool_tool.refresh_data_for_tip_update(node.get_last_stats(), node.get_last_block_header(), self._pool_id, self._genesis_hash)
         else:
             log.warning('Node {} not up (state: {})!'.format(node.get_name(), node.get_state()))
 
@@ -114,25 +202,49 @@ class Manager(threading.Thread):
             if node.is_leader() and leaders != None and len(leaders) > 0:
                 self._leader_nodes.append({'id': leaders[0], 'node': node})
 
-        leaders_count = len(self._leader_nodes)
-        if leaders_count == 1:
-            if node_with_max_tip.get_name() != self._leader_nodes[0]['node'].get_name():
-                log.info("Switching from leader node {} to better synced node {}.".format(self._leader_nodes[0]['node'].get_name(), node_with_max_tip.get_name()))
-                node_with_max_tip.register_leader()
-                log.info("Registered leader {}.".format(node_with_max_tip.get_name()))
-                self._leader_nodes[0]['node'].unregister_leader(self._leader_nodes[0]['id'])
-                log.info("Unregistered leader {}.".format(self._leader_nodes[0]['node'].get_name()))
-        elif leaders_count > 1:
-            log.warning("Got multiple ({}) leaders!".format(leaders_count))
-            for leader in self._leader_nodes:
-                if leader['node'].get_name() != node_with_max_tip.get_name():
-                    leader['node'].unregister_leader(leader['id'])
-                    log.info("Unregistered leader {}.".format(leader['node'].get_name()))
-        elif leaders_count == 0 and (node_with_max_tip != None):
-            log.warning("No leader nodes found. Registering node '{}' as leader.".format(node_with_max_tip.get_name()))
-            is_registered = node_with_max_tip.register_leader()
-            if is_registered == "1":
-                log.debug("Registered node {}".format(node_with_max_tip.get_name()))
+        with self._leader_switch_lock:
+            leaders_count = len(self._leader_nodes)
+            if leaders_count == 1:
+                if node_with_max_tip.get_name() != self._leader_nodes[0]['node'].get_name():
+                    log.info("Switching from leader node {} to better synced node {}.".format(self._leader_nodes[0]['node'].get_name(), node_with_max_tip.get_name()))
+                    self._switch_leader(self._leader_nodes[0], node_with_max_tip)
+            elif leaders_count > 1:
+                log.warning("Got multiple ({}) leaders!".format(leaders_count))
+                for leader in self._leader_nodes:
+                    if leader['node'].get_name() != node_with_max_tip.get_name():
+                        leader['node'].unregister_leader(leader['id'])
+                        log.info("Unregistered leader {}.".format(leader['node'].get_name()))
+            elif leaders_count == 0 and (node_with_max_tip != None):
+                log.warning("No leader nodes found. Registering node '{}' as leader.".format(node_with_max_tip.get_name()))
+                is_registered = node_with_max_tip.register_leader()
+                if is_registered == "1":
+                    log.debug("Registered node {}".format(node_with_max_tip.get_name()))
+
+    # runs both calls at once and returns their results, an exception of either call is raised after both are done
+    def _call_both(self, first, second):
+        futures = [self._failover_executor.submit(first), self._failover_executor.submit(second)]
+        return [future.result() for future in futures]
+
+    # fast leader failover - the new leader's registration is prepared in advance, the post to the new leader and the
+    # delete on the old one are sent at the same time over the nodes' open connections, and both nodes are then
+    # verified at the same time, so the switch takes two round-trips - if only one of the requests succeeded, the
+    # next tick sees no leader or two leaders and repairs it
+    def _switch_leader(self, old_leader, new_node):
+        started = time.monotonic()
+        result = 'failed'
+        try:
+            new_id, _ = self._call_both(new_node.post_prepared_leader, lambda: old_leader['node'].delete_leader(old_leader['id']))
+            new_leaders, old_leaders = self._call_both(new_node.refresh_leaders, old_leader['node'].refresh_leaders)
+            if new_leaders == None or len(new_leaders) == 0 or (old_leaders != None and len(old_leaders) > 0):
+                raise JcliError('Leader switch from {} to {} could not be verified.'.format(old_leader['node'].get_name(), new_node.get_name()),
+                    err = {'err_code': JError.UNKNOWN, 'leader_id': new_id, 'new_leaders': new_leaders, 'old_leaders': old_leaders})
+
+            result = 'ok'
+        finally:
+            duration = time.monotonic() - started
+            LEADER_FAILOVER_SECONDS.observe(duration, result)
+
+        log.info("Switched leader from {} to {} in {:.1f} ms.".format(old_leader['node'].get_name(), new_node.get_name(), duration * 1000))
 
     def _get_epoch_start_datetime(self):
         dt = datetime.utcnow()
@@ -147,54 +259,42 @@ class Manager(threading.Thread):
 
         current_epoch = self._leader_nodes[0]['node'].get_current_epoch()
 
-        for item in self._slots_assigned:
-            if item['epoch'] == current_epoch:
+        for schedule in self._slots_assigned:
+            if schedule.epoch == current_epoch:
                 for node in self.node_threads:
-                    if node.get_name() not in item['nodes']:
-                        slots_assigned = node.get_leaders_logs()
-                        if slots_assigned is None:
+                    if not schedule.has_node(node.get_name()):
+                        # leaders logs are cached by the node, the digest is only recomputed when they change
+                        slots_digest = node.get_leaders_logs_digest()
+                        if slots_digest is None:
                             continue
 
-                        # we cannot compare the whole lists because they can have different creation dates
-                        # so we check just the scheduled slots
-                        valid_slots = []
-                        for s in item['slots']:
-                            valid_slots.append(s['scheduled_at_date'])
-                        valid_slots.sort()
-
-                        node_slots = []
-                        for s in slots_assigned:
-                            node_slots.append(s['scheduled_at_date'])
-                        node_slots.sort()
-
-                        if json.dumps(valid_slots) == json.dumps(node_slots):
-                            item['nodes'].append(node.get_name())
-                        elif len(slots_assigned) == 0:
-                            if len(item['slots']) > 0:
-                                # do get the closest scheduled slot time and if we are far enough from it (self._min_scheduled_time_difference)
-                                # and if there are any other nodes up, restart the node
-                                dt = datetime.utcnow()
-                                closest_scheduled_slot = None
-                                for slot in item['slots']:
-                                    # python3.8 can automatically convert time but python3.6 needs to get rid of ':'
-                                    ts_dt = datetime.strptime(slot['scheduled_at_time'][:19],'%Y-%m-%dT%H:%M:%S')
-                                    if ts_dt < dt:
-                                        continue
-
-                                    if closest_scheduled_slot is None:
-                                        closest_scheduled_slot = ts_dt
-
-                                    closest_scheduled_slot = ts_dt if ts_dt < closest_scheduled_slot else closest_scheduled_slot
-
-                                if self._is_any_other_node_up(node) and closest_scheduled_slot != None and (closest_scheduled_slot - datetime.utcnow()).seconds > self._min_scheduled_time_difference and node.get_state() == State.STARTED:
-                                    log.debug("Restarting node so it can get its assigned slots schedule.")
-                                    node.restart(reason='leader logs')
+                        if schedule.matches(slots_digest):
+                            schedule.add_node(node.get_name())
+                        elif slots_digest == EMPTY_SLOTS_DIGEST:
+                            if len(schedule) > 0:
+                                # if there are slots left and any other nodes up, restart the node - the restart scheduler
+                                # keeps it from happening too close to a slot
+                                if self._is_any_other_node_up(node) and schedule.get_next_slot_time(time.time()) != None and node.get_state() == State.STARTED:
+                                    self._restarts.request(node, 'leader logs', self._restart_for_leaders_logs)
                             else:
-                                log.warning('Node {} does not report any slots assigned while other nodes do: {}'.format(node.get_name(), item['nodes']))
-                        else:
-                            pass
+                                log.warning('Node {} does not report any slots assigned while other nodes do: {}'.format(node.get_name(), sorted(schedule.get_nodes())))
+
+    # jormungandr computes the schedule of the whole epoch when it enters it, so once any slot of the epoch is in the
+    # leaders logs the schedule is complete - a pool without slots in the epoch only knows for sure once it is recorded
+    def _is_schedule_known(self, epoch):
+        if any(schedule.epoch == epoch for schedule in self._slots_assigned):
+            return True
+
+        slots = self._leader_nodes[0]['node'].get_leaders_logs()
+        if slots is None:
+            return False
+        prefix = '{}.'.format(epoch)
+        return any(slot['scheduled_at_date'].startswith(prefix) for slot in slots)
 
     def _send_slots(self):
+        # failed submissions are retried from the outbox whenever they are due
+        self._pool_tool.retry_slots()
+
         # send slots too pool tool (only send slots if between _send_slots_within_time in epoch and _send_slots_within_time + 60 )
         if len(self._leader_nodes) == 0:
             return
@@ -203,12 +303,18 @@ class Manager(threading.Thread):
         if self._slots_sent_epoch == current_epoch:
             return
 
+        # the submission is built as soon as the leader reports the epoch's schedule, the send window only transmits it
+        if self._slots_prepared_epoch != current_epoch and self._is_schedule_known(current_epoch):
+            if self._pool_tool.prepare_slots(self._leader_nodes[0]['node'].get_api_endpoint(), self._pool_id, self._genesis_hash, current_epoch):
+                self._slots_prepared_epoch = current_epoch
+
         epoch_start_time = self._get_epoch_start_datetime()
         dt = datetime.utcnow()
         if dt > epoch_start_time:
             dtd = (dt - epoch_start_time).seconds
-            if dtd > self._send_slots_within_time and dtd < (self._send_slots_within_time + 60):
-                self._pool_tool.send_slots(self._leader_nodes[0]['node'].get_api_endpoint(), self._pool_id, self._genesis_hash)
+            if dtd > self._send_slots_within_time and dtd < (self._send_slots_within_time + 60) and self._slots_prepared_epoch == current_epoch:
+                # a failed send stays in the outbox and is retried from there
+                self._pool_tool.send_prepared_slots(current_epoch)
                 self._slots_sent_epoch = current_epoch
                 log.debug('Slots sent!')
 
@@ -218,8 +324,8 @@ class Manager(threading.Thread):
             return
 
         current_epoch = self._leader_nodes[0]['node'].get_current_epoch()
-        for item in self._slots_assigned:
-            if item['epoch'] == current_epoch:
+        for schedule in self._slots_assigned:
+            if schedule.epoch == current_epoch:
                 return
 
         epoch_start_time = self._get_epoch_start_datetime()
@@ -229,7 +335,10 @@ class Manager(threading.Thread):
             return
 
         slots_assigned = self._leader_nodes[0]['node'].get_leaders_logs()
-        self._slots_assigned.append({'epoch': current_epoch, 'nodes': [self._leader_nodes[0]['node'].get_name()], 'slots': slots_assigned})
+        if slots_assigned is None:
+            return
+
+        self._slots_assigned.append(SlotSchedule(current_epoch, slots_assigned, self._leader_nodes[0]['node'].get_name()))
         log.debug(json.dumps(slots_assigned, indent=4))
         self._send_email('slots_assigned', {'node_name': '', 'slots': slots_assigned})
 
@@ -238,87 +347,220 @@ class Manager(threading.Thread):
             del self._slots_assigned[0]
 
     def _send_email(self, email_template, template_parameters):
-        if self._email == None:
+        if self._alerts == None:
             return
 
-        self._email.send(email_template, template_parameters)
+        self._alerts.submit(email_template, template_parameters)
 
-    def run(self):
-        dt = datetime.now()
-        while True:
-            try:
-                time.sleep(Manager._LOOP_INTERVAL)
-                if (datetime.now() - dt).seconds < Manager._LOOP_INTERVAL:
-                    continue
+    def _on_supervisor_event(self, process_name, state):
+        self._supervisor.apply_event(process_name, state)
+        for node in self.node_threads:
+            if node.get_supervisor_service_name() == process_name:
+                node.on_supervisor_state(state)
+                self.wake()
+
+    # makes the manager tick right away instead of waiting for the rest of the loop interval
+    def wake(self):
+        self._wakeup.set()
+        if self._wakeup_handler is not None:
+            self._wakeup_handler()
+
+    def set_wakeup_handler(self, handler):
+        self._wakeup_handler = handler
+
+    def get_engine(self):
+        return self._engine
+
+    def get_lock_stats(self):
+        return [self._leader_switch_lock.get_stats()] + [node.get_lock_stats() for node in self.node_threads]
+
+    # called when metrics are scraped, so the polling path doesn't pay for these values
+    def _collect_metrics(self):
+        max_tip = self._get_max_tip()
+        now = time.time()
+        started = [node for node in self.node_threads if node.get_state() == State.STARTED]
+        best = max(started, key=lambda node: node.get_tip()) if len(started) > 0 else None
+        for node in self.node_threads:
+            NODE_STATE.set(node.get_state().value, node.get_name())
+            NODE_UPTIME.set(max(node.get_uptime(), 0), node.get_name())
+            if node.get_state() == State.STARTED:
+                NODE_TIP.set(node.get_tip(), node.get_name())
+                NODE_TIP_LAG.set(max(max_tip - node.get_tip(), 0), node.get_name())
+                # rate and lag over the same window the tip timeout is measured in
+                window = node.get_tip_timeout()
+                NODE_BLOCK_RATE.set(node.get_tip_history().block_rate(window, now), node.get_name())
+                NODE_PEER_LAG.set(node.get_tip_history().lag_against(best.get_tip_history(), window, now), node.get_name())
+            else:
+                NODE_TIP.remove(node.get_name())
+                NODE_TIP_LAG.remove(node.get_name())
+                NODE_BLOCK_RATE.remove(node.get_name())
+                NODE_PEER_LAG.remove(node.get_name())
+
+        for stats in self.get_lock_stats():
+            LOCK_CONTENTIONS.set(stats['contentions'], stats['name'])
+            LOCK_WAIT_SECONDS.set(stats['wait_time'], stats['name'])
+
+    def _log_lock_stats(self):
+        if time.monotonic() - self._lock_stats_logged_at < Manager._LOCK_STATS_INTERVAL:
+            return
+
+        self._lock_stats_logged_at = time.monotonic()
+        for stats in self.get_lock_stats():
+            log.debug("Lock {name}: {acquisitions} acquisitions, {contentions} contended, waited {wait_time:.3f}s in total (max {max_wait_time:.3f}s)".format(**stats))
 
-                self._pool_tool._update_config_if_new()
+    def refresh_pool_tool(self):
+        self._pool_tool_profiler.begin_tick()
+        try:
+            self._pool_tool._update_config_if_new()
+            with self._pool_tool_profiler.phase('status_summary'):
                 self._pool_tool._get_status_summary()
+            with self._pool_tool_profiler.phase('send_my_tip'):
                 self._pool_tool.send_my_tip()
+        finally:
+            self._pool_tool_profiler.end_tick()
+
+    def _prefetch_node(self, node):
+        node.get_leaders()
+        node.get_leaders_logs_digest()
+
+    # the requests are cached by the nodes (leaders for their refresh interval, leaders logs for their ttl), so a node
+    # is only asked when the sequential checks of the tick would ask it anyway - the tick no longer waits for the
+    # nodes one after another
+    def _prefetch_nodes(self):
+        futures = [self._node_executor.submit(self._prefetch_node, node) for node in self.node_threads if node.get_state() == State.STARTED]
+        for future in futures:
+            try:
+                future.result()
+            except JcliError as e:
+                e.print_error()
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
 
-                self._update_config_if_new()
+    # checks one node's state and acts accordingly
+    def _check_node(self, node):
+        self._update_max_tip(node)
+        # if this is first main loop run and there are no running_nodes, peers need to be adjusted
+        # as they won't be able to bootstrap from each other
+        if node.get_state() == State.STARTED:
+            if node.is_stuck(self._get_max_tip()):
+                # the restart scheduler makes sure a leader or the last running node is not restarted close to a slot
+                self._restarts.request(node, 'staled tip', self._restart_stuck_node)
+            return
+        elif node.get_state() == State.BOOTSTRAPPING:
+            # if bootstrapping for too long, restart
+            if node.get_seconds_since_bootstrap_started() > self._get_timeout_between_restarts('sec'):
+                self._restarts.request(node, 'boot timeout', self._restart_bootstrapping_node)
+            return
+        # restart app if it is not beeing restarted already
+        elif node.get_state() == State.STOPPED:
+            log.debug("{}: Stopped".format(node.get_name()))
+            # nodes of a cold start are started by the start orchestrator
+            if self._starts.is_pending(node):
+                return
+            # only restart node if at least one other node is running (fast rebooting)
+            if self._is_any_other_node_up(node):
+                log.info("Node {} is not running".format(node.get_name()))
+                node.start_node()
+            else:
+                self._start_all_nodes()
+            return
+
+        if not self._is_any_node_up():
+            log.warning("No nodes running. Starting all nodes.")
+            self._start_all_nodes()
+            return
+
+        log.warning("Node {} state is {}!".format(node.get_name(), node.get_state()))
+
+    def _restart_stuck_node(self, node):
+        log.info("Tip has not been updated for {} minutes. Restarting node {}.".format(node.get_tip_timeout('min'), node.get_name()))
+        node.restart(reason='staled tip')
+        self._send_email('stuck', {'timeout': node.get_tip_timeout('min'), 'node_name': node.get_name()})
+
+    def _restart_bootstrapping_node(self, node):
+        if self._is_any_other_node_up(node):
+            log.info("Bootstrapping for more than {} min. Restarting node {}.".format(self._get_timeout_between_restarts('min'), node.get_name()))
+            node.restart(reason='boot timeout')
+        else:
+            log.info("Bootstrapping for more than {} min. Restarting node {} with default peers config.".format(self._get_timeout_between_restarts('min'), node.get_name()))
+            node.switch_to_default_peers_bootstrap()
+            node.restart(reason='boot timeout')
+            node.switch_to_fast_bootstrap()
 
-                dt = datetime.now()
-                
-                # verify number of leaders and make sure only 1 leader is active
+        self._send_email('bootstrap_restart', {'timeout': self._get_timeout_between_restarts('min'), 'node_name': node.get_name()})
+
+    def _restart_for_leaders_logs(self, node):
+        log.debug("Restarting node {} so it can get its assigned slots schedule.".format(node.get_name()))
+        node.restart(reason='leader logs')
+
+    # one iteration of the manager's main loop - used by the manager thread and by the asyncio engine
+    def tick(self):
+        tick_started = time.monotonic()
+        self._tick_profiler.begin_tick()
+        try:
+            self._update_config_if_new()
+
+            # supervisor process states are fetched once per tick
+            self._supervisor.begin_tick()
+
+            # the nodes' leaders and leaders logs are refreshed concurrently, the checks below read them from the nodes' caches
+            with self._tick_profiler.phase('prefetch_nodes'):
+                self._prefetch_nodes()
+
+            # verify number of leaders and make sure only 1 leader is active
+            with self._tick_profiler.phase('check_leaders'):
                 self._check_leaders()
 
-                # get any new assigned slots
+            # get any new assigned slots
+            with self._tick_profiler.phase('check_slot_assignments'):
                 self._check_slot_assignments()
-                
-                # sends slots to pooltool if not done alreay
+
+            # sends slots to pooltool if not done alreay
+            with self._tick_profiler.phase('send_slots'):
                 self._send_slots()
-                
-                # restart nodes at the beginning of epoch so each of them can get its own slot assignment schedule
+
+            # restart nodes at the beginning of epoch so each of them can get its own slot assignment schedule
+            with self._tick_profiler.phase('restart_nodes_for_slot_assignments'):
                 self._restart_nodes_for_slot_assignments()
 
-                # check each node's state and act accordingly
-                for node in self.node_threads:
-                    self._update_max_tip(node)
-                    # if this is first main loop run and there are no running_nodes, peers need to be adjusted
-                    # as they won't be able to bootstrap from each other
-                    if node.get_state() == State.STARTED:
-                        if node.is_stuck(self._get_max_tip()):
-                            # need to check if the other node is running...cannot have all nodes rebooting at same time
-                            log.info("Tip has not been updated for {} minutes. Restarting node.".format(datetime.now(), node.get_tip_timeout('min')))
-                            node.restart(reason='staled tip')
-                            self._send_email('stuck', {'timeout': node.get_tip_timeout('min'), 'node_name': node.get_name()})
-                        continue
-                    elif node.get_state() == State.BOOTSTRAPPING:
-                        # if bootstrapping for too long, restart
-                        if node.get_seconds_since_bootstrap_started() > self._get_timeout_between_restarts('sec'):
-                            if self._is_any_other_node_up(node):
-                                log.info("Bootstrapping for more than {} min. Restarting node {}.".format(self._get_timeout_between_restarts('min'), node.get_name()))
-                                node.restart(reason='boot timeout')
-                            else:
-                                log.info("Bootstrapping for more than {} min. Restarting node {} with default peers config.".format(self._get_timeout_between_restarts('min'), node.get_name()))
-                                node.switch_to_default_peers_bootstrap()
-                                node.restart(reason='boot timeout')
-                                node.switch_to_fast_bootstrap()
-
-                            self._send_email('bootstrap_restart', {'timeout': self._get_timeout_between_restarts('min'), 'node_name': node.get_name()})
-                        continue
-                    # restart app if it is not beeing restarted already
-                    elif node.get_state() == State.STOPPED:
-                        log.debug("{}: Stopped".format(node.get_name()))
-                        # only restart node if at least one other node is running (fast rebooting)
-                        if self._is_any_other_node_up(node):
-                            log.info("Node {} is not running".format(node.get_name()))
-                            node.start_node()
-                        else:
-                            self._start_all_nodes()
-                        continue
-                    
-                    if not self._is_any_node_up():
-                        log.warning("No nodes running. Starting all nodes.")
-                        self._start_all_nodes()
-                        continue
-
-                    log.warning("Node {} state is {}!".format(node.get_name(), node.get_state()))
-            except JcliError as e:
-                e.print_error()
+            # check each node's state and act accordingly
+            for node in self.node_threads:
+                with self._tick_profiler.phase('node:{}'.format(node.get_name())):
+                    self._check_node(node)
+
+            # releases the nodes of a cold start as bootstrap slots get free
+            with self._tick_profiler.phase('start_orchestrator'):
+                self._starts.tick(self._get_max_tip())
+
+            # restarts requested above run in order of urgency unless they would endanger an upcoming slot
+            with self._tick_profiler.phase('restart_scheduler'):
+                self._restarts.process(self.node_threads, [leader['node'].get_name() for leader in self._leader_nodes], self._slots_assigned)
+
+            self._log_lock_stats()
+        except JcliError as e:
+            e.print_error()
+        except Exception as e:
+            log.error('Exception occured', exc_info=True)
+        finally:
+            TICK_SECONDS.observe(time.monotonic() - tick_started)
+            self._tick_profiler.end_tick()
+
+    def run(self):
+        dt = datetime.now()
+        while True:
+            woken = self._wakeup.wait(Manager._LOOP_INTERVAL)
+            self._wakeup.clear()
+            if not woken and (datetime.now() - dt).seconds < Manager._LOOP_INTERVAL:
+                continue
+
+            try:
+                self.refresh_pool_tool()
             except Exception as e:
                 log.error('Exception occured', exc_info=True)
 
+            dt = datetime.now()
+            self.tick()
+
     def _is_any_node_up(self):
         for node in self.node_threads:
             if node._state == State.STARTED:
@@ -338,14 +580,15 @@ class Manager(threading.Thread):
 
     # if none of the nodes is up then start all nodes
     def _start_all_nodes(self):
+        # nodes that got stopped since the cold start began join it
+        if self._starts.is_active():
+            self._starts.start(self.node_threads)
+            return
+
         if not self._is_any_node_up():
             if len(self.node_threads) > 0:
-                for node in self.node_threads:
-                    node.switch_to_default_peers_bootstrap()
-                    if (node.get_state() == State.STOPPED):
-                        node.start_node()
-                    else:
-                        log.info("Cannot start node. Node '{}' is not stopped ({}).".format(node.get_name(), node.get_state()))
+                # the orchestrator starts the stopped nodes concurrently, a few at a time
+                self._starts.start(self.node_threads)
             else:
                 log.info("There are no node threads to start.")
         else:
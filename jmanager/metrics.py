@@ -0,0 +1,190 @@
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from bisect import bisect_left
+import threading
+import time
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# minimal Prometheus-compatible metrics - updates are a dict lookup under a lock so they can sit on the
+# polling path, values which are cheap to read (tips, states, ...) are collected only when scraped
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _format_labels(labelnames, labelvalues, extra=''):
+    pairs = ['{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Registry():
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    # collectors are called right before the metrics are rendered
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+class _Metric():
+    _TYPE = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self._name = name
+        self._documentation = documentation
+        self._labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self._name, self._documentation), '# TYPE {} {}'.format(self._name, self._TYPE)]
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in values:
+            lines.append('{}{} {}'.format(self._name, _format_labels(self._labelnames, labelvalues), value))
+        return lines
+
+class Counter(_Metric):
+    _TYPE = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+class Gauge(_Metric):
+    _TYPE = 'gauge'
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def remove(self, *labelvalues):
+        with self._lock:
+            self._values.pop(labelvalues, None)
+
+class _HistogramTimer():
+    def __init__(self, histogram, labelvalues):
+        self._histogram = histogram
+        self._labelvalues = labelvalues
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self._histogram.observe(time.monotonic() - self._started, *self._labelvalues)
+
+class Histogram(_Metric):
+    _TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=_DEFAULT_BUCKETS, registry=REGISTRY):
+        _Metric.__init__(self, name, documentation, labelnames, registry)
+        self._buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                # bucket counts (last one is +Inf), sum
+                series = [[0] * (len(self._buckets) + 1), 0.0]
+                self._values[labelvalues] = series
+            series[0][bisect_left(self._buckets, value)] += 1
+            series[1] += value
+
+    # measures the duration of the with block
+    def time(self, *labelvalues):
+        return _HistogramTimer(self, labelvalues)
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self._name, self._documentation), '# TYPE {} {}'.format(self._name, self._TYPE)]
+        with self._lock:
+            values = [(labelvalues, list(series[0]), series[1]) for labelvalues, series in self._values.items()]
+        for labelvalues, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self._buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(self._name, _format_labels(self._labelnames, labelvalues, 'le="{}"'.format(bound)), cumulative))
+            lines.append('{}_sum{} {}'.format(self._name, _format_labels(self._labelnames, labelvalues), total))
+            lines.append('{}_count{} {}'.format(self._name, _format_labels(self._labelnames, labelvalues), cumulative))
+        return lines
+
+# metrics exported by jmanager
+NODE_TIP = Gauge('jmanager_node_tip', 'Last block height reported by the node.', ['node'])
+NODE_TIP_LAG = Gauge('jmanager_node_tip_lag', 'Blocks the node is behind the max tip of all nodes and pooltool.', ['node'])
+NODE_BLOCK_RATE = Gauge('jmanager_node_block_rate', 'Blocks per second the node added over its last tip timeout.', ['node'])
+NODE_PEER_LAG = Gauge('jmanager_node_peer_lag', 'Most blocks the node was behind the node with the highest tip over its last tip timeout.', ['node'])
+NODE_STATE = Gauge('jmanager_node_state', 'Node state (0 unknown, 1 started, 2 bootstrapping, 3 stopped).', ['node'])
+NODE_UPTIME = Gauge('jmanager_node_uptime_seconds', 'Node uptime reported by the node.', ['node'])
+NODE_RESTARTS = Counter('jmanager_node_restarts_total', 'Node restarts by reason.', ['node', 'reason'])
+NODE_ACTIONS = Counter('jmanager_node_actions_total', 'Node starts and stops by reason.', ['node', 'action', 'reason'])
+NODE_REQUEST_SECONDS = Histogram('jmanager_node_request_seconds', 'Latency of node REST/jcli calls.', ['node', 'client', 'call'])
+SUPERVISOR_REQUEST_SECONDS = Histogram('jmanager_supervisor_request_seconds', 'Latency of supervisor XML-RPC calls.', ['call'])
+POOLTOOL_REQUEST_SECONDS = Histogram('jmanager_pooltool_request_seconds', 'Latency of pooltool requests.', ['request'])
+POOLTOOL_QUEUE_DEPTH = Gauge('jmanager_pooltool_queue_depth', 'Pooltool requests waiting to be sent.')
+POOLTOOL_QUEUE_SECONDS = Histogram('jmanager_pooltool_queue_seconds', 'Time from queueing a pooltool request to its completion.', ['request'])
+LEADER_FAILOVER_SECONDS = Histogram('jmanager_leader_failover_seconds', 'Time from the leader switch decision to the verified switch.', ['result'])
+RESTARTS_QUEUED = Gauge('jmanager_restarts_queued', 'Node restarts waiting in the restart scheduler.')
+RESTARTS_DEFERRED = Counter('jmanager_restarts_deferred_total', 'Restarts postponed because the node was guarding an upcoming slot.', ['node', 'reason', 'guard'])
+RESTART_GUARDED_SLOTS = Counter('jmanager_restart_guarded_slots_total', 'Leader slots whose guard window kept a node from being restarted.', ['node'])
+RESTART_DEFERRED_SECONDS = Histogram('jmanager_restart_deferred_seconds', 'Time from the first request of a deferred restart to the restart.', ['reason'], buckets=(10, 30, 60, 120, 300, 600, 1200, 1800, 3600))
+NODES_WAITING_TO_START = Gauge('jmanager_nodes_waiting_to_start', 'Nodes of a cold start waiting for a free bootstrap slot.')
+COLD_START_SECONDS = Histogram('jmanager_cold_start_seconds', 'Time from a cold start of all nodes until the first / all nodes are synced.', ['milestone'], buckets=(30, 60, 120, 300, 600, 1200, 1800, 3600, 7200))
+TICK_SECONDS = Histogram('jmanager_tick_seconds', 'Duration of one manager tick.')
+LOCK_CONTENTIONS = Gauge('jmanager_lock_contentions', 'Number of lock acquisitions which had to wait.', ['lock'])
+LOCK_WAIT_SECONDS = Gauge('jmanager_lock_wait_seconds', 'Total time spent waiting for the lock.', ['lock'])
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+# serves /metrics from the manager process
+class MetricsServer(threading.Thread):
+    def __init__(self, address, registry=REGISTRY):
+        threading.Thread.__init__(self, name='metrics', daemon=True)
+        host, _, port = address.rpartition(':')
+        self._server = _ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+        self._server.registry = registry
+
+    def get_address(self):
+        return self._server.server_address
+
+    def run(self):
+        log.info("Serving metrics on {}".format(self.get_address()))
+        self._server.serve_forever()
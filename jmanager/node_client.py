@@ -0,0 +1,218 @@
+from subprocess import Popen, PIPE
+import json
+import os
+import requests
+from logging import getLogger
+from jm_enums import JError
+from error_types import *
+from metrics import NODE_REQUEST_SECONDS
+import utils
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# jcli returns 1 on error, so we parse the output to get the error type
+_MSG_NODE_DOWN = "failed to make a REST request"
+_MSG_ADDRESS_ALREADY_IN_USE = "Address already in use"
+
+def create_node_client(cmn_cfg, node_name, jcli, host):
+    backend = cmn_cfg.get('node_client', 'rest')
+    if backend == 'jcli':
+        return JcliNodeClient(node_name, jcli, host)
+    elif backend == 'rest':
+        return RestNodeClient(node_name, host, cmn_cfg['timeouts'].get('rest_timeout', 5))
+
+    raise Exception("Unknown node client '{}'. Use 'rest' or 'jcli'.".format(backend))
+
+_NULLS = ('', '~', 'null', 'Null', 'NULL')
+
+def _null_to_none(value):
+    if isinstance(value, dict):
+        return {key: _null_to_none(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_null_to_none(item) for item in value]
+    return None if value in _NULLS else value
+
+def _parse_secret_scalar(value, filename, line_number):
+    # a comment has to be separated from the value by whitespace
+    if value[:1] in ('"', "'"):
+        end = value.find(value[0], 1)
+        rest = value[end + 1:].strip() if end > -1 else None
+        if rest is None or '\\' in value[:end] or (len(rest) > 0 and not rest.startswith('#')):
+            raise ValueError("Unsupported quoted value in leader secret {} line {}: {}".format(filename, line_number, value))
+        return value[1:end]
+
+    idx = value.find(' #')
+    if idx > -1:
+        value = value[:idx].rstrip()
+    if value[:1] in ('[', '{', '|', '>', '&', '*', '!', '%', '@', '`') or value == '-' or value.startswith('- '):
+        raise ValueError("Unsupported value in leader secret {} line {}: {}".format(filename, line_number, value))
+    return None if value in _NULLS else value
+
+# node secret files are plain YAML mappings (genesis/bft sections with scalar values) - used when PyYAML is not
+# installed, anything beyond that shape is rejected instead of being guessed
+def _parse_leader_secret(content, filename):
+    secret = {}
+    section = None
+    section_indent = None
+    for line_number, line in enumerate(content.splitlines(), 1):
+        stripped = line.strip()
+        if len(stripped) == 0 or stripped.startswith('#') or stripped == '---':
+            continue
+        if '\t' in line[:len(line) - len(line.lstrip())]:
+            raise ValueError("Tab indentation in leader secret {} line {}.".format(filename, line_number))
+
+        key, separator, value = stripped.partition(':')
+        if separator == '' or len(key) == 0 or (len(value) > 0 and not value[0].isspace()):
+            raise ValueError("Expected 'key: value' in leader secret {} line {}.".format(filename, line_number))
+        key = _parse_secret_scalar(key.strip(), filename, line_number)
+        value = value.strip()
+
+        indent = len(line) - len(line.lstrip())
+        if indent == 0:
+            section = None
+            section_indent = None
+            if len(value) == 0 or value.startswith('#'):
+                section = secret[key] = {}
+            else:
+                secret[key] = _parse_secret_scalar(value, filename, line_number)
+        elif section is not None and section_indent in (None, indent) and len(value) > 0 and not value.startswith('#'):
+            section_indent = indent
+            section[key] = _parse_secret_scalar(value, filename, line_number)
+        else:
+            raise ValueError("Unsupported nesting in leader secret {} line {}.".format(filename, line_number))
+
+    return secret
+
+# every scalar is kept as a string (a hex node id must not turn into a number), nulls become None
+def read_leader_secret(filename):
+    with open(filename, 'r') as secret_file:
+        content = secret_file.read()
+
+    if yaml is None:
+        return _parse_leader_secret(content, filename)
+
+    secret = _null_to_none(yaml.load(content, Loader=yaml.BaseLoader))
+    if not isinstance(secret, dict):
+        raise ValueError("Leader secret {} is not a mapping.".format(filename))
+    return secret
+
+class JcliNodeClient():
+    def __init__(self, node_name, jcli, host):
+        self._node_name = node_name
+        self._jcli = jcli
+        self._host = host
+
+    def _execute(self, call, args, err_msg, output_json=True):
+        command = [self._jcli, "rest", "v0"] + args + ["-h", self._host]
+        if output_json:
+            command += ["--output-format", "json"]
+
+        with NODE_REQUEST_SECONDS.time(self._node_name, 'jcli', call):
+            proc = Popen(command, stdout=PIPE, stderr=PIPE)
+            stdout, stderr = proc.communicate()
+        if proc.returncode != 0:
+            stderr_msg = stderr.decode()
+            err_code = JError.UNKNOWN
+            if stderr_msg.find(_MSG_NODE_DOWN) > -1:
+                err_code = JError.FAILED_REST_REQUEST
+            elif stderr_msg.find(_MSG_ADDRESS_ALREADY_IN_USE) > 0:
+                err_code = JError.ADDRESS_ALREADY_IN_USE
+
+            raise JcliError(err_msg, err = {'proc_ret_code': proc.returncode, 'err_code': err_code, 'stdout': stdout.decode(), 'stderr': stderr_msg})
+
+        return stdout.decode()
+
+    def get_node_stats(self):
+        return json.loads(self._execute('node_stats', ["node", "stats", "get"], 'Could not get node stats.'))
+
+    def get_leaders(self):
+        return json.loads(self._execute('leaders', ["leaders", "get"], 'An error occurred while getting leaders'))
+
+    def get_leaders_logs(self):
+        return json.loads(self.get_leaders_logs_raw().decode())
+
+    def get_leaders_logs_raw(self):
+        return self._execute('leaders_logs', ["leaders", "logs", "get"], 'Could not get leaders.').encode()
+
+    def get_block(self, block_hash):
+        return bytes.fromhex(self._execute('block', ["block", block_hash, "get"], 'An error occurred while getting block from blockhash', output_json=False).strip())
+
+    # jcli reads the secret file itself, so there is nothing to prepare
+    def prepare_leader(self, secret_file):
+        return secret_file
+
+    def post_prepared_leader(self, payload):
+        return self._execute('leaders_post', ["leaders", "post", "-f", payload], 'An error occurred while registering leader.', output_json=False).strip()
+
+    def post_leader(self, secret_file):
+        return self.post_prepared_leader(self.prepare_leader(secret_file))
+
+    def delete_leader(self, leader_id):
+        stdout = self._execute('leaders_delete', ["leaders", "delete", str(leader_id)], 'An error occurred while deleting leader', output_json=False)
+        return stdout.lower().find('success') > -1
+
+    # every call runs its own jcli process, there is nothing to release
+    def close(self):
+        pass
+
+class RestNodeClient():
+    def __init__(self, node_name, host, timeout):
+        self._node_name = node_name
+        self._url = host + "/v0"
+        self._timeout = timeout
+        # session keeps the connection to the node alive between polls
+        self._session = requests.Session()
+
+    def _request(self, call, method, path, err_msg, expected_codes=(200,), **kwargs):
+        try:
+            with NODE_REQUEST_SECONDS.time(self._node_name, 'rest', call):
+                r = self._session.request(method, "{}/{}".format(self._url, path), timeout=self._timeout, **kwargs)
+        except requests.exceptions.Timeout as e:
+            # a slow node is not a down node, the poll only counts as missed
+            raise RestError(err_msg, err = {'status_code': None, 'err_code': JError.UNKNOWN, 'response': str(e)})
+        except requests.exceptions.RequestException as e:
+            raise RestError(err_msg, err = {'status_code': None, 'err_code': JError.FAILED_REST_REQUEST, 'response': str(e)})
+
+        if r.status_code not in expected_codes:
+            raise RestError(err_msg, err = {'status_code': r.status_code, 'err_code': JError.UNKNOWN, 'response': r.text})
+
+        return r
+
+    def get_node_stats(self):
+        return self._request('node_stats', 'GET', 'node/stats', 'Could not get node stats.').json()
+
+    def get_leaders(self):
+        return self._request('leaders', 'GET', 'leaders', 'An error occurred while getting leaders').json()
+
+    def get_leaders_logs(self):
+        return json.loads(self.get_leaders_logs_raw().decode())
+
+    # the undecoded body, so an unchanged response can be recognized before it is parsed
+    def get_leaders_logs_raw(self):
+        return self._request('leaders_logs', 'GET', 'leaders/logs', 'Could not get leaders.').content
+
+    def get_block(self, block_hash):
+        return self._request('block', 'GET', 'block/{}'.format(block_hash), 'An error occurred while getting block from blockhash').content
+
+    # the encoded request body, so a leader can be registered without touching the disk
+    def prepare_leader(self, secret_file):
+        return json.dumps(read_leader_secret(secret_file)).encode()
+
+    def post_prepared_leader(self, payload):
+        r = self._request('leaders_post', 'POST', 'leaders', 'An error occurred while registering leader.', data=payload, headers={'Content-Type': 'application/json'})
+        return str(r.json())
+
+    def post_leader(self, secret_file):
+        return self.post_prepared_leader(self.prepare_leader(secret_file))
+
+    def delete_leader(self, leader_id):
+        r = self._request('leaders_delete', 'DELETE', 'leaders/{}'.format(leader_id), 'An error occurred while deleting leader', expected_codes=(200, 404))
+        return r.status_code == 200
+
+    def close(self):
+        self._session.close()
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import struct
+import os
+from logging import getLogger
+import utils
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+    from cryptography.hazmat.backends import default_backend
+    try:
+        from cryptography.hazmat.decrepit.ciphers.modes import CFB
+    except ImportError:
+        from cryptography.hazmat.primitives.ciphers.modes import CFB
+except ImportError:
+    Cipher = None
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# minimal OpenPGP (RFC 4880) symmetric encryption, the same message `gpg --symmetric --armor` produces:
+# a symmetric-key encrypted session key packet (iterated and salted S2K) followed by an integrity protected
+# data packet (AES-256, CFB, MDC) holding an uncompressed literal data packet
+
+_TAG_SKESK = 3
+_TAG_LITERAL = 11
+_TAG_SEIPD = 18
+_TAG_MDC = 19
+
+_CIPHER_AES256 = 9
+_HASH_SHA256 = 8
+_S2K_ITERATED_SALTED = 3
+# the passphrases are 32 random bytes, key stretching adds nothing so the smallest usual count is used
+_S2K_CODED_COUNT = 0x60
+_AES_BLOCK_SIZE = 16
+_AES256_KEY_SIZE = 32
+
+_CRC24_INIT = 0xB704CE
+_CRC24_POLY = 0x1864CFB
+
+def is_available():
+    return Cipher is not None
+
+def _packet(tag, body):
+    length = len(body)
+    if length < 192:
+        header = struct.pack('>BB', 0xC0 | tag, length)
+    elif length < 8384:
+        length -= 192
+        header = struct.pack('>BBB', 0xC0 | tag, (length >> 8) + 192, length & 0xFF)
+    else:
+        header = struct.pack('>BBI', 0xC0 | tag, 0xFF, length)
+    return header + body
+
+def _s2k_count(coded_count):
+    return (16 + (coded_count & 15)) << ((coded_count >> 4) + 6)
+
+def _s2k_key(passphrase, salt, coded_count):
+    data = salt + passphrase
+    count = max(_s2k_count(coded_count), len(data))
+    h = hashlib.sha256()
+    # hash whole repetitions in large chunks, then the remaining prefix
+    chunk = data * max(1, 65536 // len(data))
+    while count >= len(chunk):
+        h.update(chunk)
+        count -= len(chunk)
+    h.update((data * (count // len(data) + 1))[:count])
+    return h.digest()[:_AES256_KEY_SIZE]
+
+def _crc24(data):
+    crc = _CRC24_INIT
+    for byte in data:
+        crc ^= byte << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= _CRC24_POLY
+    return crc & 0xFFFFFF
+
+def armor(data):
+    encoded = base64.b64encode(data).decode()
+    lines = [encoded[i:i + 64] for i in range(0, len(encoded), 64)]
+    checksum = base64.b64encode(struct.pack('>I', _crc24(data))[1:]).decode()
+    return '-----BEGIN PGP MESSAGE-----\n\n{}\n={}\n-----END PGP MESSAGE-----'.format('\n'.join(lines), checksum)
+
+def encrypt_symmetric(data, passphrase):
+    if Cipher is None:
+        raise Exception("In-process OpenPGP encryption needs the 'cryptography' package.")
+
+    salt = os.urandom(8)
+    key = _s2k_key(passphrase.encode(), salt, _S2K_CODED_COUNT)
+    skesk = _packet(_TAG_SKESK, struct.pack('>BBBB', 4, _CIPHER_AES256, _S2K_ITERATED_SALTED, _HASH_SHA256) + salt + struct.pack('>B', _S2K_CODED_COUNT))
+
+    # binary literal data without file name and date
+    literal = _packet(_TAG_LITERAL, b'b\x00' + struct.pack('>I', 0) + data)
+    prefix = os.urandom(_AES_BLOCK_SIZE)
+    prefix += prefix[-2:]
+    mdc_header = struct.pack('>BB', 0xC0 | _TAG_MDC, 20)
+    plaintext = prefix + literal + mdc_header
+    plaintext += hashlib.sha1(plaintext).digest()
+
+    encryptor = Cipher(algorithms.AES(key), CFB(b'\x00' * _AES_BLOCK_SIZE), backend=default_backend()).encryptor()
+    seipd = _packet(_TAG_SEIPD, b'\x01' + encryptor.update(plaintext) + encryptor.finalize())
+
+    return armor(skesk + seipd)
@@ -0,0 +1,56 @@
+import random
+import os
+from logging import getLogger
+from jm_enums import State
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# decides how long a node waits before its next poll - every state has its own interval, failures back off
+# exponentially, polls get tighter as a started node approaches its tip timeout and jitter spreads the nodes apart
+class PollScheduler():
+    _MIN_INTERVAL = 1       # shortest delay between two polls (in seconds)
+
+    def __init__(self, timeouts):
+        refresh_interval = timeouts['refresh_interval']
+        poll_intervals = timeouts.get('poll_intervals', {})
+
+        self._intervals = {
+            'leader': poll_intervals.get('leader', refresh_interval),
+            'follower': poll_intervals.get('follower', refresh_interval),
+            State.BOOTSTRAPPING: poll_intervals.get('bootstrapping', refresh_interval),
+            State.STOPPED: poll_intervals.get('stopped', refresh_interval),
+            State.UNKNOWN: refresh_interval
+        }
+        self._max_backoff = poll_intervals.get('max_backoff', 60)
+        self._jitter = poll_intervals.get('jitter', 0.1)
+        self._tip_timeout = timeouts['tip_timeout']
+
+    def _get_base_interval(self, node):
+        if node.get_state() == State.STARTED:
+            return self._intervals['leader'] if node.is_leader() else self._intervals['follower']
+
+        return self._intervals[node.get_state()]
+
+    def _apply_jitter(self, interval):
+        return interval * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+    # first poll is spread over one whole interval so node threads don't fire together
+    def get_initial_delay(self, node):
+        return random.uniform(0, self._get_base_interval(node))
+
+    def get_next_delay(self, node):
+        interval = self._get_base_interval(node)
+
+        failures = node.get_poll_failures()
+        if failures > 0:
+            interval = min(interval * (2 ** failures), max(self._max_backoff, interval))
+
+        elif node.get_state() == State.STARTED:
+            # poll faster when the tip is about to time out, so a stuck node is detected in time - once it has
+            # timed out the restart is up to the manager, so the node goes back to its base interval
+            remaining = self._tip_timeout - node.get_seconds_since_tip_change()
+            if 0 < remaining < interval * 2:
+                interval = max(PollScheduler._MIN_INTERVAL, min(interval, remaining / 2))
+
+        return max(PollScheduler._MIN_INTERVAL, self._apply_jitter(interval))
@@ -1,69 +1,102 @@
-import requests
-from requests.exceptions import HTTPError
 from datetime import datetime, timedelta
+import codecs
 import time
 import json
 import os
 from logging import getLogger
 from error_types import *
 from slots import Slots
+from slots_outbox import SlotsOutbox, PREPARED, SENT
+from pooltool_sender import PoolToolSender
+from json_stream import JsonFieldScanner
 import utils
 
 log = getLogger(utils.get_module_name(os.path.basename(__file__)))
 
+# status summary fields used by jmanager
+_STATUS_SUMMARY_FIELDS = ('majoritymax',)
+
 class PoolTool():
     def __init__(self, config):
         self._config = config
-        self._config_last_updated = None
+        self._config_generation = None
+        self._sender = PoolToolSender(10)
         self._update_config_if_new()
+        self._sender.start()
         self._platform_name = 'jmanager.py by Tilia IO'
         self._tip_data = None
         self._tip_last_updated = datetime.utcnow()
 
     def _update_config_if_new(self):
-        if self._config.is_config_update_needed(self._config_last_updated):
-            self._config_pool_tool = self._config.get_config_pool_tool()
+        snapshot = self._config.get_snapshot()
+        if self._config_generation != snapshot.generation:
+            self._config_generation = snapshot.generation
+            self._config_pool_tool = snapshot.get_config_pool_tool()
             self._status_summary_last_refresh = None
             self._status_summary = None
+            self._status_summary_etag = None
+            self._status_summary_last_modified = None
             self._refresh_interval = 10
-            self._config_last_updated = self._config.get_latest_config_timestamp()
+            self._sender.set_timeout(self._config_pool_tool.get('timeout', 10))
+            self._slots_outbox = SlotsOutbox(os.path.join(self._config_pool_tool['send_slots']['key_path'], 'outbox'))
+
+    def _on_status_summary(self, response):
+        if response is None:
+            return
 
-    def _request(self, url):
         try:
-            r = requests.get(url)
-            if r.status_code == 200:
-                return json.loads(r.content.decode())
-            else:
-                log.error("An error occoured. PoolTool returned code {}".format(r.status_code))
+            if response.status_code == 304:
+                log.debug("Status summary not modified.")
+                return
+
+            # only the fields we use are extracted, the rest of the document is skipped while it downloads
+            scanner = JsonFieldScanner(_STATUS_SUMMARY_FIELDS)
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            for chunk in response.iter_content(chunk_size=65536):
+                if scanner.feed(decoder.decode(chunk)):
+                    break
+
+            summary = scanner.get_values()
+            if 'majoritymax' not in summary:
+                log.error("Status summary does not contain majoritymax.")
+                return
+
+            self._status_summary = summary
+            self._status_summary_etag = response.headers.get('ETag')
+            self._status_summary_last_modified = response.headers.get('Last-Modified')
         except Exception as e:
             log.error('Exception occured', exc_info=True)
+        finally:
+            response.close()
 
-        return None
-
+    # the summary is fetched in the background, the last one received is returned right away - an unchanged
+    # summary costs a single round-trip thanks to the conditional request
     def _get_status_summary(self):
         if self._status_summary_last_refresh is None or (datetime.now() - self._status_summary_last_refresh).seconds > self._config_pool_tool['status_summary']['refresh_rate']:
-            self._status_summary = self._request(self._config_pool_tool['status_summary']['url'])
+            headers = {}
+            if self._status_summary_etag != None:
+                headers['If-None-Match'] = self._status_summary_etag
+            if self._status_summary_last_modified != None:
+                headers['If-Modified-Since'] = self._status_summary_last_modified
+
+            self._sender.submit('status_summary', 'status_summary', 'GET', self._config_pool_tool['status_summary']['url'], self._on_status_summary, headers=headers, stream=True)
             self._status_summary_last_refresh = datetime.now()
         
         return self._status_summary
 
+    # only the newest tip is sent if pooltool is slower than the tip updates
     def send_my_tip(self):
         if (self._tip_data == None or
             (datetime.utcnow() - self._tip_last_updated).seconds < self._config_pool_tool['send_tip']['refresh_rate']):
             return
 
-        try:
-            log.debug("Packet Sent:")
-            log.debug(json.dumps(self._tip_data, indent=2))
-            r = requests.get(self._config_pool_tool['send_tip']['url'], params=self._tip_data)
-            log.debug('Response received:')
-            log.debug(r.content.decode())
-            self._tip_last_updated = datetime.utcnow()
-        except Exception as e:
-            log.error('Exception occured', exc_info=True)
+        log.debug("Packet queued:")
+        log.debug(json.dumps(self._tip_data, indent=2))
+        self._sender.submit('send_tip', 'send_tip', 'GET', self._config_pool_tool['send_tip']['url'], params=self._tip_data)
+        self._tip_last_updated = datetime.utcnow()
 
-    def refresh_data_for_tip_update(self, stats, last_block, pool_id, genesis_hash):
-        if stats == None or last_block == None:
+    def refresh_data_for_tip_update(self, stats, last_block_header, pool_id, genesis_hash):
+        if stats == None or last_block_header == None:
             return
 
         self._tip_data = {
@@ -72,10 +105,10 @@ class PoolTool():
             "genesispref": genesis_hash,
             "mytip": stats['lastBlockHeight'],
             "lasthash": stats['lastBlockHash'],
-            "lastpool": last_block[168:168+64],
-            "lastparent": last_block[104:104+64],
-            "lastslot": int('0x' + last_block[24:24+8], 16),
-            "lastepoch": int('0x' + last_block[16:16+8], 16),
+            "lastpool": last_block_header.leader_id,
+            "lastparent": last_block_header.parent_hash,
+            "lastslot": last_block_header.slot,
+            "lastepoch": last_block_header.epoch,
             "jormver": stats['version'],
             "platform": self._platform_name
         }
@@ -83,6 +116,53 @@ class PoolTool():
     def get_max_tip(self):
         return 0 if self._status_summary is None else self._status_summary['majoritymax']
     
-    def send_slots(self, rest_api_url, pool_id, genesis_hash):
+    # builds and persists the epoch's slots submission, so the send window only has to transmit it - an entry
+    # that was not sent yet is built again, it may have been taken before the epoch's schedule was complete
+    def prepare_slots(self, rest_api_url, pool_id, genesis_hash, epoch):
+        entry = self._slots_outbox.get(int(epoch))
+        if entry != None and entry['state'] != PREPARED:
+            return True
+
         slots = Slots(self._config_pool_tool, rest_api_url, pool_id, genesis_hash)
-        slots.process()
+        data = slots.prepare()
+        if data is None:
+            return False
+
+        self._slots_outbox.put(slots.get_current_epoch(), data)
+        self._slots_outbox.prune(slots.get_current_epoch())
+        log.info("Prepared slots for epoch {}.".format(slots.get_current_epoch()))
+        return slots.get_current_epoch() == int(epoch)
+
+    def _send_slots_entry(self, entry):
+        epoch = entry['epoch']
+        # the callback runs on a sender thread, possibly after a config change replaced the outbox
+        outbox = self._slots_outbox
+        if not outbox.begin_send(epoch):
+            return
+
+        def on_sent(response):
+            if response is None:
+                outbox.mark_failed(epoch)
+            else:
+                outbox.mark_sent(epoch)
+                log.info("Sent slots for epoch {}.".format(epoch))
+
+        self._sender.submit('send_slots:{}'.format(epoch), 'send_slots', 'POST', self._config_pool_tool['send_slots']['url'], on_sent, json=entry['data'], headers={'Accept': 'application/json'})
+
+    def send_prepared_slots(self, epoch):
+        entry = self._slots_outbox.get(int(epoch))
+        if entry == None:
+            log.error("No slots prepared for epoch {}.".format(epoch))
+            return False
+        if entry['state'] == SENT:
+            log.info("Slots for epoch {} were already sent.".format(epoch))
+            return True
+
+        self._send_slots_entry(entry)
+        return True
+
+    # sends failed submissions again once their retry time has come
+    def retry_slots(self):
+        for entry in self._slots_outbox.get_due():
+            log.info("Retrying to send slots for epoch {} (attempt {}).".format(entry['epoch'], entry['attempts'] + 1))
+            self._send_slots_entry(entry)
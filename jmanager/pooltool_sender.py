@@ -0,0 +1,105 @@
+from collections import OrderedDict
+import threading
+import requests
+import time
+import os
+from logging import getLogger
+from metrics import POOLTOOL_REQUEST_SECONDS, POOLTOOL_QUEUE_DEPTH, POOLTOOL_QUEUE_SECONDS
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+class _Job():
+    def __init__(self, key, request, method, url, kwargs, callback):
+        self.key = key
+        self.request = request
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.callback = callback
+        self.queued_at = time.monotonic()
+
+# sends pooltool requests from a background thread over one keep-alive session, so a slow pooltool never
+# blocks the manager - jobs are keyed and a newer job replaces a queued one with the same key (latest wins)
+class PoolToolSender(threading.Thread):
+    _MAX_BACKOFF = 60       # seconds
+
+    def __init__(self, timeout):
+        threading.Thread.__init__(self, name='pooltool_sender', daemon=True)
+        self._timeout = timeout
+        self._session = requests.Session()
+        self._jobs = OrderedDict()
+        self._condition = threading.Condition()
+        self._failures = 0
+        self._stopped = False
+
+    def set_timeout(self, timeout):
+        self._timeout = timeout
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    # the callback gets the response, or None when the request failed
+    def submit(self, key, request, method, url, callback=None, **kwargs):
+        with self._condition:
+            if key in self._jobs:
+                log.debug("Replacing queued pooltool job {}.".format(key))
+                del self._jobs[key]
+            self._jobs[key] = _Job(key, request, method, url, kwargs, callback)
+            POOLTOOL_QUEUE_DEPTH.set(len(self._jobs))
+            self._condition.notify()
+
+    def get_queue_depth(self):
+        with self._condition:
+            return len(self._jobs)
+
+    def _next_job(self):
+        with self._condition:
+            while len(self._jobs) == 0 and not self._stopped:
+                self._condition.wait()
+            if self._stopped:
+                return None
+
+            _, job = self._jobs.popitem(last=False)
+            POOLTOOL_QUEUE_DEPTH.set(len(self._jobs))
+            return job
+
+    # streamed responses (stream=True) are handed to the callback unread, the callback closes them
+    def _execute(self, job):
+        r = None
+        try:
+            with POOLTOOL_REQUEST_SECONDS.time(job.request):
+                r = self._session.request(job.method, job.url, timeout=self._timeout, **job.kwargs)
+            r.raise_for_status()
+            return r
+        except Exception as e:
+            log.error("Pooltool request {} failed: {}".format(job.key, e))
+            if r is not None:
+                r.close()
+            return None
+
+    def run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+
+            response = self._execute(job)
+            POOLTOOL_QUEUE_SECONDS.observe(time.monotonic() - job.queued_at, job.request)
+            if job.callback is not None:
+                try:
+                    job.callback(response)
+                except Exception as e:
+                    log.error('Exception occured', exc_info=True)
+
+            # back off while pooltool keeps failing, newer jobs replace the queued ones in the meantime
+            if response is None:
+                self._failures += 1
+                deadline = time.monotonic() + min(2 ** (self._failures - 1), PoolToolSender._MAX_BACKOFF)
+                with self._condition:
+                    while not self._stopped and time.monotonic() < deadline:
+                        self._condition.wait(deadline - time.monotonic())
+            else:
+                self._failures = 0
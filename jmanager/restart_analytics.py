@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+
+from datetime import datetime
+import calendar
+import json
+import sys
+import os
+from logging import getLogger
+from restart_journal import read_journal
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+UNKNOWN = 'unknown'
+
+# streaming uptime distribution - count, mean, min, max and a log-linear histogram (every power of two
+# split into 8 buckets), so percentiles are within 12.5% but memory does not grow with the history
+class UptimeStats():
+    _SUB_BUCKETS = 8
+    _OCTAVES = 32
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self._histogram = [0] * (UptimeStats._OCTAVES * UptimeStats._SUB_BUCKETS + 1)
+
+    def add(self, uptime):
+        self.count += 1
+        self.total += uptime
+        self.min = uptime if self.min is None or uptime < self.min else self.min
+        self.max = uptime if self.max is None or uptime > self.max else self.max
+        self._histogram[min(UptimeStats._bucket(int(uptime)), len(self._histogram) - 1)] += 1
+
+    # bucket 0 holds zero, then 8 buckets per [2^e, 2^(e+1)) seconds
+    @staticmethod
+    def _bucket(uptime):
+        if uptime < 1:
+            return 0
+        e = uptime.bit_length() - 1
+        return 1 + e * UptimeStats._SUB_BUCKETS + ((uptime * UptimeStats._SUB_BUCKETS) >> e) - UptimeStats._SUB_BUCKETS
+
+    @staticmethod
+    def _bucket_upper_bound(bucket):
+        if bucket == 0:
+            return 0
+        e, sub = divmod(bucket - 1, UptimeStats._SUB_BUCKETS)
+        return ((UptimeStats._SUB_BUCKETS + sub + 1) << e) / UptimeStats._SUB_BUCKETS
+
+    def get_mean(self):
+        return self.total / self.count if self.count > 0 else None
+
+    # upper bound of the bucket holding the percentile, capped by the largest uptime seen
+    def get_percentile(self, percentile):
+        if self.count == 0:
+            return None
+
+        rank = percentile / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self._histogram):
+            seen += count
+            if seen >= rank and count > 0:
+                return min(UptimeStats._bucket_upper_bound(bucket), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.get_mean(),
+            'min': self.min,
+            'p50': self.get_percentile(50),
+            'p90': self.get_percentile(90),
+            'max': self.max
+        }
+
+class _NodeStats():
+    def __init__(self):
+        self.starts = 0
+        self.stops = 0
+        self.reasons = {}
+        self.uptime = UptimeStats()
+        self.first_stop = None
+        self.last_stop = None
+
+    # mean time between stops over the observed span
+    def get_mtbf(self):
+        return (self.last_stop - self.first_stop) / (self.stops - 1) if self.stops > 1 else None
+
+# restart statistics computed in one pass over the restart history - every stop is a restart of the node
+# (the start that follows only completes it), uptimes come from the stop records
+class RestartAnalytics():
+    def __init__(self):
+        self._records = 0
+        self._first_timestamp = None
+        self._last_timestamp = None
+        self._last_epoch = None
+        self._nodes = {}
+        self._reasons = {}
+        self._reason_uptimes = {}   # (reason, version) -> UptimeStats
+        self._epochs = {}           # epoch -> {reason: count}
+
+    def add(self, record):
+        self._records += 1
+        timestamp = record['timestamp']
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+        self._last_timestamp = timestamp
+
+        # start records are written after the node stats are cleared, they belong to the last seen epoch
+        epoch = record.get('epoch')
+        if epoch is not None:
+            self._last_epoch = epoch
+        else:
+            epoch = self._last_epoch
+
+        node = self._nodes.get(record['node'])
+        if node is None:
+            node = self._nodes[record['node']] = _NodeStats()
+
+        if record['action'] == 'start':
+            node.starts += 1
+            return
+        if record['action'] != 'stop':
+            return
+
+        reason = record['reason'] if record.get('reason') else UNKNOWN
+        node.stops += 1
+        node.reasons[reason] = node.reasons.get(reason, 0) + 1
+        if node.first_stop is None:
+            node.first_stop = timestamp
+        node.last_stop = timestamp
+        self._reasons[reason] = self._reasons.get(reason, 0) + 1
+
+        epoch_reasons = self._epochs.setdefault(UNKNOWN if epoch is None else epoch, {})
+        epoch_reasons[reason] = epoch_reasons.get(reason, 0) + 1
+
+        uptime = record.get('uptime')
+        if uptime is not None and uptime >= 0:
+            node.uptime.add(uptime)
+            key = (reason, record.get('version') or UNKNOWN)
+            uptimes = self._reason_uptimes.get(key)
+            if uptimes is None:
+                uptimes = self._reason_uptimes[key] = UptimeStats()
+            uptimes.add(uptime)
+
+    def add_all(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def to_dict(self):
+        return {
+            'records': self._records,
+            'first': self._first_timestamp,
+            'last': self._last_timestamp,
+            'reasons': self._reasons,
+            'nodes': {name: {
+                'starts': node.starts,
+                'restarts': node.stops,
+                'mtbf': node.get_mtbf(),
+                'reasons': node.reasons,
+                'uptime': node.uptime.to_dict()
+            } for name, node in self._nodes.items()},
+            'uptime_before_restart': [dict(reason=reason, version=version, **uptimes.to_dict())
+                for (reason, version), uptimes in sorted(self._reason_uptimes.items())],
+            'epochs': {str(epoch): reasons for epoch, reasons in self._epochs.items()}
+        }
+
+    def get_report(self):
+        lines = []
+        if self._records == 0:
+            return 'No restart records.'
+
+        lines.append("{} records from {} to {} (UTC)".format(self._records, _format_timestamp(self._first_timestamp), _format_timestamp(self._last_timestamp)))
+        lines.append('')
+        lines.append("{:<20} {:>8} {:>8} {:>12} {:>12} {:>12}".format('node', 'restarts', 'starts', 'mtbf', 'mean uptime', 'p90 uptime'))
+        for name in sorted(self._nodes, key=lambda name: -self._nodes[name].stops):
+            node = self._nodes[name]
+            lines.append("{:<20} {:>8} {:>8} {:>12} {:>12} {:>12}".format(name, node.stops, node.starts,
+                _format_duration(node.get_mtbf()), _format_duration(node.uptime.get_mean()), _format_duration(node.uptime.get_percentile(90))))
+
+        lines.append('')
+        lines.append("{:<30} {:>8}".format('reason', 'restarts'))
+        for reason, count in sorted(self._reasons.items(), key=lambda item: -item[1]):
+            lines.append("{:<30} {:>8}".format(reason, count))
+
+        lines.append('')
+        lines.append("{:<30} {:<12} {:>8} {:>12} {:>12} {:>12}".format('uptime before restart', 'version', 'count', 'mean', 'p50', 'p90'))
+        for (reason, version), uptimes in sorted(self._reason_uptimes.items()):
+            lines.append("{:<30} {:<12} {:>8} {:>12} {:>12} {:>12}".format(reason, version, uptimes.count,
+                _format_duration(uptimes.get_mean()), _format_duration(uptimes.get_percentile(50)), _format_duration(uptimes.get_percentile(90))))
+
+        lines.append('')
+        lines.append("{:<10} {:>8}  {}".format('epoch', 'restarts', 'reasons'))
+        for epoch in sorted(self._epochs, key=lambda epoch: (epoch == UNKNOWN, epoch if epoch != UNKNOWN else 0)):
+            reasons = self._epochs[epoch]
+            lines.append("{:<10} {:>8}  {}".format(epoch, sum(reasons.values()),
+                ', '.join('{}: {}'.format(reason, count) for reason, count in sorted(reasons.items(), key=lambda item: -item[1]))))
+
+        return '\n'.join(lines)
+
+def _format_timestamp(timestamp):
+    return datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+def _format_duration(seconds):
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    if seconds >= 86400:
+        return '{}d {}h'.format(seconds // 86400, seconds % 86400 // 3600)
+    if seconds >= 3600:
+        return '{}h {}m'.format(seconds // 3600, seconds % 3600 // 60)
+    return '{}m {}s'.format(seconds // 60, seconds % 60)
+
+# parses 'YYYY-MM-DD HH:MM:SS[.ffffff]' as written by datetime.utcnow(), several times faster than strptime
+def _parse_utc(text):
+    seconds = calendar.timegm((int(text[0:4]), int(text[5:7]), int(text[8:10]), int(text[11:13]), int(text[14:16]), int(text[17:19])))
+    return seconds + (int(text[20:26].ljust(6, '0')) / 1000000 if len(text) > 20 else 0)
+
+# records of the former restarts.csv (node name, timestamp, action, uptime, reason)
+def read_csv(filename):
+    with open(filename, 'r') as f:
+        for line in f:
+            fields = line.rstrip('\n').split(',', 4)
+            if len(fields) < 5 or fields[0] == 'node name':
+                continue
+            try:
+                yield {
+                    'node': fields[0],
+                    'timestamp': _parse_utc(fields[1]),
+                    'action': fields[2],
+                    'uptime': int(fields[3]),
+                    'reason': fields[4]
+                }
+            except ValueError:
+                log.warning("Skipping a corrupted record in {}.".format(filename))
+
+def read_history(filename):
+    return read_csv(filename) if filename.endswith('.csv') else read_journal(filename)
+
+def analyze(filename):
+    return RestartAnalytics().add_all(read_history(filename))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: {} <restarts.jsonl|restarts.csv> [--json]".format(sys.argv[0]))
+        sys.exit(1)
+
+    analytics = analyze(sys.argv[1])
+    if '--json' in sys.argv[2:]:
+        print(json.dumps(analytics.to_dict(), indent=2))
+    else:
+        print(analytics.get_report())
@@ -0,0 +1,143 @@
+from datetime import datetime
+import threading
+import queue
+import json
+import time
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# fsync policies
+FSYNC_ALWAYS = 'always'        # after every batch of records
+FSYNC_INTERVAL = 'interval'    # at most every fsync_interval seconds
+FSYNC_NEVER = 'never'          # left to the OS
+
+_CSV_HEADER = 'node name, timestamp, action, uptime, reason\n'
+
+# structured journal of node starts and stops (one JSON record per line) - node threads only queue records,
+# a single writer thread appends them, syncs them to disk according to the fsync policy and rotates the file
+# when it grows over max_size
+class RestartJournal(threading.Thread):
+    def __init__(self, filename, fsync=FSYNC_INTERVAL, fsync_interval=5, max_size=10 * 1024 * 1024, backups=5):
+        threading.Thread.__init__(self, name='restart_journal', daemon=True)
+        self._filename = filename
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval
+        self._max_size = max_size
+        self._backups = backups
+        self._queue = queue.Queue()
+        self._file = None
+        self._synced_at = time.monotonic()
+        self._unsynced = False
+
+    def get_filename(self):
+        return self._filename
+
+    def record(self, node_name, action, reason, uptime=None, tip=None, lag=None, epoch=None, version=None):
+        self._queue.put({
+            'node': node_name,
+            'timestamp': time.time(),
+            'action': action,
+            'uptime': uptime,
+            'reason': reason,
+            'tip': tip,
+            'lag': lag,
+            'epoch': epoch,
+            'version': version
+        })
+
+    def _open(self):
+        self._file = open(self._filename, 'a')
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._synced_at = time.monotonic()
+        self._unsynced = False
+
+    def _rotate(self):
+        if self._file.tell() < self._max_size:
+            return
+
+        if self._unsynced and self._fsync != FSYNC_NEVER:
+            self._sync()
+        self._file.close()
+        for idx in range(self._backups - 1, 0, -1):
+            if os.path.exists('{}.{}'.format(self._filename, idx)):
+                os.replace('{}.{}'.format(self._filename, idx), '{}.{}'.format(self._filename, idx + 1))
+        if self._backups > 0:
+            os.replace(self._filename, '{}.1'.format(self._filename))
+        else:
+            os.remove(self._filename)
+        self._open()
+        log.info("Rotated restart journal {}.".format(self._filename))
+
+    def _write(self, records):
+        for record in records:
+            self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        self._unsynced = True
+
+        if self._fsync == FSYNC_ALWAYS:
+            self._sync()
+        self._rotate()
+
+    def run(self):
+        self._open()
+        while True:
+            try:
+                timeout = self._fsync_interval if self._unsynced and self._fsync == FSYNC_INTERVAL else None
+                records = [self._queue.get(timeout=timeout)]
+                while not self._queue.empty():
+                    records.append(self._queue.get_nowait())
+                self._write(records)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+
+            if self._unsynced and self._fsync == FSYNC_INTERVAL and time.monotonic() - self._synced_at >= self._fsync_interval:
+                self._sync()
+
+def get_journal_filename(cmn_cfg):
+    return os.path.join(cmn_cfg['common_dir'], cmn_cfg.get('restarts_journal', {}).get('filename', 'restarts.jsonl'))
+
+def create_restart_journal(cmn_cfg):
+    config = cmn_cfg.get('restarts_journal', {})
+    return RestartJournal(
+        get_journal_filename(cmn_cfg),
+        config.get('fsync', FSYNC_INTERVAL),
+        config.get('fsync_interval', 5),
+        config.get('max_size_mb', 10) * 1024 * 1024,
+        config.get('backups', 5))
+
+# journal files from the oldest to the newest
+def journal_files(filename, backups=100):
+    files = ['{}.{}'.format(filename, idx) for idx in range(backups, 0, -1)]
+    files.append(filename)
+    return [f for f in files if os.path.exists(f)]
+
+def read_journal(filename):
+    for journal_file in journal_files(filename):
+        with open(journal_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if len(line) == 0:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    log.warning("Skipping a corrupted record in {}.".format(journal_file))
+
+# writes the journal in the former restarts.csv format
+def export_csv(filename, csv_filename):
+    count = 0
+    with open(csv_filename, 'w') as f:
+        f.write(_CSV_HEADER)
+        for record in read_journal(filename):
+            uptime = record['uptime'] if record.get('uptime') is not None else -1
+            f.write('{},{},{},{},{}\n'.format(record['node'], datetime.utcfromtimestamp(record['timestamp']), record['action'], uptime, record['reason']))
+            count += 1
+    return count
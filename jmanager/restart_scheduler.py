@@ -0,0 +1,122 @@
+import time
+import os
+from logging import getLogger
+from jm_enums import State
+from error_types import *
+from metrics import RESTARTS_QUEUED, RESTARTS_DEFERRED, RESTART_GUARDED_SLOTS, RESTART_DEFERRED_SECONDS
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# lower runs first - a stuck node is restarted before a node that is only bootstrapping for too long,
+# and a node missing its leaders logs can wait the longest
+_PRIORITIES = {
+    'staled tip': 0,
+    'boot timeout': 1,
+    'leader logs': 2,
+}
+_DEFAULT_PRIORITY = 3
+
+# restarts that only refresh a healthy node (like the baseline min_scheduled_time_difference check) keep away from
+# slots on every node, since any follower may be the failover target for the next slot
+_GUARDED_ON_ALL_NODES = ('leader logs',)
+
+class _Request():
+    def __init__(self, node, reason, action, tick):
+        self.node = node
+        self.reason = reason
+        self.action = action
+        self.priority = _PRIORITIES.get(reason, _DEFAULT_PRIORITY)
+        self.requested_at = time.monotonic()
+        self.tick = tick
+        self.deferred = False
+        self.guarded_slots = set()
+
+# every node restart goes through the scheduler - requests are made on every tick while their condition holds and
+# run in order of urgency at the end of the tick, but the leader and the last healthy node (and any healthy node
+# restarted for its leaders logs) are never taken down within the guard window around any of the pool's upcoming slots
+class RestartScheduler():
+    def __init__(self, guard_before, guard_after):
+        self.configure(guard_before, guard_after)
+        self._requests = {}
+        self._tick = 0
+
+    def configure(self, guard_before, guard_after):
+        self._guard_before = guard_before
+        self._guard_after = guard_after
+
+    # action(node) does the restart - a newer request for the same node replaces the action, the more urgent reason wins
+    def request(self, node, reason, action):
+        current = self._requests.get(node.get_name())
+        if current is None or _PRIORITIES.get(reason, _DEFAULT_PRIORITY) < current.priority:
+            request = _Request(node, reason, action, self._tick)
+            if current is not None:
+                request.requested_at = current.requested_at
+            self._requests[node.get_name()] = request
+        else:
+            current.tick = self._tick
+            if current.reason == reason:
+                current.action = action
+
+    def get_queued(self):
+        return [(r.node.get_name(), r.reason) for r in self._sorted_requests()]
+
+    def _sorted_requests(self):
+        return sorted(self._requests.values(), key=lambda r: (r.priority, r.requested_at))
+
+    # the slot whose guard window contains now, None when no slot is that close
+    def _get_guarded_slot(self, schedules, now):
+        for schedule in schedules:
+            slot_time = schedule.get_next_slot_time(now - self._guard_after)
+            if slot_time != None and slot_time <= now + self._guard_before:
+                return slot_time
+        return None
+
+    def _get_guard(self, request, nodes, leader_names):
+        node = request.node
+        if node.get_state() != State.STARTED:
+            return None
+        if node.get_name() in leader_names:
+            return 'leader'
+        if request.reason in _GUARDED_ON_ALL_NODES:
+            return 'failover target'
+        for n in nodes:
+            if n is not node and n.get_state() == State.STARTED:
+                return None
+        return 'last healthy'
+
+    # runs the queued restarts that are allowed now, requests that were not renewed in this tick are dropped
+    def process(self, nodes, leader_names, schedules):
+        now = time.time()
+        for request in self._sorted_requests():
+            name = request.node.get_name()
+            if request.tick != self._tick:
+                log.debug("Dropping restart request of {} ({}), it is no longer needed.".format(name, request.reason))
+                del self._requests[name]
+                continue
+
+            # the guard is checked again for every request since each restart changes which nodes are healthy
+            guard = self._get_guard(request, nodes, leader_names)
+            slot_time = self._get_guarded_slot(schedules, now) if guard != None else None
+            if slot_time != None:
+                if not request.deferred:
+                    log.info("Deferring restart of {} node {} ({}), it is {:.0f}s from a scheduled slot.".format(guard, name, request.reason, abs(slot_time - now)))
+                    request.deferred = True
+                    RESTARTS_DEFERRED.inc(name, request.reason, guard)
+                if slot_time not in request.guarded_slots:
+                    request.guarded_slots.add(slot_time)
+                    RESTART_GUARDED_SLOTS.inc(name)
+                continue
+
+            del self._requests[name]
+            if request.deferred:
+                RESTART_DEFERRED_SECONDS.observe(time.monotonic() - request.requested_at, request.reason)
+            try:
+                request.action(request.node)
+            except JcliError as e:
+                e.print_error()
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+
+        RESTARTS_QUEUED.set(len(self._requests))
+        self._tick += 1
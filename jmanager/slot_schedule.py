@@ -0,0 +1,56 @@
+import calendar
+import hashlib
+import bisect
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# 'YYYY-MM-DDTHH:MM:SS...' as UTC seconds - python3.6 cannot parse the ':' in the offset, the time is UTC anyway
+def parse_slot_time(scheduled_at_time):
+    t = scheduled_at_time
+    return calendar.timegm((int(t[0:4]), int(t[5:7]), int(t[8:10]), int(t[11:13]), int(t[14:16]), int(t[17:19])))
+
+def get_slot_dates(slots):
+    return frozenset(slot['scheduled_at_date'] for slot in slots)
+
+# digest of the scheduled slot dates, independent of their order and of the other fields of the leaders logs
+def get_slots_digest(slots):
+    return hashlib.sha1('\n'.join(sorted(get_slot_dates(slots))).encode()).hexdigest()
+
+EMPTY_SLOTS_DIGEST = get_slots_digest([])
+
+# leader slots of one epoch indexed once when they are recorded - the slot dates are kept as a digest, so another
+# node's schedule is compared without sorting, and slot times in a sorted list for bisecting the next slot
+class SlotSchedule():
+    def __init__(self, epoch, slots, node_name):
+        self.epoch = epoch
+        self.slots = slots
+        self._digest = get_slots_digest(slots)
+        self._times = sorted(parse_slot_time(slot['scheduled_at_time']) for slot in slots)
+        self._nodes = set([node_name])
+
+    def __len__(self):
+        return len(self._times)
+
+    def get_nodes(self):
+        return self._nodes
+
+    def has_node(self, node_name):
+        return node_name in self._nodes
+
+    def add_node(self, node_name):
+        self._nodes.add(node_name)
+
+    def get_digest(self):
+        return self._digest
+
+    # we cannot compare the whole lists because they can have different creation dates, so just the scheduled slots
+    def matches(self, slots_digest):
+        return slots_digest == self._digest
+
+    # UTC timestamp of the first slot scheduled at or after t, None when there is none left
+    def get_next_slot_time(self, t):
+        idx = bisect.bisect_left(self._times, t)
+        return self._times[idx] if idx < len(self._times) else None
@@ -6,8 +6,11 @@ import os
 import getopt
 import requests
 import hashlib
+import base64
 from subprocess import Popen, PIPE
 from logging import getLogger
+from metrics import POOLTOOL_REQUEST_SECONDS
+import openpgp
 import utils
 
 log = getLogger(utils.get_module_name(os.path.basename(__file__)))
@@ -22,6 +25,8 @@ class Slots():
         self._previous_epoch = None
         self._pool_id = pool_id
         self._genesis_hash = genesis_hash
+        # slots are prepared and sent from the manager tick, so no request may hang
+        self._timeout = config.get('timeout', 10)
         self._headers = {
              "Accept": "application/json",
              "Content-Type": "application/json",
@@ -30,7 +35,7 @@ class Slots():
 
     def _get_node_stats(self):
         try:
-            r = requests.get("{}/node/stats".format(self._url))
+            r = requests.get("{}/node/stats".format(self._url), timeout=self._timeout)
             if r.status_code == 200:
                 return r.json()
             else:
@@ -48,10 +53,12 @@ class Slots():
             log.debug("Packet Sent:")
             log.debug(json.dumps(data))
 
-            r = requests.post(self._config['send_slots']['url'], data=json.dumps(data), headers=self._headers)
+            with POOLTOOL_REQUEST_SECONDS.time('send_slots'):
+                r = requests.post(self._config['send_slots']['url'], data=json.dumps(data), headers=self._headers, timeout=self._timeout)
 
             log.debug('Response received:')
             log.debug(r.content.decode())
+            r.raise_for_status()
         except Exception as e:
             log.error('Error: Sending data failed.')
             log.error("An exception occured", exc_info=True)
@@ -59,7 +66,7 @@ class Slots():
 
     def _get_leaders_logs(self):
         try:
-            r = requests.get("{}/leaders/logs".format(self._url))
+            r = requests.get("{}/leaders/logs".format(self._url), timeout=self._timeout)
             if r.status_code == 200:
                 return r.json()
             else:
@@ -104,45 +111,47 @@ class Slots():
                 current_slots.append(slot)
         return current_slots
 
+    # same format as `openssl rand -base64 32`
     def _generate_new_key(self):
-        try:
-            cmd = ["openssl", "rand", "-base64", "32"]
-            proc = Popen(cmd, stdout=PIPE, stdin=PIPE, stderr=PIPE)
-            stdout, stderr = proc.communicate()
-            if proc.returncode != 0:
-                log.error('Error: Failed to generate new key.')
-                log.error('stdout: {}\nstderr:{}'.format(stdout.decode(), stderr.decode()))
-                log.error("An exception occured", exc_info=True)
+        return base64.b64encode(os.urandom(32)).decode()
 
-            return stdout.decode().rstrip()
-        except Exception as e:
-            log.error('Error: Failed to generate new key')
-            log.error("An exception occured", exc_info=True)
-            raise e
+    # the passphrase goes through a pipe and the slots through stdin, so neither shows up on a command line
+    def _encrypt_gpg(self, data):
+        passphrase_read, passphrase_write = os.pipe()
+        try:
+            os.write(passphrase_write, self._current_epoch_key.encode())
+            os.close(passphrase_write)
+            passphrase_write = None
+
+            cmd = ["gpg", "--symmetric", "--armor", "--batch", "--passphrase-fd", str(passphrase_read)]
+            proc = Popen(cmd, stdout=PIPE, stdin=PIPE, stderr=PIPE, pass_fds=(passphrase_read,))
+            stdout, stderr = proc.communicate(data)
+        finally:
+            os.close(passphrase_read)
+            if passphrase_write is not None:
+                os.close(passphrase_write)
+
+        if proc.returncode != 0:
+            log.error('Error: Failed to encrypt current slots.')
+            log.error('stdout: {}\nstderr:{}'.format(stdout.decode(), stderr.decode()))
 
-        return None
+        return stdout.decode().rstrip()
 
     def _encrypt_current_slots(self):
-        stdout = None
-        stderr = None
         try:
-            slots_to_encrpyt = json.dumps(self._current_slots) if (len(self._current_slots) > 0) else '[]'
-            cmd1 = ["echo", slots_to_encrpyt]
-            proc1 = Popen(cmd1, stdout=PIPE, stdin=PIPE, stderr=PIPE)
-            cmd2 = ["gpg", "--symmetric", "--armor", "--batch", "--passphrase", self._current_epoch_key]
-            proc2 = Popen(cmd2, stdout=PIPE, stdin=proc1.stdout, stderr=PIPE)
-
-            stdout, stderr = proc2.communicate()
-            if proc2.returncode != 0:
-                log.error('Error: Failed to encrypt current slots.')
-                log.error('stdout: {}\nstderr:{}'.format(stdout.decode(), stderr.decode()))
+            # trailing new line kept from the former `echo <slots> | gpg` pipeline
+            slots_to_encrpyt = (json.dumps(self._current_slots) if (len(self._current_slots) > 0) else '[]') + '\n'
+            if self._config['send_slots'].get('encryption', 'gpg') == 'native':
+                if openpgp.is_available():
+                    return openpgp.encrypt_symmetric(slots_to_encrpyt.encode(), self._current_epoch_key)
+                log.warning("Native slots encryption needs the 'cryptography' package, using gpg.")
+
+            return self._encrypt_gpg(slots_to_encrpyt.encode())
         except Exception as e:
             log.error('Error: Failed to encrypt current slots.')
             log.error("An exception occured", exc_info=True)
             raise e
 
-        return stdout.decode().rstrip()
-
     def _verify_slots_gpg(self):
         previous_epoch_passphrase_filename = '{key_path}{s}passphrase_{epoch}'.format(key_path=self._config['send_slots']['key_path'], s=os.sep, epoch=self._previous_epoch)
         previous_epoch_key = None
@@ -171,7 +180,7 @@ class Slots():
             'encrypted_slots': current_slots_encrypted
         }
 
-        self._send_data(data)
+        return data
 
     def _verify_slots_hash(self):
         # pushing the current slots to file and getting the slots from the last epoch
@@ -201,7 +210,7 @@ class Slots():
             'last_epoch_slots': '[]' if type(last_epoch_slots) is list and len(last_epoch_slots) == 0 else last_epoch_slots
         }
 
-        self._send_data(data)
+        return data
 
     def _no_verification_method(self):
         data = {
@@ -212,7 +221,7 @@ class Slots():
             'assigned_slots': str(len(self._current_slots)),
         }
 
-        self._send_data(data)
+        return data
 
     def _create_path(self, key_path):
         if not os.path.exists(key_path):
@@ -224,10 +233,14 @@ class Slots():
                 log.error("An exception occured", exc_info=True)
                 raise e
 
-    def process(self):
+    def get_current_epoch(self):
+        return self._current_epoch
+
+    # builds the pooltool submission for the current epoch (keys, hashes and encryption included)
+    def prepare(self):
         self._node_stats = self._get_node_stats()
         if self._node_stats is None:
-            return
+            return None
         try:
             self._current_epoch = int(self._node_stats['lastBlockDate'][0 : self._node_stats['lastBlockDate'].find('.')])
             self._previous_epoch = self._current_epoch - 1
@@ -238,13 +251,21 @@ class Slots():
 
         self._leaders_logs = self._get_leaders_logs()
         if self._leaders_logs is None:
-            return
+            return None
 
         self._current_slots = self._get_current_slots()
 
         if self._config['send_slots']['verify_slots_gpg'] == 1:
-            self._verify_slots_gpg()
+            return self._verify_slots_gpg()
         elif self._config['send_slots']['verify_slots_hash'] == 1:
-            self._verify_slots_hash()
+            return self._verify_slots_hash()
         else:
-            self._no_verification_method()
+            return self._no_verification_method()
+
+    def send(self, data):
+        self._send_data(data)
+
+    def process(self):
+        data = self.prepare()
+        if data is not None:
+            self.send(data)
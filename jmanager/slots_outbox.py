@@ -0,0 +1,117 @@
+import threading
+import json
+import time
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# entry states
+PREPARED = 'prepared'   # built ahead of the send window
+FAILED = 'failed'       # sending failed, retried with backoff
+SENT = 'sent'           # kept for a while so a restarted manager does not send the epoch again
+
+# durable queue of pooltool slot submissions - one JSON file per epoch, written atomically, so prepared
+# and failed submissions survive a restart of jmanager
+class SlotsOutbox():
+    _RETRY_INTERVAL = 30        # first retry after a failed send (in seconds), doubled on every attempt
+    _MAX_RETRY_INTERVAL = 900
+    _MAX_ATTEMPTS = 10
+    _KEEP_EPOCHS = 2            # entries of older epochs are removed
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._sending = set()   # epochs whose send is in progress
+
+        if not os.path.exists(self._path):
+            os.makedirs(self._path)
+
+        for filename in os.listdir(self._path):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self._path, filename), 'r') as f:
+                    entry = json.load(f)
+                self._entries[entry['epoch']] = entry
+            except Exception as e:
+                log.error("Could not read slots outbox entry {}: {}".format(filename, e))
+
+        if len(self._entries) > 0:
+            log.info("Loaded {} slots outbox entries.".format(len(self._entries)))
+
+    def _filename(self, epoch):
+        return os.path.join(self._path, '{}.json'.format(epoch))
+
+    def _save(self, entry):
+        filename = self._filename(entry['epoch'])
+        with open(filename + '.tmp', 'w') as f:
+            f.write(json.dumps(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(filename + '.tmp', filename)
+
+    def _remove(self, epoch):
+        self._entries.pop(epoch, None)
+        if os.path.exists(self._filename(epoch)):
+            os.remove(self._filename(epoch))
+
+    def put(self, epoch, data):
+        entry = {'epoch': epoch, 'state': PREPARED, 'data': data, 'attempts': 0, 'next_attempt': 0, 'created': time.time()}
+        with self._lock:
+            self._save(entry)
+            self._entries[epoch] = entry
+
+    def get(self, epoch):
+        with self._lock:
+            return self._entries.get(epoch)
+
+    # False when the epoch is already being sent
+    def begin_send(self, epoch):
+        with self._lock:
+            if epoch in self._sending:
+                return False
+            self._sending.add(epoch)
+            return True
+
+    # the entry may be gone already if it was pruned while it was being sent
+    def mark_sent(self, epoch):
+        with self._lock:
+            self._sending.discard(epoch)
+            entry = self._entries.get(epoch)
+            if entry is None:
+                return
+            entry['state'] = SENT
+            entry['attempts'] += 1
+            self._save(entry)
+
+    def mark_failed(self, epoch):
+        with self._lock:
+            self._sending.discard(epoch)
+            entry = self._entries.get(epoch)
+            if entry is None:
+                return
+            entry['attempts'] += 1
+            if entry['attempts'] >= SlotsOutbox._MAX_ATTEMPTS:
+                log.error("Giving up sending slots for epoch {} after {} attempts.".format(epoch, entry['attempts']))
+                self._remove(epoch)
+                return
+
+            entry['state'] = FAILED
+            entry['next_attempt'] = time.time() + min(SlotsOutbox._RETRY_INTERVAL * 2 ** (entry['attempts'] - 1), SlotsOutbox._MAX_RETRY_INTERVAL)
+            self._save(entry)
+
+    # failed entries whose retry time has come
+    def get_due(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return [entry for entry in self._entries.values() if entry['state'] == FAILED and entry['next_attempt'] <= now]
+
+    def prune(self, current_epoch):
+        with self._lock:
+            for epoch in [epoch for epoch in self._entries if epoch <= current_epoch - SlotsOutbox._KEEP_EPOCHS]:
+                if self._entries[epoch]['state'] != SENT:
+                    log.warning("Dropping unsent slots for epoch {}.".format(epoch))
+                self._remove(epoch)
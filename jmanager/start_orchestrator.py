@@ -0,0 +1,137 @@
+import threading
+import time
+import os
+from logging import getLogger
+from jm_enums import State
+from error_types import *
+from metrics import COLD_START_SECONDS, NODES_WAITING_TO_START
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# cold start of all nodes - supervisor start calls are made concurrently from short lived threads, but only
+# max_bootstrapping nodes bootstrap at once so they do not compete for disk and CPU, the next node is released
+# as soon as one reaches STARTED (or has been bootstrapping for longer than release_timeout)
+class StartOrchestrator():
+    def __init__(self, max_bootstrapping, release_timeout, tip_diff_threshold, timeout):
+        self.configure(max_bootstrapping, release_timeout, tip_diff_threshold, timeout)
+        self._lock = threading.Lock()
+        self._waiting = []
+        self._released = {}         # node name -> (node, released at)
+        self._starting = set()      # nodes whose supervisor start call is in progress
+        self._nodes = []
+        self._started_at = None
+        self._first_synced_at = None
+        self._synced = set()
+        self._failed = set()
+
+    def configure(self, max_bootstrapping, release_timeout, tip_diff_threshold, timeout):
+        self._max_bootstrapping = max(1, max_bootstrapping)
+        self._release_timeout = release_timeout
+        self._tip_diff_threshold = tip_diff_threshold
+        self._timeout = timeout     # the report is logged even if some node never gets synced
+
+    def is_active(self):
+        return self._started_at is not None
+
+    # the node is left to the orchestrator until it is released and its start call is done
+    def is_pending(self, node):
+        with self._lock:
+            return node in self._waiting or node.get_name() in self._starting
+
+    # nodes that report STOPPED later (e.g. still UNKNOWN before their first poll) join a cold start in progress,
+    # a cold start only begins once there is a stopped node to start
+    def start(self, nodes):
+        with self._lock:
+            joined = self.is_active()
+            if joined:
+                added = [node for node in nodes if node.get_state() == State.STOPPED and node not in self._waiting and node.get_name() not in self._released]
+                self._waiting.extend(added)
+            else:
+                added = [node for node in nodes if node.get_state() == State.STOPPED]
+                if len(added) == 0:
+                    log.debug("Cold start postponed, none of the nodes is stopped yet.")
+                    return
+
+                self._nodes = list(nodes)
+                self._waiting = added
+                self._released = {}
+                self._synced = set()
+                self._failed = set()
+                self._first_synced_at = None
+                self._started_at = time.monotonic()
+
+                for node in nodes:
+                    if node not in self._waiting:
+                        log.info("Cannot start node yet. Node '{}' is not stopped ({}).".format(node.get_name(), node.get_state()))
+
+            waiting = len(self._waiting)
+
+        if joined and len(added) > 0:
+            log.info("{} more nodes joined the cold start ({} waiting).".format(len(added), waiting))
+        elif not joined:
+            log.info("Cold starting {} nodes, at most {} bootstrapping at once.".format(len(added), self._max_bootstrapping))
+        NODES_WAITING_TO_START.set(waiting)
+
+    def _start_node(self, node):
+        try:
+            node.switch_to_default_peers_bootstrap()
+            node.start_node()
+        except Exception as e:
+            log.error('Exception occured', exc_info=True)
+            with self._lock:
+                self._failed.add(node.get_name())
+        finally:
+            with self._lock:
+                self._starting.discard(node.get_name())
+
+    def _is_synced(self, node, max_tip):
+        return node.get_state() == State.STARTED and max_tip - node.get_tip() <= self._tip_diff_threshold
+
+    def _is_bootstrapping(self, node, released_at, now):
+        if node.get_name() in self._failed or node.get_state() == State.STARTED:
+            return False
+        return now - released_at < self._release_timeout
+
+    # called on every manager tick - releases waiting nodes while bootstrap slots are free and tracks the sync times
+    def tick(self, max_tip):
+        if not self.is_active():
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            bootstrapping = sum(1 for node, released_at in self._released.values() if self._is_bootstrapping(node, released_at, now))
+            while len(self._waiting) > 0 and bootstrapping < self._max_bootstrapping:
+                node = self._waiting.pop(0)
+                self._released[node.get_name()] = (node, now)
+                self._starting.add(node.get_name())
+                bootstrapping += 1
+                log.info("Starting node {} ({} waiting).".format(node.get_name(), len(self._waiting)))
+                threading.Thread(target=self._start_node, args=(node,), name='start:{}'.format(node.get_name()), daemon=True).start()
+            NODES_WAITING_TO_START.set(len(self._waiting))
+
+        for node in self._nodes:
+            if node.get_name() not in self._synced and self._is_synced(node, max_tip):
+                self._synced.add(node.get_name())
+                if self._first_synced_at is None:
+                    self._first_synced_at = now
+                    COLD_START_SECONDS.observe(now - self._started_at, 'first')
+                    log.info("Cold start: first node ({}) synced after {:.1f}s.".format(node.get_name(), now - self._started_at))
+
+        with self._lock:
+            if len(self._synced | self._failed) >= len(self._nodes) or now - self._started_at > self._timeout:
+                self._finish(now)
+
+    def _finish(self, now):
+        all_synced = len(self._synced) == len(self._nodes)
+        if all_synced:
+            COLD_START_SECONDS.observe(now - self._started_at, 'all')
+        log.info("Cold start of {} nodes finished: first synced after {}, all synced after {}{}{}.".format(
+            len(self._nodes),
+            '{:.1f}s'.format(self._first_synced_at - self._started_at) if self._first_synced_at is not None else 'n/a',
+            '{:.1f}s'.format(now - self._started_at) if all_synced else 'n/a',
+            ', failed to start: {}'.format(', '.join(sorted(self._failed))) if len(self._failed) > 0 else '',
+            ', not synced: {}'.format(', '.join(sorted(n.get_name() for n in self._nodes if n.get_name() not in self._synced | self._failed))) if not all_synced else ''))
+        self._waiting = []
+        NODES_WAITING_TO_START.set(0)
+        self._started_at = None
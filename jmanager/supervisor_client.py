@@ -0,0 +1,99 @@
+import threading
+import time
+import os
+from logging import getLogger
+from xmlrpc.client import ServerProxy
+from error_types import *
+from metrics import SUPERVISOR_REQUEST_SECONDS
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# supervisor XML-RPC client shared by all nodes - the state of every process is fetched with a single
+# getAllProcessInfo call and kept for the current manager tick (or until a process is started/stopped)
+class SupervisorClient():
+    _PUSH_MODE_MAX_AGE = 60     # how long states updated by supervisor events are trusted (in seconds)
+
+    def __init__(self, url):
+        # guards the process info cache - ServerProxy is not thread safe, so every thread gets its own
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._url = None
+        self._process_info = None
+        self._process_info_time = None
+        self._push_mode = False
+        self.set_url(url)
+
+    def set_url(self, url):
+        with self._lock:
+            if url != self._url:
+                self._url = url
+                self._process_info = None
+
+    # slow start/stop calls of different nodes can overlap since they do not share a connection
+    def _get_server(self):
+        url = self._url
+        if getattr(self._local, 'url', None) != url:
+            self._local.server = ServerProxy(url)
+            self._local.url = url
+        return self._local.server
+
+    # when supervisor events keep the states up to date, the cache is not dropped on every tick
+    def set_push_mode(self, enabled):
+        self._push_mode = enabled
+
+    def begin_tick(self):
+        if not self._push_mode or time.monotonic() - (self._process_info_time or 0) > SupervisorClient._PUSH_MODE_MAX_AGE:
+            self.invalidate()
+
+    def apply_event(self, name, state):
+        with self._lock:
+            if self._process_info is None:
+                return
+
+            proc_info = self._process_info.get(name)
+            if proc_info is not None:
+                # the same info is stored under 'name' and 'group:name'
+                proc_info['state'] = state
+
+    def invalidate(self):
+        with self._lock:
+            self._process_info = None
+
+    def _fetch_all(self):
+        process_info = {}
+        with SUPERVISOR_REQUEST_SECONDS.time('getAllProcessInfo'):
+            all_process_info = self._get_server().supervisor.getAllProcessInfo()
+
+        for info in all_process_info:
+            process_info[info['name']] = info
+            process_info['{}:{}'.format(info['group'], info['name'])] = info
+
+        return process_info
+
+    def get_process_info(self, name):
+        with self._lock:
+            if self._process_info is None:
+                self._process_info = self._fetch_all()
+                self._process_info_time = time.monotonic()
+
+            proc_info = self._process_info.get(name)
+
+        if proc_info is None:
+            raise SupervisorError("Unknown supervisor process {}".format(name), {'code': 1})
+
+        return proc_info
+
+    def start_process(self, name):
+        try:
+            with SUPERVISOR_REQUEST_SECONDS.time('startProcess'):
+                return self._get_server().supervisor.startProcess(name)
+        finally:
+            self.invalidate()
+
+    def stop_process(self, name):
+        try:
+            with SUPERVISOR_REQUEST_SECONDS.time('stopProcess'):
+                return self._get_server().supervisor.stopProcess(name)
+        finally:
+            self.invalidate()
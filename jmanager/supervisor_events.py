@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import json
+import socket
+import sys
+import threading
+import os
+import getopt
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# supervisor process state codes (http://supervisord.org/subprocess.html#process-states)
+PROCESS_STATES = {
+    'STOPPED': 0,
+    'STARTING': 10,
+    'RUNNING': 20,
+    'BACKOFF': 30,
+    'STOPPING': 40,
+    'EXITED': 100,
+    'FATAL': 200,
+    'UNKNOWN': 1000
+}
+
+_EVENT_PREFIX = 'PROCESS_STATE_'
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return (host, int(port))
+
+def _parse_tokens(line):
+    return dict(token.split(':', 1) for token in line.split() if ':' in token)
+
+# receives process state events relayed from supervisor (or from any local stand-in sending the
+# same datagrams) and hands them over to the callback as (process name, state code)
+class EventReceiver(threading.Thread):
+    def __init__(self, address, callback):
+        threading.Thread.__init__(self, name='supervisor_events', daemon=True)
+        self._callback = callback
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(parse_address(address))
+
+    def get_address(self):
+        return self._socket.getsockname()
+
+    def _handle(self, datagram):
+        event = json.loads(datagram.decode())
+        eventname = event.get('eventname', '')
+        if not eventname.startswith(_EVENT_PREFIX):
+            return
+
+        state = PROCESS_STATES.get(eventname[len(_EVENT_PREFIX):])
+        if state is None:
+            log.warning("Unknown supervisor event {}".format(eventname))
+            return
+
+        log.debug("Supervisor event {} for {}".format(eventname, event['processname']))
+        self._callback(event['processname'], state)
+
+    def run(self):
+        log.info("Listening for supervisor events on {}".format(self.get_address()))
+        while True:
+            try:
+                datagram, _ = self._socket.recvfrom(4096)
+                self._handle(datagram)
+            except Exception as e:
+                log.error('Exception occured', exc_info=True)
+
+# supervisor event listener - supervisor starts it as [eventlistener:x] and talks to it over stdin/stdout,
+# every PROCESS_STATE_* event is relayed as a datagram to the jmanager's EventReceiver
+def run_listener(relay_address):
+    address = parse_address(relay_address)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    while True:
+        sys.stdout.write('READY\n')
+        sys.stdout.flush()
+
+        headers = _parse_tokens(sys.stdin.readline())
+        payload = sys.stdin.read(int(headers['len']))
+        payload_headers = _parse_tokens(payload.split('\n', 1)[0])
+
+        if headers.get('eventname', '').startswith(_EVENT_PREFIX):
+            event = {
+                'eventname': headers['eventname'],
+                'processname': payload_headers.get('processname'),
+                'groupname': payload_headers.get('groupname'),
+                'from_state': payload_headers.get('from_state')
+            }
+            try:
+                sock.sendto(json.dumps(event).encode(), address)
+            except Exception as e:
+                sys.stderr.write('Failed to relay event: {}\n'.format(e))
+                sys.stderr.flush()
+
+        sys.stdout.write('RESULT 2\nOK')
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "r:", ["relay="])
+    except getopt.GetoptError:
+        print("Usage: {} -r <jmanager-events-address>".format(sys.argv[0]), file=sys.stderr)
+        sys.exit(1)
+
+    relay_address = '127.0.0.1:9002'
+    for opt, arg in opts:
+        if opt in ("-r", "--relay"):
+            relay_address = arg
+
+    run_listener(relay_address)
@@ -0,0 +1,114 @@
+from collections import deque
+import threading
+import time
+import json
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+class _NullPhase():
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        pass
+
+_NULL_PHASE = _NullPhase()
+
+class _Phase():
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self._profiler._record(self._name, time.monotonic() - self._started)
+
+# times every phase of the manager tick, keeps rolling percentiles per phase and logs a structured
+# record naming the slowest phase whenever a tick exceeds its budget - when disabled phases cost nothing.
+# A profiler is used from one thread at a time, work running concurrently with the tick gets its own.
+class TickProfiler():
+    _SUMMARY_INTERVAL = 300     # how often percentiles are logged (in ticks)
+
+    def __init__(self, config, name='tick'):
+        self._name = name
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._window = None
+        self.configure(config)
+        self._current = {}
+        self._tick_started = None
+        self._ticks = 0
+
+    def configure(self, config):
+        self._enabled = config.get('enabled', 0) == 1
+        self._budget = config.get('budget_ms', 500) / 1000
+        window = config.get('window', 600)
+        if window != self._window:
+            with self._lock:
+                # the newest samples are kept when the window changes
+                self._samples = {name: deque(samples, maxlen=window) for name, samples in self._samples.items()}
+                self._window = window
+
+    def is_enabled(self):
+        return self._enabled
+
+    def phase(self, name):
+        if not self._enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def _record(self, name, duration):
+        with self._lock:
+            self._current[name] = self._current.get(name, 0) + duration
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = deque(maxlen=self._window)
+                self._samples[name] = samples
+            samples.append(duration)
+
+    def begin_tick(self):
+        if self._enabled:
+            self._tick_started = time.monotonic()
+
+    def end_tick(self):
+        if not self._enabled or self._tick_started is None:
+            return
+
+        duration = time.monotonic() - self._tick_started
+        self._tick_started = None
+        self._record(self._name, duration)
+        with self._lock:
+            phases = self._current
+            self._current = {}
+        self._ticks += 1
+
+        if duration > self._budget:
+            phases.pop(self._name, None)
+            slowest = max(phases, key=phases.get) if len(phases) > 0 else None
+            log.warning("Slow {}: {}".format(self._name, json.dumps({
+                'duration_ms': round(duration * 1000, 1),
+                'budget_ms': round(self._budget * 1000, 1),
+                'slowest_phase': slowest,
+                'phases_ms': {name: round(value * 1000, 1) for name, value in phases.items()}
+            })))
+
+        if self._ticks % TickProfiler._SUMMARY_INTERVAL == 0:
+            log.debug("{} percentiles: {}".format(self._name.capitalize(), json.dumps(self.get_percentiles())))
+
+    # p50/p90/p99 of every phase over the rolling window (in milliseconds)
+    def get_percentiles(self, percentiles=(50, 90, 99)):
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+
+        result = {}
+        for name, values in samples.items():
+            if len(values) == 0:
+                continue
+            result[name] = {'p{}'.format(p): round(values[min(len(values) - 1, int(len(values) * p / 100))] * 1000, 1) for p in percentiles}
+        return result
@@ -0,0 +1,85 @@
+from array import array
+import os
+from logging import getLogger
+import utils
+
+log = getLogger(utils.get_module_name(os.path.basename(__file__)))
+
+# fixed size ring buffer of (timestamp, lastBlockHeight) samples of one node, backed by typed arrays so memory
+# stays the same however long jmanager runs - queries over a time window only walk the samples within it
+class TipHistory():
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._timestamps = array('d', [0.0]) * capacity
+        self._heights = array('q', [0]) * capacity
+        self.clear()
+
+    def clear(self):
+        self._count = 0
+        self._head = 0      # index the next sample is written to
+        self._last_change_time = None
+
+    def __len__(self):
+        return self._count
+
+    # index of the n-th newest sample (0 is the newest)
+    def _index(self, n):
+        return (self._head - 1 - n) % self._capacity
+
+    def append(self, timestamp, height):
+        if self._count == 0 or height != self._heights[self._index(0)]:
+            self._last_change_time = timestamp
+
+        self._timestamps[self._head] = timestamp
+        self._heights[self._head] = height
+        self._head = (self._head + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def get_latest_height(self):
+        return self._heights[self._index(0)] if self._count > 0 else None
+
+    def seconds_since_height_change(self, now):
+        if self._last_change_time is None:
+            return 0
+        return now - self._last_change_time
+
+    # blocks per second between the oldest and the newest sample of the last window seconds
+    def block_rate(self, window, now):
+        if self._count < 2:
+            return 0.0
+
+        newest = self._index(0)
+        oldest = newest
+        for n in range(1, self._count):
+            idx = self._index(n)
+            if self._timestamps[idx] < now - window:
+                break
+            oldest = idx
+
+        elapsed = self._timestamps[newest] - self._timestamps[oldest]
+        if elapsed <= 0:
+            return 0.0
+        return (self._heights[newest] - self._heights[oldest]) / elapsed
+
+    # the largest number of blocks this node was behind the other node over the last window seconds - both buffers
+    # are walked once from the newest sample back, every sample is compared with the other node's height at its time
+    def lag_against(self, other, window, now):
+        max_lag = 0
+        m = 0
+        for n in range(self._count):
+            idx = self._index(n)
+            timestamp = self._timestamps[idx]
+            if timestamp < now - window:
+                break
+
+            while m < other._count and other._timestamps[other._index(m)] > timestamp:
+                m += 1
+            if m == other._count:
+                break
+
+            lag = other._heights[other._index(m)] - self._heights[idx]
+            if lag > max_lag:
+                max_lag = lag
+
+        return max_lag
@@ -0,0 +1,51 @@
+import hashlib
+import struct
+import pytest
+from block import decode_header, BlockCache
+
+def _header(version=2, epoch=7, slot=1234, chain_length=42, leader=True):
+    raw = struct.pack('>HHIIII', 116, version, 0, epoch, slot, chain_length)
+    raw += hashlib.sha256(b'content').digest()
+    raw += hashlib.sha256(b'parent').digest()
+    if leader:
+        raw += hashlib.sha256(b'pool').digest()
+    return raw
+
+def test_decode_genesis_praos_header():
+    header = decode_header(_header() + b'signature and content')
+    assert (header.version, header.epoch, header.slot, header.chain_length) == (2, 7, 1234, 42)
+    assert header.content_hash == hashlib.sha256(b'content').hexdigest()
+    assert header.parent_hash == hashlib.sha256(b'parent').hexdigest()
+    assert header.leader_id == hashlib.sha256(b'pool').hexdigest()
+
+def test_decode_unsigned_header_has_no_leader():
+    assert decode_header(_header(version=0)).leader_id is None
+    # a signed header cut before the leader id is still decoded
+    assert decode_header(_header(leader=False)).leader_id is None
+
+def test_decode_rejects_a_truncated_block():
+    with pytest.raises(ValueError):
+        decode_header(_header()[:60])
+
+def test_block_cache_fetches_once_and_evicts_the_least_recently_used():
+    fetched = []
+    def fetch_block(block_hash):
+        fetched.append(block_hash)
+        return _header(chain_length=int(block_hash))
+
+    cache = BlockCache(2)
+    assert cache.get('1', fetch_block).chain_length == 1
+    assert cache.get('2', fetch_block).chain_length == 2
+    assert cache.get('1', fetch_block).chain_length == 1
+    # 2 is now the least recently used one
+    cache.get('3', fetch_block)
+    cache.get('1', fetch_block)
+    cache.get('2', fetch_block)
+    assert fetched == ['1', '2', '3', '2']
+    assert cache.get_stats() == {'size': 2, 'hits': 2, 'misses': 4}
+
+def test_block_cache_does_not_cache_undecodable_blocks():
+    cache = BlockCache(2)
+    with pytest.raises(ValueError):
+        cache.get('1', lambda block_hash: b'short')
+    assert cache.get_stats()['size'] == 0
@@ -0,0 +1,83 @@
+import threading
+import time
+import config_watcher
+from config_watcher import ConfigWatcher
+
+def _watch(tmp_path):
+    watched = tmp_path / 'jmanager.json'
+    other = tmp_path / 'other.json'
+    watched.write_text('{}')
+    other.write_text('{}')
+
+    calls = []
+    changed = threading.Event()
+    def callback():
+        calls.append(time.time())
+        changed.set()
+
+    watcher = ConfigWatcher([str(watched)], callback)
+    watcher.start()
+    return watcher, watched, other, calls, changed
+
+def _replace(path, content):
+    # editors write a new file and move it over the old one
+    tmp = path.parent / (path.name + '.swp')
+    tmp.write_text(content)
+    tmp.replace(path)
+
+def test_inotify_reports_a_burst_once(tmp_path):
+    watcher, watched, other, calls, changed = _watch(tmp_path)
+    try:
+        assert watcher.is_inotify()
+        other.write_text('{"ignored": true}')
+        assert not changed.wait(0.5)
+
+        watched.write_text('{"a": 1}')
+        _replace(watched, '{"a": 2}')
+        assert changed.wait(2)
+        time.sleep(ConfigWatcher._SETTLE_TIME * 2)
+        assert len(calls) == 1
+    finally:
+        watcher.stop()
+        watcher.join(2)
+
+def test_polling_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_watcher, '_init_inotify', lambda: (None, None))
+    monkeypatch.setattr(ConfigWatcher, '_POLL_INTERVAL', 0.05)
+    watcher, watched, other, calls, changed = _watch(tmp_path)
+    try:
+        assert not watcher.is_inotify()
+        other.write_text('{"ignored": true}')
+        assert not changed.wait(0.3)
+
+        _replace(watched, '{"a": 2}')
+        assert changed.wait(2)
+    finally:
+        watcher.stop()
+        watcher.join(2)
+
+def test_callback_errors_do_not_stop_the_watcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_watcher, '_init_inotify', lambda: (None, None))
+    monkeypatch.setattr(ConfigWatcher, '_POLL_INTERVAL', 0.05)
+    watched = tmp_path / 'jmanager.json'
+    watched.write_text('{}')
+
+    calls = []
+    def callback():
+        calls.append(1)
+        raise ValueError("broken config")
+
+    watcher = ConfigWatcher([str(watched)], callback)
+    watcher.start()
+    try:
+        # let the watcher take the files' initial signatures
+        time.sleep(0.2)
+        _replace(watched, '{"a": 1}')
+        time.sleep(0.3)
+        _replace(watched, '{"a": 22}')
+        time.sleep(0.3)
+        assert len(calls) == 2
+        assert watcher.is_alive()
+    finally:
+        watcher.stop()
+        watcher.join(2)
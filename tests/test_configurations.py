@@ -0,0 +1,72 @@
+import copy
+import json
+import pytest
+from configurations import Configurations, FrozenDict, freeze, thaw
+
+def _write_config(tmp_path, storages):
+    config = {
+        'common_config': {'manager': {}, 'jormungandr': {'bin': 'jormungandr'}, 'email': {}, 'pooltool': {}},
+        'nodes_config': [
+            {'node_name': name, 'jmanager_settings': {'node_path': str(tmp_path / name)}, 'config': {'storage': storage}}
+            for name, storage in storages.items()
+            ]
+        }
+    (tmp_path / 'jmanager.json').write_text(json.dumps(config))
+
+@pytest.fixture
+def configurations(tmp_path):
+    (tmp_path / 'template.json').write_text(json.dumps({'storage': '', 'rest': {'listen': '127.0.0.1:3100'}}))
+    _write_config(tmp_path, {'node_1': 'a', 'node_2': 'b'})
+    configurations = Configurations({'jmanager_config': str(tmp_path / 'jmanager.json'), 'config_template': str(tmp_path / 'template.json')})
+    yield configurations
+    configurations._watcher.stop()
+
+def test_node_generation_only_grows_when_the_node_changes(tmp_path, configurations):
+    snapshot = configurations.get_snapshot()
+    assert snapshot.generation == 1
+    assert snapshot.get_config('node_1')['config'] == {'storage': 'a', 'rest': {'listen': '127.0.0.1:3100'}}
+
+    _write_config(tmp_path, {'node_1': 'a', 'node_2': 'c'})
+    configurations.reload()
+    snapshot = configurations.get_snapshot()
+    assert snapshot.generation == 2
+    assert snapshot.get_node_generation('node_1') == 1
+    assert snapshot.get_node_generation('node_2') == 2
+    assert snapshot.get_node_generation('node_3') == 0
+
+def test_reload_keeps_the_generation_when_nothing_changed(tmp_path, configurations):
+    old = configurations.get_snapshot()
+    _write_config(tmp_path, {'node_1': 'a', 'node_2': 'b'})
+    configurations.reload()
+    assert configurations.get_snapshot() is old
+
+def test_broken_config_keeps_the_current_snapshot(tmp_path, configurations):
+    old = configurations.get_snapshot()
+    (tmp_path / 'jmanager.json').write_text('{"common_config": ')
+    configurations.reload()
+    assert configurations.get_snapshot() is old
+
+def test_freeze_makes_nested_containers_read_only():
+    frozen = freeze({'a': {'b': [1, {'c': 2}]}})
+    assert frozen == {'a': {'b': (1, {'c': 2})}}
+    assert isinstance(frozen['a']['b'][1], FrozenDict)
+    for mutate in (lambda: frozen.update(a=1), lambda: frozen['a'].pop('b'), lambda: frozen['a']['b'][1].__setitem__('c', 3)):
+        with pytest.raises(TypeError):
+            mutate()
+    assert copy.deepcopy(frozen) is frozen
+    assert json.loads(json.dumps(frozen)) == {'a': {'b': [1, {'c': 2}]}}
+
+def test_thaw_returns_a_mutable_copy():
+    frozen = freeze({'a': {'b': [1, 2]}})
+    thawed = thaw(frozen)
+    thawed['a']['b'].append(3)
+    assert thawed == {'a': {'b': [1, 2, 3]}}
+    assert type(thawed['a']) is dict
+    assert frozen['a']['b'] == (1, 2)
+
+def test_snapshot_is_shared_read_only(configurations):
+    snapshot = configurations.get_snapshot()
+    with pytest.raises(TypeError):
+        snapshot.get_config('node_1')['config']['storage'] = 'x'
+    assert configurations.get_config_manager()['nodes'] == tuple(snapshot.nodes.values())
+    assert configurations.get_config_jormungandr() == {'bin': 'jormungandr'}
@@ -0,0 +1,46 @@
+import json
+from json_stream import JsonFieldScanner
+
+_DOCUMENT = {
+    'pools': [{'majoritymax': 1, 'name': 'a "quoted", {pool}'}, {'x': [1, 2, {'y': ':'}]}],
+    'note': 'escaped \\ backslash \" and é',
+    'majoritymax': 4242,
+    'tips': {'majoritymax': 1, 'list': [1, 2, 3]},
+    'ignored': None,
+    'syncd': 'ok',
+    }
+
+def _scan(text, chunk_size, fields=('majoritymax', 'tips', 'syncd')):
+    scanner = JsonFieldScanner(fields)
+    for i in range(0, len(text), chunk_size):
+        if scanner.feed(text[i:i + chunk_size]):
+            break
+    return scanner
+
+def test_extracts_top_level_fields_whatever_the_chunk_size():
+    text = json.dumps(_DOCUMENT)
+    for chunk_size in (1, 2, 3, 7, 64, len(text)):
+        scanner = _scan(text, chunk_size)
+        assert scanner.is_done()
+        assert scanner.get_values() == {'majoritymax': 4242, 'tips': _DOCUMENT['tips'], 'syncd': 'ok'}
+
+def test_last_field_is_finished_by_the_closing_brace():
+    scanner = _scan('{"a": 1, "syncd": [1, {"b": 2}]}', 4, fields=('syncd',))
+    assert scanner.get_values() == {'syncd': [1, {'b': 2}]}
+
+def test_missing_fields_are_not_reported():
+    scanner = _scan(json.dumps({'a': 1, 'b': {'majoritymax': 2}}), 5)
+    assert not scanner.is_done()
+    assert scanner.get_values() == {}
+
+def test_stops_reading_once_all_fields_are_found():
+    scanner = JsonFieldScanner(['a'])
+    assert scanner.feed('{"a": 1, ')
+    assert scanner.feed('"b": ')
+    assert scanner.get_values() == {'a': 1}
+
+def test_oversized_values_are_skipped(monkeypatch):
+    monkeypatch.setattr(JsonFieldScanner, '_MAX_VALUE_SIZE', 10)
+    text = json.dumps({'big': 'x' * 100, 'small': 1})
+    scanner = _scan(text, 8, fields=('big', 'small'))
+    assert scanner.get_values() == {'small': 1}
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from error_types import JcliError
+from manager import Manager
+
+_ROUND_TRIP = 0.05
+
+class FakeNode():
+    def __init__(self, name, leaders):
+        self._name = name
+        self.leaders = leaders
+        self.fail_post = False
+
+    def get_name(self):
+        return self._name
+
+    def post_prepared_leader(self):
+        time.sleep(_ROUND_TRIP)
+        if self.fail_post:
+            raise JcliError('post failed', err={'err_code': 0})
+        self.leaders = [1]
+        return 1
+
+    def delete_leader(self, leader_id):
+        time.sleep(_ROUND_TRIP)
+        self.leaders = []
+        return True
+
+    def refresh_leaders(self):
+        time.sleep(_ROUND_TRIP)
+        return self.leaders
+
+def _manager():
+    manager = Manager.__new__(Manager)
+    manager._failover_executor = ThreadPoolExecutor(max_workers=2)
+    return manager
+
+def test_switch_takes_two_round_trips():
+    old, new = FakeNode('old', [1]), FakeNode('new', [])
+    started = time.monotonic()
+    _manager()._switch_leader({'id': 1, 'node': old}, new)
+    duration = time.monotonic() - started
+
+    assert new.leaders == [1] and old.leaders == []
+    # post and delete at once, then both verifications at once
+    assert duration < 3 * _ROUND_TRIP
+
+def test_failed_switch_is_reported():
+    old, new = FakeNode('old', [1]), FakeNode('new', [])
+    new.fail_post = True
+    with pytest.raises(JcliError):
+        _manager()._switch_leader({'id': 1, 'node': old}, new)
+
+def test_unverified_switch_is_reported():
+    old, new = FakeNode('old', [1]), FakeNode('new', [])
+    old.delete_leader = lambda leader_id: False
+    with pytest.raises(JcliError):
+        _manager()._switch_leader({'id': 1, 'node': old}, new)
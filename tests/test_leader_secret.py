@@ -0,0 +1,52 @@
+import pytest
+import node_client
+from node_client import read_leader_secret, _parse_leader_secret
+
+_SECRET = """# node secret
+genesis:
+  sig_key: ed25519e_sk1abc
+  vrf_key: "vrf_sk1def"   # quoted
+  node_id: '0123456789'
+bft:
+  signing_key: ~
+"""
+
+_EXPECTED = {
+    'genesis': {'sig_key': 'ed25519e_sk1abc', 'vrf_key': 'vrf_sk1def', 'node_id': '0123456789'},
+    'bft': {'signing_key': None}
+}
+
+def _write(tmp_path, content):
+    filename = tmp_path / 'node_secret.yaml'
+    filename.write_text(content)
+    return str(filename)
+
+def test_fallback_parser_reads_a_node_secret():
+    assert _parse_leader_secret(_SECRET, 'secret') == _EXPECTED
+
+def test_fallback_parser_accepts_other_indentation():
+    assert _parse_leader_secret("genesis:\n    node_id: abc\n    sig_key: def\n", 'secret') == {'genesis': {'node_id': 'abc', 'sig_key': 'def'}}
+
+@pytest.mark.parametrize('content', [
+    "genesis:\n  keys:\n    sig_key: abc\n",            # deeper nesting
+    "genesis:\n  sig_key: abc\n    vrf_key: def\n",     # inconsistent indentation
+    "genesis:\n  - abc\n",                              # list
+    "genesis: [abc]\n",                                 # flow style
+    "genesis:\n  sig_key: |\n    abc\n",                # block scalar
+    "genesis:\n  sig_key: \"a\\\"b\"\n",                # escapes
+    "genesis:\n  sig_key: 'abc\n",                      # unterminated quote
+    "sig_key abc\n",                                    # not a mapping
+    "  sig_key: abc\n",                                 # indented without a section
+])
+def test_fallback_parser_rejects_what_it_does_not_understand(content):
+    with pytest.raises(ValueError):
+        _parse_leader_secret(content, 'secret')
+
+def test_yaml_keeps_every_value_a_string(tmp_path):
+    if node_client.yaml is None:
+        pytest.skip('PyYAML is not installed')
+    assert read_leader_secret(_write(tmp_path, _SECRET)) == _EXPECTED
+
+def test_without_yaml_the_fallback_parser_is_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(node_client, 'yaml', None)
+    assert read_leader_secret(_write(tmp_path, _SECRET)) == _EXPECTED
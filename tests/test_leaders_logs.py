@@ -0,0 +1,82 @@
+import json
+import threading
+from jm_enums import State
+from locks import InstrumentedLock
+from slot_schedule import get_slots_digest, EMPTY_SLOTS_DIGEST
+from tip_history import TipHistory
+from jormungandr import Jormungandr
+
+def _slot(date, finished=None):
+    return {'scheduled_at_date': date, 'scheduled_at_time': '2021-01-05T07:08:09+00:00', 'finished_at_time': finished}
+
+class FakeClient():
+    def __init__(self, slots):
+        self.slots = slots
+        self.calls = 0
+
+    def get_leaders_logs_raw(self):
+        self.calls += 1
+        return json.dumps(self.slots).encode()
+
+def _node(slots, epoch='5', ttl=60):
+    node = Jormungandr.__new__(Jormungandr)
+    node._node_name = 'n1'
+    node._lock = InstrumentedLock('n1')
+    node._state_lock = threading.Lock()
+    node._state = State.STARTED
+    node._client = FakeClient(slots)
+    node._node_stats = {'lastBlockDate': '{}.100'.format(epoch)}
+    node._tip_history = TipHistory(4)
+    node._leaders = None
+    node._leaders_logs_ttl = ttl
+    node._leaders_logs = None
+    node._leaders_logs_digest = None
+    node._leaders_logs_response_digest = None
+    node._leaders_logs_epoch = None
+    node._leaders_logs_fetched_at = None
+    return node
+
+def test_keeps_the_unfinished_slots_of_the_current_epoch():
+    slots = [_slot('5.10'), _slot('5.20', finished='2021-01-05T07:08:10+00:00'), _slot('4.30'), _slot('6.1')]
+    node = _node(slots)
+    assert node.get_leaders_logs() == [slots[0]]
+    assert node.get_leaders_logs_digest() == get_slots_digest([slots[0]])
+    # both calls were served by one request
+    assert node._client.calls == 1
+
+def test_cache_expires_after_the_ttl():
+    node = _node([_slot('5.10')], ttl=0)
+    node.get_leaders_logs()
+    node._client.slots = [_slot('5.10'), _slot('5.11')]
+    assert len(node.get_leaders_logs()) == 2
+    assert node._client.calls == 2
+
+def test_unchanged_response_keeps_the_parsed_slots():
+    node = _node([_slot('5.10')], ttl=0)
+    slots = node.get_leaders_logs()
+    assert node.get_leaders_logs() is slots
+    assert node._client.calls == 2
+
+def test_new_epoch_refilters_an_unchanged_response():
+    node = _node([_slot('5.10'), _slot('6.1')])
+    digest = node.get_leaders_logs_digest()
+    node._node_stats = {'lastBlockDate': '6.0'}
+    assert node.get_leaders_logs() == [_slot('6.1')]
+    assert node.get_leaders_logs_digest() != digest
+    assert node._client.calls == 2
+
+def test_restart_drops_the_cache():
+    node = _node([_slot('5.10')])
+    node.get_leaders_logs()
+    node._clean_up()
+    node._node_stats = {'lastBlockDate': '5.100'}
+    node._client.slots = []
+    assert node.get_leaders_logs() == []
+    assert node.get_leaders_logs_digest() == EMPTY_SLOTS_DIGEST
+
+def test_not_started_node_has_no_leaders_logs():
+    node = _node([_slot('5.10')])
+    node._state = State.STOPPED
+    assert node.get_leaders_logs() is None
+    assert node.get_leaders_logs_digest() is None
+    assert node._client.calls == 0
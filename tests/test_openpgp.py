@@ -0,0 +1,33 @@
+import base64
+import hashlib
+import shutil
+import subprocess
+import pytest
+import openpgp
+
+def test_s2k_key_hashes_the_salted_passphrase_count_bytes():
+    salt, passphrase = b'12345678', b'secret'
+    count = openpgp._s2k_count(openpgp._S2K_CODED_COUNT)
+    expected = hashlib.sha256(((salt + passphrase) * count)[:count]).digest()
+    assert openpgp._s2k_key(passphrase, salt, openpgp._S2K_CODED_COUNT) == expected
+
+def test_packet_lengths():
+    assert openpgp._packet(11, b'x' * 10)[:2] == bytes([0xCB, 10])
+    assert openpgp._packet(11, b'x' * 200)[:3] == bytes([0xCB, 192, 8])
+    assert openpgp._packet(11, b'x' * 9000)[:6] == bytes([0xCB, 0xFF, 0, 0, 0x23, 0x28])
+
+def test_armor_checksum():
+    armored = openpgp.armor(b'')
+    assert armored.splitlines()[-2] == '=' + base64.b64encode(bytes([0xB7, 0x04, 0xCE])).decode()
+    data = bytes(range(256))
+    lines = openpgp.armor(data).splitlines()
+    assert base64.b64decode(''.join(lines[2:-2])) == data
+
+@pytest.mark.skipif(not openpgp.is_available() or shutil.which('gpg') is None, reason="needs cryptography and gpg")
+def test_gpg_decrypts_the_message(tmp_path):
+    data = b'{"currentepoch": 42, "slots": [1, 2, 3]}' * 20
+    armored = openpgp.encrypt_symmetric(data, 'passphrase')
+    result = subprocess.run(['gpg', '--homedir', str(tmp_path), '--batch', '--quiet', '--pinentry-mode', 'loopback',
+                             '--passphrase', 'passphrase', '--decrypt'], input=armored.encode(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert result.returncode == 0, result.stderr.decode()
+    assert result.stdout == data
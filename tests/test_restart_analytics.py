@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+import random
+from restart_analytics import UptimeStats, RestartAnalytics, UNKNOWN, _parse_utc, read_csv, read_history
+from restart_journal import export_csv
+
+def test_parse_utc_matches_datetime():
+    for text in ('2020-02-29 23:59:59', '2021-01-05 07:08:09.5', '2021-01-05 07:08:09.123456'):
+        expected = datetime.strptime(text, '%Y-%m-%d %H:%M:%S.%f' if '.' in text else '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+        assert abs(_parse_utc(text) - expected) < 1e-6
+
+def test_uptime_percentiles_are_within_a_bucket():
+    rnd = random.Random(1)
+    uptimes = sorted(rnd.randint(0, 10 ** 6) for _ in range(1000))
+    stats = UptimeStats()
+    for uptime in uptimes:
+        stats.add(uptime)
+
+    assert (stats.count, stats.min, stats.max) == (1000, uptimes[0], uptimes[-1])
+    assert stats.get_mean() == sum(uptimes) / 1000
+    for percentile in (50, 90):
+        exact = uptimes[percentile * 10 - 1]
+        assert exact <= stats.get_percentile(percentile) <= exact * 1.125 + 1
+    assert UptimeStats().get_percentile(50) is None
+
+def test_uptime_buckets_are_ordered():
+    bounds = [UptimeStats._bucket_upper_bound(UptimeStats._bucket(uptime)) for uptime in range(0, 5000)]
+    assert all(uptime <= bound for uptime, bound in enumerate(bounds))
+    assert bounds == sorted(bounds)
+
+def test_restart_analytics():
+    records = [
+        {'node': 'a', 'timestamp': 100, 'action': 'stop', 'uptime': 100, 'reason': 'stuck', 'epoch': 5, 'version': '0.9'},
+        {'node': 'a', 'timestamp': 110, 'action': 'start', 'reason': 'stuck'},
+        {'node': 'a', 'timestamp': 400, 'action': 'stop', 'uptime': 290, 'reason': 'stuck', 'epoch': 6, 'version': '0.9'},
+        {'node': 'b', 'timestamp': 500, 'action': 'stop', 'uptime': -1, 'reason': ''},
+        ]
+    result = RestartAnalytics().add_all(records).to_dict()
+
+    assert result['records'] == 4
+    assert (result['first'], result['last']) == (100, 500)
+    assert result['reasons'] == {'stuck': 2, UNKNOWN: 1}
+    assert result['nodes']['a']['restarts'] == 2
+    assert result['nodes']['a']['starts'] == 1
+    assert result['nodes']['a']['mtbf'] == 300
+    assert result['nodes']['a']['uptime']['count'] == 2
+    assert result['nodes']['b']['mtbf'] is None
+    assert result['nodes']['b']['uptime']['count'] == 0
+    assert [(u['reason'], u['version'], u['count']) for u in result['uptime_before_restart']] == [('stuck', '0.9', 2)]
+    # the stop without an epoch belongs to the last seen one
+    assert result['epochs'] == {'5': {'stuck': 1}, '6': {'stuck': 1, UNKNOWN: 1}}
+    assert 'stuck' in RestartAnalytics().add_all(records).get_report()
+    assert RestartAnalytics().get_report() == 'No restart records.'
+
+def test_read_csv_reads_the_exported_journal(tmp_path):
+    journal = tmp_path / 'restarts.jsonl'
+    journal.write_text(
+        '{"node": "a", "timestamp": 1600000000.25, "action": "stop", "uptime": 60, "reason": "stuck, no blocks"}\n'
+        '{"node": "a", "timestamp": 1600000010, "action": "start", "uptime": null, "reason": "stuck, no blocks"}\n')
+    csv = tmp_path / 'restarts.csv'
+    export_csv(str(journal), str(csv))
+    with open(str(csv), 'a') as f:
+        f.write('a,not a date,stop,1,x\n')
+
+    records = list(read_history(str(csv)))
+    assert records == [
+        {'node': 'a', 'timestamp': 1600000000.25, 'action': 'stop', 'uptime': 60, 'reason': 'stuck, no blocks'},
+        {'node': 'a', 'timestamp': 1600000010, 'action': 'start', 'uptime': -1, 'reason': 'stuck, no blocks'},
+        ]
+    assert list(read_csv(str(csv))) == records
+    assert [r['node'] for r in read_history(str(journal))] == ['a', 'a']
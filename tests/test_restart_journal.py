@@ -0,0 +1,62 @@
+import os
+import time
+from restart_journal import RestartJournal, FSYNC_ALWAYS, read_journal, export_csv, journal_files
+
+def _wait_for(condition):
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError("The journal was not written in time.")
+
+def _read(filename):
+    try:
+        with open(filename) as f:
+            return f.read()
+    except FileNotFoundError:
+        return ''
+
+def _journal(tmp_path, **kwargs):
+    journal = RestartJournal(str(tmp_path / 'restarts.jsonl'), FSYNC_ALWAYS, **kwargs)
+    journal.start()
+    return journal
+
+def test_records_are_written_in_order(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record('node_1', 'stop', 'stuck', uptime=120, tip=42)
+    journal.record('node_1', 'start', 'stuck')
+    _wait_for(lambda: len(list(read_journal(journal.get_filename()))) == 2)
+
+    records = list(read_journal(journal.get_filename()))
+    assert [(r['node'], r['action'], r['uptime'], r['tip']) for r in records] == [('node_1', 'stop', 120, 42), ('node_1', 'start', None, None)]
+
+def test_rotation_keeps_the_configured_backups(tmp_path):
+    journal = _journal(tmp_path, max_size=1, backups=2)
+    filename = journal.get_filename()
+    for idx in range(5):
+        node_name = 'node_{}'.format(idx)
+        journal.record(node_name, 'start', 'init')
+        # every record fills the file, wait for it to be rotated
+        _wait_for(lambda: os.path.exists(filename) and node_name in _read(filename + '.1'))
+
+    assert journal_files(filename) == [filename + '.2', filename + '.1', filename]
+    assert [r['node'] for r in read_journal(filename)] == ['node_3', 'node_4']
+    assert os.path.getsize(filename) == 0
+
+def test_read_journal_skips_corrupted_records(tmp_path):
+    filename = str(tmp_path / 'restarts.jsonl')
+    with open(filename + '.1', 'w') as f:
+        f.write('{"node": "a"}\n{"node": \n')
+    with open(filename, 'w') as f:
+        f.write('\n{"node": "b"}\n')
+    assert [r['node'] for r in read_journal(filename)] == ['a', 'b']
+
+def test_export_csv(tmp_path):
+    filename = str(tmp_path / 'restarts.jsonl')
+    with open(filename, 'w') as f:
+        f.write('{"node": "node_1", "timestamp": 0, "action": "stop", "uptime": null, "reason": "stuck"}\n')
+        f.write('{"node": "node_1", "timestamp": 60, "action": "start", "uptime": 5, "reason": "stuck"}\n')
+    assert export_csv(filename, str(tmp_path / 'restarts.csv')) == 2
+    with open(str(tmp_path / 'restarts.csv')) as f:
+        assert f.read().splitlines()[1:] == ['node_1,1970-01-01 00:00:00,stop,-1,stuck', 'node_1,1970-01-01 00:01:00,start,5,stuck']
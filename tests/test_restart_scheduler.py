@@ -0,0 +1,96 @@
+import time
+from jm_enums import State
+from restart_scheduler import RestartScheduler
+
+class FakeNode():
+    def __init__(self, name, state=State.STARTED):
+        self._name = name
+        self.state = state
+
+    def get_name(self):
+        return self._name
+
+    def get_state(self):
+        return self.state
+
+class FakeSchedule():
+    def __init__(self, times):
+        self._times = sorted(times)
+
+    def get_next_slot_time(self, t):
+        for slot_time in self._times:
+            if slot_time >= t:
+                return slot_time
+        return None
+
+def _scheduler():
+    return RestartScheduler(600, 60)
+
+def test_restarts_run_in_order_of_urgency():
+    nodes = [FakeNode('n1'), FakeNode('n2'), FakeNode('n3')]
+    restarted = []
+    scheduler = _scheduler()
+    scheduler.request(nodes[0], 'leader logs', restarted.append)
+    scheduler.request(nodes[1], 'boot timeout', restarted.append)
+    scheduler.request(nodes[2], 'staled tip', restarted.append)
+    assert scheduler.get_queued() == [('n3', 'staled tip'), ('n2', 'boot timeout'), ('n1', 'leader logs')]
+
+    scheduler.process(nodes, [], [])
+    assert [node.get_name() for node in restarted] == ['n3', 'n2', 'n1']
+    assert scheduler.get_queued() == []
+
+def test_more_urgent_reason_replaces_the_request():
+    node = FakeNode('n1')
+    scheduler = _scheduler()
+    scheduler.request(node, 'leader logs', None)
+    scheduler.request(node, 'staled tip', None)
+    scheduler.request(node, 'boot timeout', None)
+    assert scheduler.get_queued() == [('n1', 'staled tip')]
+
+def test_requests_not_renewed_are_dropped():
+    nodes = [FakeNode('leader'), FakeNode('n2')]
+    restarted = []
+    scheduler = _scheduler()
+    schedules = [FakeSchedule([time.time() + 100])]
+    scheduler.request(nodes[0], 'staled tip', restarted.append)
+    scheduler.process(nodes, ['leader'], schedules)
+    assert scheduler.get_queued() == [('leader', 'staled tip')]
+
+    scheduler.process(nodes, ['leader'], schedules)
+    assert scheduler.get_queued() == []
+    assert restarted == []
+
+def test_leader_and_last_healthy_node_are_guarded_near_a_slot():
+    leader, follower, stopped = FakeNode('leader'), FakeNode('follower'), FakeNode('stopped', State.STOPPED)
+    restarted = []
+    scheduler = _scheduler()
+    schedules = [FakeSchedule([time.time() + 100])]
+
+    scheduler.request(leader, 'staled tip', restarted.append)
+    scheduler.process([leader, follower, stopped], ['leader'], schedules)
+    assert restarted == []
+
+    # a follower that is the last running node is guarded too
+    leader.state = State.STOPPED
+    scheduler.request(follower, 'staled tip', restarted.append)
+    scheduler.process([leader, follower, stopped], [], schedules)
+    assert restarted == []
+
+    # far from any slot the restart runs
+    scheduler.request(follower, 'staled tip', restarted.append)
+    scheduler.process([leader, follower, stopped], [], [FakeSchedule([time.time() + 3600])])
+    assert restarted == [follower]
+
+def test_follower_restart_for_leaders_logs_waits_for_the_slot():
+    leader, follower = FakeNode('leader'), FakeNode('follower')
+    restarted = []
+    scheduler = _scheduler()
+
+    scheduler.request(follower, 'leader logs', restarted.append)
+    scheduler.process([leader, follower], ['leader'], [FakeSchedule([time.time() + 100])])
+    assert restarted == []
+
+    # a stuck follower is not the failover target, it is restarted right away
+    scheduler.request(follower, 'staled tip', restarted.append)
+    scheduler.process([leader, follower], ['leader'], [FakeSchedule([time.time() + 100])])
+    assert restarted == [follower]
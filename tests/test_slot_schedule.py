@@ -0,0 +1,31 @@
+from slot_schedule import SlotSchedule, get_slots_digest, parse_slot_time, EMPTY_SLOTS_DIGEST
+
+def _slot(date, time):
+    return {'scheduled_at_date': date, 'scheduled_at_time': time, 'created_at_time': '2020-06-01T00:00:00+00:00'}
+
+_SLOTS = [
+    _slot('10.200', '2020-06-01T12:00:00+00:00'),
+    _slot('10.100', '2020-06-01T11:00:00+00:00'),
+]
+
+def test_digest_ignores_order_and_other_fields():
+    other = [dict(_SLOTS[1], created_at_time='2020-06-01T01:00:00+00:00'), _SLOTS[0]]
+    assert get_slots_digest(other) == get_slots_digest(_SLOTS)
+    assert get_slots_digest([]) == EMPTY_SLOTS_DIGEST
+    assert get_slots_digest(_SLOTS[:1]) != get_slots_digest(_SLOTS)
+
+def test_next_slot_time():
+    schedule = SlotSchedule('10', _SLOTS, 'n1')
+    first, second = parse_slot_time('2020-06-01T11:00:00'), parse_slot_time('2020-06-01T12:00:00')
+    assert len(schedule) == 2
+    assert schedule.get_next_slot_time(first - 1) == first
+    assert schedule.get_next_slot_time(first) == first
+    assert schedule.get_next_slot_time(first + 1) == second
+    assert schedule.get_next_slot_time(second + 1) is None
+
+def test_nodes_and_matching():
+    schedule = SlotSchedule('10', _SLOTS, 'n1')
+    assert schedule.matches(get_slots_digest(list(reversed(_SLOTS))))
+    assert not schedule.matches(EMPTY_SLOTS_DIGEST)
+    schedule.add_node('n2')
+    assert schedule.has_node('n2') and schedule.get_nodes() == {'n1', 'n2'}
@@ -0,0 +1,67 @@
+import time
+from slots_outbox import SlotsOutbox, PREPARED, FAILED, SENT
+
+def test_put_survives_a_reload(tmp_path):
+    outbox = SlotsOutbox(str(tmp_path / 'outbox'))
+    outbox.put(10, {'slots': 'encrypted'})
+    outbox.mark_sent(10)
+    outbox.put(11, {'slots': 'next'})
+
+    reloaded = SlotsOutbox(str(tmp_path / 'outbox'))
+    assert reloaded.get(10)['state'] == SENT
+    assert reloaded.get(11)['state'] == PREPARED
+    assert reloaded.get(11)['data'] == {'slots': 'next'}
+
+def test_begin_send_is_exclusive_per_epoch(tmp_path):
+    outbox = SlotsOutbox(str(tmp_path))
+    outbox.put(10, {})
+    assert outbox.begin_send(10)
+    assert not outbox.begin_send(10)
+    assert outbox.begin_send(11)
+    outbox.mark_failed(10)
+    assert outbox.begin_send(10)
+
+def test_failed_sends_back_off_exponentially(tmp_path):
+    outbox = SlotsOutbox(str(tmp_path))
+    outbox.put(10, {})
+    start = time.time()
+
+    outbox.mark_failed(10)
+    entry = outbox.get(10)
+    assert entry['state'] == FAILED
+    assert start + SlotsOutbox._RETRY_INTERVAL <= entry['next_attempt'] <= time.time() + SlotsOutbox._RETRY_INTERVAL
+    assert outbox.get_due(start) == []
+    assert outbox.get_due(entry['next_attempt']) == [entry]
+
+    outbox.mark_failed(10)
+    assert outbox.get(10)['next_attempt'] >= start + 2 * SlotsOutbox._RETRY_INTERVAL
+
+    for _ in range(10):
+        outbox.mark_failed(10)
+        entry = outbox.get(10)
+        if entry is None:
+            break
+        assert entry['next_attempt'] <= time.time() + SlotsOutbox._MAX_RETRY_INTERVAL
+
+def test_gives_up_after_max_attempts(tmp_path):
+    outbox = SlotsOutbox(str(tmp_path))
+    outbox.put(10, {})
+    for _ in range(SlotsOutbox._MAX_ATTEMPTS):
+        outbox.mark_failed(10)
+    assert outbox.get(10) is None
+    assert not (tmp_path / '10.json').exists()
+
+def test_prune_drops_old_epochs(tmp_path):
+    outbox = SlotsOutbox(str(tmp_path))
+    for epoch in (7, 8, 9):
+        outbox.put(epoch, {})
+    outbox.mark_sent(7)
+    outbox.prune(10)
+    assert outbox.get(7) is None
+    assert outbox.get(8) is None
+    assert outbox.get(9) is not None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['9.json']
+    # marking a pruned epoch is a no-op
+    outbox.mark_sent(8)
+    outbox.mark_failed(8)
+    assert outbox.get(8) is None
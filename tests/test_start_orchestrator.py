@@ -0,0 +1,98 @@
+import time
+from jm_enums import State
+from start_orchestrator import StartOrchestrator
+
+class FakeNode():
+    def __init__(self, name, state=State.UNKNOWN):
+        self._name = name
+        self.state = state
+        self.tip = 0
+        self.starts = 0
+        self.peers_switched = 0
+
+    def get_name(self):
+        return self._name
+
+    def get_state(self):
+        return self.state
+
+    def get_tip(self):
+        return self.tip
+
+    def switch_to_default_peers_bootstrap(self):
+        self.peers_switched += 1
+
+    def start_node(self):
+        self.starts += 1
+        self.state = State.BOOTSTRAPPING
+
+# start calls run in their own threads
+def _wait_for_starts(nodes, starts):
+    deadline = time.monotonic() + 5
+    while [node.starts for node in nodes] != starts:
+        assert time.monotonic() < deadline, [node.starts for node in nodes]
+        time.sleep(0.01)
+
+def test_no_cold_start_while_all_nodes_unknown():
+    nodes = [FakeNode('n1'), FakeNode('n2')]
+    orchestrator = StartOrchestrator(1, 60, 5, 7200)
+
+    orchestrator.start(nodes)
+    assert not orchestrator.is_active()
+
+    # the first polls report the nodes as stopped, the next call starts them
+    for node in nodes:
+        node.state = State.STOPPED
+    orchestrator.start(nodes)
+    assert orchestrator.is_active()
+    assert all(orchestrator.is_pending(node) for node in nodes)
+
+    orchestrator.tick(0)
+    _wait_for_starts(nodes, [1, 0])
+    assert nodes[0].peers_switched == 1
+
+def test_nodes_stopped_later_join_the_cold_start():
+    nodes = [FakeNode('n1', State.STOPPED), FakeNode('n2')]
+    orchestrator = StartOrchestrator(2, 60, 5, 7200)
+
+    orchestrator.start(nodes)
+    assert orchestrator.is_pending(nodes[0])
+    assert not orchestrator.is_pending(nodes[1])
+
+    nodes[1].state = State.STOPPED
+    orchestrator.start(nodes)
+    assert orchestrator.is_pending(nodes[1])
+
+    orchestrator.tick(0)
+    _wait_for_starts(nodes, [1, 1])
+
+    # a released node that stops again is left to the manager, it is not queued a second time
+    deadline = time.monotonic() + 5
+    while any(orchestrator.is_pending(node) for node in nodes):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    nodes[0].state = State.STOPPED
+    orchestrator.start(nodes)
+    assert not orchestrator.is_pending(nodes[0])
+
+def test_bootstrapping_limit_and_finish():
+    nodes = [FakeNode('n{}'.format(idx), State.STOPPED) for idx in range(3)]
+    orchestrator = StartOrchestrator(1, 60, 5, 7200)
+    orchestrator.start(nodes)
+
+    orchestrator.tick(100)
+    _wait_for_starts(nodes, [1, 0, 0])
+
+    # the next node is released once the bootstrapping one is started
+    nodes[0].state = State.STARTED
+    nodes[0].tip = 100
+    orchestrator.tick(100)
+    _wait_for_starts(nodes, [1, 1, 0])
+
+    nodes[1].state = State.STARTED
+    orchestrator.tick(100)
+    _wait_for_starts(nodes, [1, 1, 1])
+    nodes[1].tip = nodes[2].tip = 100
+    nodes[2].state = State.STARTED
+    orchestrator.tick(100)
+    assert not orchestrator.is_active()
@@ -0,0 +1,66 @@
+import threading
+from jm_enums import State
+from locks import InstrumentedLock
+from tip_history import TipHistory
+from jormungandr import Jormungandr
+
+class FakeClient():
+    def __init__(self, node, event=None):
+        self._node = node
+        self._event = event
+
+    # the process exits while the node answers the poll
+    def get_node_stats(self):
+        if self._event is not None:
+            self._node.on_supervisor_state(self._event)
+        return {'state': 'Running', 'lastBlockHeight': '100', 'lastBlockDate': '1.2', 'uptime': 10}
+
+def _node(state=State.STARTED):
+    node = Jormungandr.__new__(Jormungandr)
+    node._node_name = 'n1'
+    node._lock = InstrumentedLock('n1')
+    node._state_lock = threading.Lock()
+    node._state_events = 0
+    node._state = state
+    node._node_stats = None
+    node._tip_history = TipHistory(4)
+    node._leaders = None
+    node._leaders_logs_fetched_at = None
+    node._leaders_logs_response_digest = None
+    return node
+
+def test_event_is_applied_while_a_poll_holds_the_node():
+    node = _node()
+    polling = threading.Event()
+    done = threading.Event()
+
+    def poll():
+        with node._lock:
+            polling.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+    polling.wait(5)
+
+    applier = threading.Thread(target=node.on_supervisor_state, args=(100,))
+    applier.start()
+    applier.join(1)
+    try:
+        assert not applier.is_alive()
+        assert node.get_state() == State.STOPPED
+    finally:
+        done.set()
+        thread.join()
+
+def test_poll_does_not_undo_an_event():
+    node = _node()
+    node._client = FakeClient(node, event=100)
+    assert node._get_stats() is None
+    assert node.get_state() == State.STOPPED
+    assert len(node._tip_history) == 0
+
+    node._client = FakeClient(node)
+    node._get_stats()
+    assert node.get_state() == State.STARTED
+    assert node.get_tip() == 100
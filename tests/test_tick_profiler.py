@@ -0,0 +1,43 @@
+from tick_profiler import TickProfiler
+
+def _profiler(window=10):
+    return TickProfiler({'enabled': 1, 'budget_ms': 1000, 'window': window})
+
+def test_percentiles_per_phase():
+    profiler = _profiler()
+    for duration in range(1, 11):
+        profiler._record('check_leaders', duration / 1000)
+    percentiles = profiler.get_percentiles()['check_leaders']
+    assert percentiles == {'p50': 6.0, 'p90': 10.0, 'p99': 10.0}
+
+def test_disabled_profiler_records_nothing():
+    profiler = TickProfiler({'enabled': 0})
+    profiler.begin_tick()
+    with profiler.phase('check_leaders'):
+        pass
+    profiler.end_tick()
+    assert profiler.get_percentiles() == {}
+
+def test_tick_records_its_phases():
+    profiler = _profiler()
+    profiler.begin_tick()
+    with profiler.phase('check_leaders'):
+        pass
+    profiler.end_tick()
+    assert set(profiler.get_percentiles()) == {'check_leaders', 'tick'}
+
+def test_window_change_resizes_the_samples():
+    profiler = _profiler(window=10)
+    for duration in range(1, 11):
+        profiler._record('check_leaders', duration / 1000)
+
+    profiler.configure({'enabled': 1, 'window': 2})
+    assert profiler.get_percentiles()['check_leaders']['p50'] == 10.0
+    profiler._record('check_leaders', 0.001)
+    profiler._record('check_leaders', 0.001)
+    assert profiler.get_percentiles()['check_leaders']['p99'] == 1.0
+
+    profiler.configure({'enabled': 1, 'window': 5})
+    for _ in range(5):
+        profiler._record('check_leaders', 0.002)
+    assert profiler.get_percentiles()['check_leaders'] == {'p50': 2.0, 'p90': 2.0, 'p99': 2.0}
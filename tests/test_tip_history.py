@@ -0,0 +1,35 @@
+from tip_history import TipHistory
+
+def _history(samples, capacity=10):
+    history = TipHistory(capacity)
+    for timestamp, height in samples:
+        history.append(timestamp, height)
+    return history
+
+def test_ring_buffer_keeps_the_newest_samples():
+    history = _history([(t, t) for t in range(15)], capacity=10)
+    assert len(history) == 10
+    assert history.get_latest_height() == 14
+    # the oldest kept sample is 5
+    assert history.block_rate(100, 14) == 1.0
+
+def test_seconds_since_height_change():
+    history = _history([(0, 1), (10, 2), (20, 2), (30, 2)])
+    assert history.seconds_since_height_change(40) == 30
+    history.clear()
+    assert history.seconds_since_height_change(40) == 0
+
+def test_block_rate_only_uses_the_window():
+    history = _history([(0, 0), (10, 100), (20, 102), (30, 104)])
+    assert history.block_rate(20, 30) == 0.2
+    assert history.block_rate(1, 30) == 0.0
+    assert TipHistory(4).block_rate(10, 0) == 0.0
+
+def test_lag_against_compares_with_the_other_height_at_each_sample():
+    node = _history([(0, 10), (10, 11), (20, 12), (30, 20)])
+    other = _history([(5, 15), (15, 18), (25, 20)])
+    # at 10 the other node was at 15, at 20 at 18 and at 30 at 20 - at 0 it had no sample yet
+    assert node.lag_against(other, 100, 30) == 6
+    assert node.lag_against(other, 5, 30) == 0
+    assert other.lag_against(node, 100, 30) == 0
+    assert node.lag_against(TipHistory(4), 100, 30) == 0